@@ -29,7 +29,8 @@ def _get_admin_translator(services_provider: 'BotServicesProvider') -> 'Translat
             locales_dir=services_provider.config.core.i18n.locales_dir,
             domain=services_provider.config.core.i18n.domain,
             default_locale=services_provider.config.core.i18n.default_locale,
-            available_locales=services_provider.config.core.i18n.available_locales
+            available_locales=services_provider.config.core.i18n.available_locales,
+            cache_dir=services_provider.config.core.i18n_cache_dir
         )
     return _admin_translator_cache
 
@@ -68,6 +68,10 @@ class DBSettings(BaseModel):
     pg_dsn: Optional[PostgresDsn] = Field(default=None, description="DSN для PostgreSQL.")
     mysql_dsn: Optional[MySQLDsn] = Field(default=None, description="DSN для MySQL.")
     echo_sql: bool = Field(default=False, description="Логировать SQL-запросы SQLAlchemy (уровень DEBUG).")
+    pool_size: int = Field(default=10, ge=1, description="Размер пула соединений (PostgreSQL/MySQL).")
+    max_overflow: int = Field(default=20, ge=0, description="Доп. соединения сверх pool_size при пиковой нагрузке.")
+    pool_recycle: int = Field(default=1800, ge=-1, description="Пересоздавать соединения старше N секунд (-1 - отключено).")
+    pool_pre_ping: bool = Field(default=True, description="Проверять соединение перед выдачей из пула.")
 
     @field_validator('pg_dsn', mode='before')
     @classmethod
@@ -143,8 +147,17 @@ class CoreAppSettings(BaseModel):
     
     setup_bot_commands_on_startup: bool = Field(default=True, description="Устанавливать команды бота при старте.")
     enable_startup_shutdown_notifications: bool = Field(default=True, description="Отправлять уведомления администраторам о запуске/остановке бота.")
+    module_migrations_mode: Literal["sync", "async", "skip"] = Field(
+        default="sync",
+        description="Миграции модулей при старте: sync - дождаться завершения, async - в фоне, skip - не выполнять."
+    )
     i18n: I18nSettings = Field(default_factory=I18nSettings)
 
+    @property
+    def i18n_cache_dir(self) -> Path:
+        """Каталог JSON-копий файлов переводов (в данных проекта, а не в дереве пакета)."""
+        return self.project_data_path / "Cache_data" / "i18n"
+
 class EnvironmentSettings(BaseSettings):
     CORE_PROJECT_DATA_PATH: Optional[Path] = Field(default=None, validation_alias=AliasChoices('SDB_CORE_PROJECT_DATA_PATH', 'CORE_PROJECT_DATA_PATH'))
     CORE_SUPER_ADMINS: Optional[str] = Field(default=None, validation_alias=AliasChoices('SDB_CORE_SUPER_ADMINS', 'CORE_SUPER_ADMINS'))
@@ -260,7 +273,11 @@ def load_app_settings() -> AppSettings:
         pg_dsn=env_s.DB_PG_DSN or db_yaml.get("pg_dsn"),
         mysql_dsn=env_s.DB_MYSQL_DSN or db_yaml.get("mysql_dsn"),
         echo_sql=env_s.DB_ECHO_SQL if env_s.DB_ECHO_SQL is not None else \
-                 db_yaml.get("echo_sql", DBSettings.model_fields["echo_sql"].default)
+                 db_yaml.get("echo_sql", DBSettings.model_fields["echo_sql"].default),
+        pool_size=db_yaml.get("pool_size", DBSettings.model_fields["pool_size"].default),
+        max_overflow=db_yaml.get("max_overflow", DBSettings.model_fields["max_overflow"].default),
+        pool_recycle=db_yaml.get("pool_recycle", DBSettings.model_fields["pool_recycle"].default),
+        pool_pre_ping=db_yaml.get("pool_pre_ping", DBSettings.model_fields["pool_pre_ping"].default)
     )
 
     cache_yaml = yaml_data.get("cache", {})
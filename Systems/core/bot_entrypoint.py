@@ -32,6 +32,8 @@ from Systems.core.services_provider import BotServicesProvider
 from Systems.core.module_loader import ModuleLoader
 from Systems.core.ui.handlers_core_ui import core_ui_router
 from Systems.core.i18n.middleware import I18nMiddleware
+from Systems.core.database.request_cache import RequestCacheMiddleware
+from Systems.core.database.module_migrations import ModuleMigrationManager
 from Systems.core.i18n.translator import Translator
 from Systems.core.security.command_dedup import CommandDedupMiddleware
 from Systems.core.users.middleware import UserStatusMiddleware
@@ -155,6 +157,7 @@ async def run_sdb_bot() -> int:
                            "Бот продолжит работу, но управление через PID-файл может быть нарушено.")
     try:
         services = BotServicesProvider(settings=settings)
+        services.logging_manager = logging_manager
         await services.setup_services()
         global_logger.success("✅ BotServicesProvider и все его базовые сервисы успешно инициализированы.")
 
@@ -188,9 +191,15 @@ async def run_sdb_bot() -> int:
             locales_dir=settings.core.i18n.locales_dir,
             domain=settings.core.i18n.domain,
             default_locale=settings.core.i18n.default_locale,
-            available_locales=settings.core.i18n.available_locales
+            available_locales=settings.core.i18n.available_locales,
+            cache_dir=settings.core.i18n_cache_dir
         )
-        dp.update.outer_middleware(I18nMiddleware(translator))
+        # Кэш ORM-объектов на время одного Update - регистрируется первым, чтобы быть доступным всем middleware
+        dp.update.outer_middleware(RequestCacheMiddleware())
+        global_logger.info("RequestCacheMiddleware зарегистрирован для всех Update.")
+
+        # events может быть недоступен (свойство бросает AttributeError) - тогда кэш языка живет только по TTL
+        dp.update.outer_middleware(I18nMiddleware(translator, events=getattr(services, "events", None)))
         global_logger.info("I18nMiddleware зарегистрирован для всех Update.")
 
         command_dedup_middleware = CommandDedupMiddleware()
@@ -245,6 +254,15 @@ async def run_sdb_bot() -> int:
         module_loader: ModuleLoader = services.modules
         await module_loader.initialize_and_setup_modules(dp=dp, bot=bot)
 
+        # Миграции модулей (каталог migrations/ модуля) - до начала polling; в режиме async идут в фоне
+        migration_manager = ModuleMigrationManager(services, mode=services.config.core.module_migrations_mode)
+        services.migration_manager = migration_manager
+        if migration_manager.register_modules(module_loader.get_loaded_modules_info()):
+            migration_results = await migration_manager.run_all_module_migrations()
+            failed_migrations = [name for name, ok in migration_results.items() if not ok]
+            if failed_migrations:
+                global_logger.error(f"Миграции модулей завершились с ошибкой: {', '.join(failed_migrations)}")
+
         num_enabled_plugins = len(module_loader.enabled_plugin_names)
         num_loaded_plugins = sum(1 for mi in module_loader.get_loaded_modules_info(include_system=False, include_plugins=True) if mi.is_enabled)
 
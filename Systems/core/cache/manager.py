@@ -3,7 +3,7 @@
 import asyncio
 import json
 import time
-from typing import Optional, Any, Union, TYPE_CHECKING
+from typing import Optional, Any, Union, Mapping, Tuple, TYPE_CHECKING
 from abc import ABC, abstractmethod
 
 # Условные импорты для Redis с правильной типизацией
@@ -57,6 +57,11 @@ class BaseCache(ABC):
     @abstractmethod
     async def clear(self) -> None: raise NotImplementedError
 
+    async def mset(self, items: Mapping[str, Tuple[Any, Optional[int]]]) -> None:
+        # Базовая реализация: поштучный set(). Бэкенды с сетевым RTT переопределяют её батчем.
+        for key, (value, ttl_seconds) in items.items():
+            await self.set(key, value, ttl_seconds=ttl_seconds)
+
 class MemoryCache(BaseCache):
     def __init__(self, maxsize: int = 1024, default_ttl: int = 300):
         self._default_ttl = default_ttl
@@ -94,7 +99,7 @@ class MemoryCache(BaseCache):
             if ttl_seconds is not None and ttl_seconds != self._cache.ttl: # type: ignore
                  # TTLCache имеет общий TTL, но можно хранить время истечения отдельно, если очень нужно.
                  # Пока оставляем как есть - используем общий TTL.
-                 logger.trace(f"MemoryCache (TTLCache) использует общий TTL ({self._cache.ttl} сек) для всех ключей.") # type: ignore
+                 logger.trace("MemoryCache (TTLCache) использует общий TTL ({} сек) для всех ключей.", self._cache.ttl) # type: ignore
             self._cache[key] = value
         elif isinstance(self._cache, dict):
             if len(self._cache) >= self._maxsize and key not in self._cache:
@@ -103,7 +108,7 @@ class MemoryCache(BaseCache):
                 try:
                     oldest_key = next(iter(self._cache))
                     del self._cache[oldest_key]
-                    logger.trace(f"MemoryCache достиг maxsize, удален ключ (FIFO-like): {oldest_key}")
+                    logger.trace("MemoryCache достиг maxsize, удален ключ (FIFO-like): {}", oldest_key)
                 except StopIteration: pass # Пустой словарь
             self._cache[key] = (value, time.time() + effective_ttl)
 
@@ -216,6 +221,23 @@ class RedisCache(BaseCache):
         except Exception as e_unexp: logger.error(f"RedisCache: Неожиданная ошибка SET для ключа '{key}': {e_unexp}")
 
 
+    async def mset(self, items: Mapping[str, Tuple[Any, Optional[int]]]) -> None:
+        # У нативного MSET нет TTL на ключ, поэтому шлем пачку SET k v EX ttl одним pipeline (один RTT).
+        if not self._redis_client or not items: return
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            for key, (value, ttl_seconds) in items.items():
+                try:
+                    json_value = json.dumps(value, ensure_ascii=False, default=str)
+                except (TypeError, ValueError) as e:
+                    logger.error(f"RedisCache: Ошибка сериализации для ключа '{key}' в MSET: {e}")
+                    continue
+                pipe.set(key, json_value, ex=ttl_seconds)
+            await pipe.execute()
+        except RedisError as e_redis: logger.error(f"RedisCache: Ошибка Redis при MSET ({len(items)} ключей): {e_redis}")
+        except Exception as e_unexp: logger.error(f"RedisCache: Неожиданная ошибка MSET ({len(items)} ключей): {e_unexp}")
+
+
     async def delete(self, key: str) -> bool:
         if not self._redis_client: return False
         try: 
@@ -307,25 +329,32 @@ class CacheManager:
 
     async def get(self, key: str, default: Optional[Any] = None) -> Optional[Any]:
         if not self.is_available() or self._cache_backend is None:
-            logger.trace(f"Кэш недоступен. get('{key}') вернет default ({default}).")
+            logger.trace("Кэш недоступен. get('{}') вернет default ({}).", key, default)
             return default
         return await self._cache_backend.get(key)
 
     async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
         if not self.is_available() or self._cache_backend is None:
-            logger.trace(f"Кэш недоступен. set('{key}', ...) не будет выполнено.")
+            logger.trace("Кэш недоступен. set('{}', ...) не будет выполнено.", key)
             return
         await self._cache_backend.set(key, value, ttl_seconds=ttl_seconds)
 
+    async def mset(self, items: Mapping[str, Tuple[Any, Optional[int]]]) -> None:
+        """Массовая запись: {key: (value, ttl_seconds)}. Для Redis выполняется одним pipeline."""
+        if not self.is_available() or self._cache_backend is None:
+            logger.trace("Кэш недоступен. mset({} ключей) не будет выполнено.", len(items))
+            return
+        await self._cache_backend.mset(items)
+
     async def delete(self, key: str) -> bool:
         if not self.is_available() or self._cache_backend is None:
-            logger.trace(f"Кэш недоступен. delete('{key}') вернет False.")
+            logger.trace("Кэш недоступен. delete('{}') вернет False.", key)
             return False
         return await self._cache_backend.delete(key)
 
     async def exists(self, key: str) -> bool:
         if not self.is_available() or self._cache_backend is None:
-            logger.trace(f"Кэш недоступен. exists('{key}') вернет False.")
+            logger.trace("Кэш недоступен. exists('{}') вернет False.", key)
             return False
         return await self._cache_backend.exists(key)
 
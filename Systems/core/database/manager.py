@@ -1,8 +1,10 @@
 # core/database/manager.py
 
+import asyncio
+import warnings
 from pathlib import Path
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, List, Type, Optional, TYPE_CHECKING
+from typing import AsyncGenerator, Dict, List, Type, Optional, TYPE_CHECKING
 
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
@@ -10,15 +12,87 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine
 )
+from sqlalchemy import event, inspect, text, Table
+from sqlalchemy.exc import SAWarning
+from sqlalchemy.schema import sort_tables
 from sqlalchemy.pool import NullPool
 from loguru import logger
 
 from .base import Base
+# Модели ядра должны быть зарегистрированы в Base.metadata до create_all и до создания
+# таблиц модулей (их внешние ключи ссылаются на sdb_users и т.д.)
+from . import core_models # noqa: F401
+from .core_models import SDB_CORE_TABLE_PREFIX
 from Systems.core.app_settings import DEFAULT_PROJECT_DATA_DIR_NAME
 
 if TYPE_CHECKING:
     from Systems.core.app_settings import DBSettings, AppSettings
 
+# PRAGMA для каждого нового соединения SQLite: WAL дает параллельное чтение при одном писателе,
+# synchronous=NORMAL в режиме WAL сокращает количество fsync.
+SQLITE_CONNECT_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "mmap_size=268435456",
+    "cache_size=-64000",
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_CONNECT_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+    finally:
+        cursor.close()
+
+def _group_tables_by_dependency_level(tables: List[Table]) -> Optional[List[List[Table]]]:
+    """
+    Разбивает таблицы на уровни по внешним ключам: таблицы одного уровня не зависят друг от друга,
+    а каждая таблица зависит только от таблиц предыдущих уровней.
+    Возвращает None при циклических зависимостях (уровни для них не определены).
+    """
+    table_set = set(tables)
+    levels_by_table: Dict[Table, int] = {}
+    with warnings.catch_warnings():
+        # На цикле sort_tables лишь предупреждает и возвращает произвольный порядок - цикл определяем сами ниже
+        warnings.simplefilter("ignore", SAWarning)
+        sorted_tables = sort_tables(tables)
+    for table in sorted_tables:
+        dependency_levels = []
+        for fk in table.foreign_keys:
+            referred_table = fk.column.table
+            if referred_table not in table_set or referred_table is table:
+                continue
+            referred_level = levels_by_table.get(referred_table)
+            if referred_level is None:
+                # Таблица, на которую ссылаемся, еще не получила уровень - значит, внешние ключи образуют цикл
+                return None
+            dependency_levels.append(referred_level)
+        levels_by_table[table] = max(dependency_levels) + 1 if dependency_levels else 0
+
+    levels: List[List[Table]] = []
+    for table, level in levels_by_table.items():
+        while len(levels) <= level:
+            levels.append([])
+        levels[level].append(table)
+    return levels
+
+
+def _collect_referenced_tables(tables: List[Table]) -> List[Table]:
+    """Возвращает таблицы вместе со всеми таблицами, на которые они ссылаются (транзитивно)."""
+    collected: Dict[Table, None] = {}
+    pending = list(tables)
+    while pending:
+        table = pending.pop()
+        if table in collected:
+            continue
+        collected[table] = None
+        pending.extend(fk.column.table for fk in table.foreign_keys)
+    return list(collected)
+
+
 class DBManager:
     def __init__(self, db_settings: 'DBSettings', app_settings: 'AppSettings'): # app_settings теперь обязателен
         self._db_settings: 'DBSettings' = db_settings
@@ -28,8 +102,15 @@ class DBManager:
         self._db_url: Optional[str] = None
 
         self._logger = logger.bind(service="DBManager")
+        # URL (и каталог для SQLite) готовятся синхронно при создании,
+        # чтобы initialize() занимался только асинхронной настройкой движка
+        self._db_url = self._build_db_url()
         self._logger.info(f"DBManager инициализирован для типа БД: {self._db_settings.type}")
 
+    @property
+    def db_url(self) -> str:
+        return self._build_db_url()
+
     def _build_db_url(self) -> str:
         if self._db_url:
             return self._db_url
@@ -83,17 +164,36 @@ class DBManager:
             self._logger.debug("DBManager (engine) уже был инициализирован.")
             return
 
-        db_url = self._build_db_url()
+        db_url = self.db_url
         self._logger.info(f"Инициализация асинхронного движка SQLAlchemy для URL: '{db_url[:db_url.find('://')+3]}...' (детали URL скрыты)")
         
         echo_sql = self._db_settings.echo_sql
 
+        engine_kwargs: dict
+        if self._db_settings.type == "sqlite":
+            # aiosqlite не выигрывает от пула - оставляем NullPool
+            engine_kwargs = {"poolclass": NullPool}
+        else:
+            # poolclass не указываем: SQLAlchemy сам выберет AsyncAdaptedQueuePool для async-движка
+            engine_kwargs = {
+                "pool_size": self._db_settings.pool_size,
+                "max_overflow": self._db_settings.max_overflow,
+                "pool_recycle": self._db_settings.pool_recycle,
+                "pool_pre_ping": self._db_settings.pool_pre_ping,
+            }
+            self._logger.info(
+                f"Пул соединений: pool_size={self._db_settings.pool_size}, "
+                f"max_overflow={self._db_settings.max_overflow}, pool_recycle={self._db_settings.pool_recycle}s"
+            )
+
         try:
             self._engine = create_async_engine(
                 db_url,
                 echo=echo_sql, 
-                poolclass=NullPool,
+                **engine_kwargs,
             )
+            if self._db_settings.type == "sqlite":
+                event.listen(self._engine.sync_engine, "connect", _apply_sqlite_pragmas)
             
             self._session_factory = async_sessionmaker(
                 bind=self._engine,
@@ -111,7 +211,7 @@ class DBManager:
 
     async def dispose(self) -> None:
         if self._engine:
-            self._logger.info("Закрытие SQLAlchemy AsyncEngine...")
+            self._logger.info(f"Закрытие SQLAlchemy AsyncEngine... Состояние пула: {self._engine.pool.status()}")
             try:
                 await self._engine.dispose()
                 self._logger.success("SQLAlchemy AsyncEngine успешно закрыт.")
@@ -131,7 +231,7 @@ class DBManager:
             raise RuntimeError(msg)
 
         session: AsyncSession = self._session_factory()
-        self._logger.trace(f"Сессия БД {id(session)} открыта.")
+        self._logger.trace("Сессия БД {} открыта.", id(session))
         try:
             yield session
         except Exception as e:
@@ -140,7 +240,22 @@ class DBManager:
             raise
         finally:
             await session.close()
-            self._logger.trace(f"Сессия БД {id(session)} закрыта.")
+            self._logger.trace("Сессия БД {} закрыта.", id(session))
+
+    @asynccontextmanager
+    async def read_only_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Сессия только для чтения: соединение работает в режиме AUTOCOMMIT,
+        поэтому нет BEGIN/ROLLBACK на каждый запрос. Не использовать для записи.
+        """
+        if not self._session_factory:
+            msg = "DBManager SessionFactory не инициализирована! Вызовите initialize() перед запросом сессии."
+            self._logger.critical(msg)
+            raise RuntimeError(msg)
+
+        async with self._session_factory() as session:
+            await session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+            yield session
 
     async def create_all_core_tables(self) -> None:
         if not self._engine:
@@ -150,7 +265,6 @@ class DBManager:
 
         self._logger.info("Запрос на создание всех таблиц ядра на основе Base.metadata...")
         async with self._engine.begin() as conn:
-            from Systems.core.database import core_models # noqa: F401
             await conn.run_sync(Base.metadata.create_all)
         self._logger.success("Все таблицы ядра (на основе текущего Base.metadata) успешно созданы (или уже существовали).")
 
@@ -163,24 +277,16 @@ class DBManager:
             self._logger.debug("Нет моделей для создания таблиц модуля (список пуст).")
             return
 
-        # Импортируем модели ядра ПЕРЕД извлечением таблиц модулей
-        # Это необходимо для того, чтобы SQLAlchemy знал о таблицах ядра (sdb_users, sdb_roles и т.д.)
-        # при создании foreign key в таблицах модулей
-        from Systems.core.database import core_models # noqa: F401
-        
         # Убеждаемся, что таблицы ядра созданы физически в БД перед созданием таблиц модулей
         # Проверяем наличие хотя бы одной таблицы ядра
-        from sqlalchemy import inspect, text
-        from Systems.core.database.core_models import SDB_CORE_TABLE_PREFIX
-        
         # Проверяем существование таблиц ядра в отдельной транзакции
         async with self._engine.begin() as check_conn:
             if self._db_settings.type == "sqlite":
                 result = await check_conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'sdb_%'"))
                 existing_core_tables = [row[0] for row in result.fetchall()]
             else:
-                inspector = inspect(self._engine.sync_engine)
-                existing_core_tables = [t for t in inspector.get_table_names() if t.startswith("sdb_")]
+                all_table_names = await check_conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+                existing_core_tables = [t for t in all_table_names if t.startswith("sdb_")]
         
         # Если таблиц ядра нет, создаем их (в отдельной транзакции)
         if not existing_core_tables:
@@ -201,21 +307,55 @@ class DBManager:
         table_names_str = ", ".join([table.name for table in tables_to_create])
         self._logger.info(f"Запрос на создание таблиц для модуля: [{table_names_str}]")
 
-        async with self._engine.begin() as conn:
-            # Важно: модели ядра уже импортированы выше, поэтому они в Base.metadata
-            # Таблицы ядра уже проверены и созданы выше, если их не было
-            # Используем create_all БЕЗ указания конкретных таблиц, чтобы SQLAlchemy
-            # мог правильно обработать все зависимости (foreign keys) между таблицами
-            # checkfirst=True гарантирует, что существующие таблицы не будут пересозданы
-            # Это создаст только те таблицы, которых еще нет в БД
-            await conn.run_sync(
-                lambda sync_conn: Base.metadata.create_all(
-                    bind=sync_conn, 
-                    checkfirst=True
-                )
-            )
+        # Вместе с таблицами модуля создаем (если их нет) и таблицы, на которые они ссылаются.
+        # checkfirst=True гарантирует, что существующие таблицы не будут пересозданы
+        tables_with_dependencies = _collect_referenced_tables(tables_to_create)
+        table_levels = self._plan_parallel_ddl(tables_with_dependencies, table_names_str)
+        if table_levels is None:
+            # Одна транзакция на все таблицы: при ошибке не остается частично созданного набора
+            async with self._engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all, tables=tables_with_dependencies, checkfirst=True)
+        else:
+            # Таблицы одного уровня зависимостей создаются параллельно, уровни - по порядку
+            for level_tables in table_levels:
+                await self._run_table_ddl_concurrently(level_tables, create=True)
         self._logger.success(f"Таблицы модуля [{table_names_str}] успешно созданы (или уже существовали).")
 
+    def _ddl_parallelism(self) -> int:
+        # SQLite допускает только одного писателя - там параллельный DDL ничего не дает
+        return 1 if self._db_settings.type == "sqlite" else self._db_settings.pool_size
+
+    def _plan_parallel_ddl(self, tables: List[Table], table_names_str: str) -> Optional[List[List[Table]]]:
+        """
+        Уровни зависимостей для параллельного DDL или None, если DDL выполняется
+        одной транзакцией (нет параллелизма или внешние ключи образуют цикл).
+        """
+        if self._ddl_parallelism() == 1:
+            return None
+        table_levels = _group_tables_by_dependency_level(tables)
+        if table_levels is None:
+            self._logger.warning(f"Циклические внешние ключи между таблицами [{table_names_str}]. DDL выполняется одной транзакцией.")
+        return table_levels
+
+    async def _run_table_ddl_concurrently(self, tables: List[Table], create: bool) -> None:
+        """
+        Выполняет CREATE/DROP для независимых таблиц параллельно, каждую в своей транзакции.
+        Атомарность набора таблиц теряется: при ошибке таблицы, обработанные до нее, остаются
+        созданными/удаленными (в т.ч. на PostgreSQL с транзакционным DDL).
+        """
+        assert self._engine is not None
+        semaphore = asyncio.Semaphore(self._ddl_parallelism())
+
+        async def _run_for_table(table: Table) -> None:
+            async with semaphore:
+                async with self._engine.begin() as conn:
+                    if create:
+                        await conn.run_sync(table.create, checkfirst=True)
+                    else:
+                        await conn.run_sync(table.drop, checkfirst=True)
+
+        await asyncio.gather(*(_run_for_table(table) for table in tables))
+
     async def drop_specific_module_tables(self, module_model_classes: List[Type[Base]]) -> None:
         if not self._engine:
             err_msg = "DBManager Engine не инициализирован. Невозможно удалить таблицы модуля."
@@ -231,6 +371,14 @@ class DBManager:
         
         self._logger.warning(f"ЗАПРОС НА УДАЛЕНИЕ ТАБЛИЦ МОДУЛЯ (ОПАСНО!): [{table_names_str}]")
         
-        async with self._engine.begin() as conn:
-            await conn.run_sync(Base.metadata.drop_all, tables=tables_to_drop_ordered)
+        table_levels = self._plan_parallel_ddl(tables_to_drop, table_names_str)
+        if table_levels is None:
+            # Одна транзакция на все таблицы: при ошибке таблицы модуля не остаются удаленными наполовину
+            async with self._engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all, tables=tables_to_drop_ordered)
+        else:
+            # Удаляем в обратном порядке зависимостей: сначала таблицы, на которые никто не ссылается.
+            # Каждая таблица - в своей транзакции: ошибка посередине оставит часть таблиц удаленной
+            for level_tables in reversed(table_levels):
+                await self._run_table_ddl_concurrently(level_tables, create=False)
         self._logger.success(f"Таблицы модуля [{table_names_str}] успешно УДАЛЕНЫ.")
\ No newline at end of file
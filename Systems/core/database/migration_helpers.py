@@ -0,0 +1,72 @@
+# core/database/migration_helpers.py
+"""
+Вспомогательные функции для миграций модулей: DDL и DML без долгих блокировок таблиц
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def create_index_concurrently(
+    op: Any,
+    index_name: str,
+    table_name: str,
+    columns: Sequence[str],
+    **kwargs: Any
+) -> None:
+    """
+    Создает индекс, не блокируя запись в таблицу (для PostgreSQL)
+    
+    На PostgreSQL выполняется CREATE INDEX CONCURRENTLY вне транзакции миграции
+    (autocommit_block), на остальных СУБД - обычный op.create_index.
+    
+    Args:
+        op: Объект alembic.op из скрипта миграции
+        index_name: Имя индекса
+        table_name: Имя таблицы
+        columns: Колонки индекса
+        **kwargs: Дополнительные аргументы op.create_index (unique и т.п.)
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(index_name, table_name, list(columns), postgresql_concurrently=True, **kwargs)
+    else:
+        op.create_index(index_name, table_name, list(columns), **kwargs)
+
+
+def batched_update(
+    connection: Connection,
+    sql: str,
+    batch_size: int = 1000,
+    params: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Выполняет UPDATE пачками с фиксацией после каждой пачки
+    
+    Запрос должен ограничивать пачку параметром :batch_size и исключать уже
+    обновленные строки, например:
+    UPDATE t SET flag = 1 WHERE id IN (SELECT id FROM t WHERE flag = 0 LIMIT :batch_size)
+    
+    Args:
+        connection: Соединение вне транзакции миграции (например, внутри autocommit_block)
+        sql: Текст UPDATE с параметром :batch_size
+        batch_size: Размер пачки
+        params: Дополнительные параметры запроса
+    
+    Returns:
+        Общее число обновленных строк
+    """
+    statement = text(sql)
+    bind_params = {**(params or {}), "batch_size": batch_size}
+    total = 0
+    while True:
+        rows = connection.execute(statement, bind_params).rowcount
+        connection.commit()
+        if rows <= 0:
+            break
+        total += rows
+        if rows < batch_size:  # Неполная пачка - подходящих строк больше нет
+            break
+    return total
@@ -0,0 +1,256 @@
+# core/database/module_migrations.py
+"""
+Система миграций БД для модулей
+"""
+
+import asyncio
+import importlib
+from pathlib import Path
+from typing import Awaitable, Iterable, List, Optional, Dict, Set, Tuple
+from loguru import logger
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from alembic import command
+from alembic import config as alembic_config
+from alembic.script import ScriptDirectory
+from alembic.runtime.migration import MigrationContext
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from Systems.core.services_provider import BotServicesProvider
+    from Systems.core.module_loader import ModuleInfo
+
+# Режимы запуска миграций: "sync" - ждать завершения, "async" - в фоне, "skip" - не выполнять
+MIGRATION_MODES = ("sync", "async", "skip")
+
+
+class ModuleMigrationManager:
+    """
+    Менеджер миграций для модулей
+    """
+    
+    def __init__(self, services_provider: 'BotServicesProvider', mode: str = "sync"):
+        if mode not in MIGRATION_MODES:
+            raise ValueError(f"Неизвестный режим миграций '{mode}', допустимые: {', '.join(MIGRATION_MODES)}")
+        self.services = services_provider
+        self.mode = mode
+        self._logger = logger.bind(service="ModuleMigrationManager")
+        self._migration_paths: Dict[str, Path] = {}
+        # Разобранный каталог ревизий и head по модулю; сбрасываются при повторной регистрации миграций
+        self._script_cache: Dict[str, ScriptDirectory] = {}
+        self._head_cache: Dict[str, Optional[str]] = {}
+        # Прогресс миграций по модулю: pending -> running -> succeeded/failed
+        self._status: Dict[str, str] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+    
+    def register_module_migrations(self, module_name: str, migrations_path: Path):
+        """Регистрирует путь к миграциям модуля"""
+        if migrations_path.exists() and migrations_path.is_dir():
+            self._migration_paths[module_name] = migrations_path
+            self._script_cache.pop(module_name, None)
+            self._head_cache.pop(module_name, None)
+            self._logger.info(f"Зарегистрированы миграции для модуля {module_name}: {migrations_path}")
+        else:
+            self._logger.warning(f"Путь к миграциям не существует: {migrations_path}")
+
+    def register_modules(self, modules: Iterable['ModuleInfo']) -> int:
+        """Регистрирует каталоги migrations/ загруженных модулей, возвращает число зарегистрированных"""
+        registered = 0
+        for module_info in modules:
+            migrations_path = module_info.path / "migrations"
+            if migrations_path.is_dir():
+                self.register_module_migrations(module_info.name, migrations_path)
+                registered += 1
+        return registered
+    
+    async def run_module_migrations(
+        self,
+        module_name: str,
+        target_revision: str = "head"
+    ) -> bool:
+        """
+        Выполняет миграции для модуля
+        
+        Args:
+            module_name: Имя модуля
+            target_revision: Целевая ревизия (по умолчанию "head")
+        
+        Returns:
+            True если миграции выполнены успешно
+        """
+        if module_name not in self._migration_paths:
+            self._logger.warning(f"Миграции для модуля {module_name} не зарегистрированы")
+            return False
+        
+        migrations_path = self._migration_paths[module_name]
+        
+        try:
+            # Создаем временную конфигурацию Alembic для модуля
+            module_alembic_cfg = alembic_config.Config()
+            module_alembic_cfg.set_main_option("script_location", str(migrations_path))
+            
+            # Получаем URL БД из сервисов
+            db_url = self.services.db.get_database_url()
+            module_alembic_cfg.set_main_option("sqlalchemy.url", db_url)
+            
+            # Выполняем миграции в потоке: command.upgrade синхронный и держит свое соединение на время DDL
+            await asyncio.to_thread(command.upgrade, module_alembic_cfg, target_revision)
+            
+            self._logger.success(f"Миграции модуля {module_name} выполнены до ревизии {target_revision}")
+            return True
+        
+        except Exception as e:
+            self._logger.error(f"Ошибка при выполнении миграций модуля {module_name}: {e}", exc_info=True)
+            return False
+    
+    async def get_module_migration_status(self, module_name: str) -> Dict:
+        """
+        Получает статус миграций модуля
+        
+        Returns:
+            Словарь с информацией о миграциях
+        """
+        if module_name not in self._migration_paths:
+            return {
+                "registered": False,
+                "current_revision": None,
+                "head_revision": None
+            }
+        
+        try:
+            _, head_revision = self._get_script_directory(module_name)
+            
+            # Получаем текущую ревизию из БД
+            async with self.services.db.get_session() as session:
+                context = MigrationContext.configure(await session.connection())
+                current_revision = context.get_current_revision()
+            
+            return {
+                "registered": True,
+                "current_revision": current_revision,
+                "head_revision": head_revision,
+                "is_up_to_date": current_revision == head_revision
+            }
+        
+        except Exception as e:
+            self._logger.error(f"Ошибка при получении статуса миграций модуля {module_name}: {e}")
+            return {
+                "registered": True,
+                "error": str(e)
+            }
+    
+    def _get_script_directory(self, module_name: str) -> Tuple[ScriptDirectory, Optional[str]]:
+        """Возвращает каталог ревизий модуля и его head (файлы ревизий разбираются один раз)"""
+        script = self._script_cache.get(module_name)
+        if script is None:
+            script_cfg = alembic_config.Config()
+            script_cfg.set_main_option("script_location", str(self._migration_paths[module_name]))
+            script = ScriptDirectory.from_config(script_cfg)
+            self._script_cache[module_name] = script
+            self._head_cache[module_name] = script.get_current_head()
+        return script, self._head_cache[module_name]
+    
+    def schedule_module_migrations(self, module_name: str) -> asyncio.Task:
+        """Запускает миграции модуля фоновой задачей (прогресс - get_migration_status_all)"""
+        task = self._tasks.get(module_name)
+        if task is not None and not task.done():
+            return task
+        return self._schedule(module_name, self._run_and_track(module_name))
+
+    def get_migration_status_all(self) -> Dict[str, str]:
+        """Возвращает статусы миграций модулей {module_name: pending|running|succeeded|failed}"""
+        return dict(self._status)
+
+    def _schedule(self, module_name: str, coro: Awaitable[bool]) -> asyncio.Task:
+        self._status[module_name] = "pending"
+        task = asyncio.create_task(coro, name=f"sdb-migrations-{module_name}")
+        self._tasks[module_name] = task
+        task.add_done_callback(
+            lambda done, name=module_name: self._tasks.pop(name, None) if self._tasks.get(name) is done else None
+        )
+        return task
+
+    async def _run_and_track(self, module_name: str) -> bool:
+        self._status[module_name] = "running"
+        success = False
+        try:
+            success = await self.run_module_migrations(module_name)
+            return success
+        finally:
+            self._status[module_name] = "succeeded" if success else "failed"
+    
+    async def _find_up_to_date_modules(self, module_names: List[str]) -> Set[str]:
+        """Модули, head которых уже записан в alembic_version (одним запросом на все модули)"""
+        if not module_names:
+            return set()
+        try:
+            async with self.services.db.get_session() as session:
+                result = await session.execute(text("SELECT version_num FROM alembic_version"))
+                applied_revisions = set(result.scalars().all())
+        except Exception as e:
+            # Таблицы еще нет (первый запуск) или БД недоступна - мигрируем все модули
+            self._logger.debug(f"Не удалось прочитать alembic_version: {e}")
+            return set()
+        if not applied_revisions:
+            return set()
+
+        up_to_date: Set[str] = set()
+        for module_name in module_names:
+            try:
+                _, head_revision = self._get_script_directory(module_name)
+            except Exception as e:
+                self._logger.warning(f"Не удалось прочитать ревизии модуля {module_name}: {e}")
+                continue
+            if head_revision is not None and head_revision in applied_revisions:
+                up_to_date.add(module_name)
+        return up_to_date
+    
+    async def run_all_module_migrations(self, concurrency: int = 4) -> Dict[str, bool]:
+        """
+        Выполняет миграции для всех зарегистрированных модулей
+        
+        В режиме "async" миграции запускаются фоновыми задачами и сразу возвращается
+        пустой словарь; в режиме "skip" миграции не выполняются.
+        
+        Args:
+            concurrency: Сколько модулей мигрируется одновременно (на SQLite всегда 1)
+        
+        Returns:
+            Словарь {module_name: success}
+        """
+        if self.mode == "skip":
+            self._logger.info("Миграции модулей пропущены (режим skip)")
+            return {}
+
+        all_module_names = list(self._migration_paths)
+        up_to_date = await self._find_up_to_date_modules(all_module_names)
+        for module_name in up_to_date:
+            self._status[module_name] = "succeeded"
+            self._logger.debug(f"Миграции модуля {module_name} уже на head, upgrade пропущен")
+        module_names = [name for name in all_module_names if name not in up_to_date]
+        if self.services.config.db.type == "sqlite":
+            # SQLite допускает одного писателя: параллельные upgrade упирались бы в "database is locked"
+            concurrency = 1
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def _run_bounded(module_name: str) -> bool:
+            async with semaphore:
+                return await self._run_and_track(module_name)
+
+        if self.mode == "async":
+            for module_name in module_names:
+                self._schedule(module_name, _run_bounded(module_name))
+            self._logger.info(f"Миграции {len(module_names)} модулей запущены в фоне")
+            return {}
+
+        for module_name in module_names:
+            self._status[module_name] = "pending"
+        outcomes = await asyncio.gather(*(_run_bounded(name) for name in module_names), return_exceptions=True)
+        results: Dict[str, bool] = {name: True for name in all_module_names}
+        for module_name, outcome in zip(module_names, outcomes):
+            if isinstance(outcome, BaseException):
+                self._logger.error(f"Ошибка при выполнении миграций модуля {module_name}: {outcome}")
+                outcome = False
+            results[module_name] = outcome
+        return results
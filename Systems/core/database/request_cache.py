@@ -0,0 +1,101 @@
+# core/database/request_cache.py
+
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy import select, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .base import Base
+
+REQUEST_CACHE_DATA_KEY = "request_cache"
+
+_MISSING = object()
+
+# Готовые SELECT по (модель, колонка) с bindparam - строятся один раз на пару
+_LOOKUP_STMTS: Dict[Tuple[Type[Base], str], Any] = {}
+
+
+def _lookup_stmt(model: Type[Base], column: Any) -> Any:
+    stmt_key = (model, column.key)
+    stmt = _LOOKUP_STMTS.get(stmt_key)
+    if stmt is None:
+        stmt = select(model).where(column == bindparam("lookup_value"))
+        _LOOKUP_STMTS[stmt_key] = stmt
+    return stmt
+
+
+class RequestCache:
+    """
+    Кэш ORM-объектов в пределах обработки одного Update (Unit-of-Work).
+    Позволяет middleware и хэндлерам переиспользовать уже загруженные строки
+    (например, пользователя по telegram_id) вместо повторных SELECT.
+    Кэшируется и отсутствие строки (None), чтобы не повторять пустой запрос.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self) -> None:
+        self._items: Dict[Tuple[Type[Base], str, Any], Optional[Base]] = {}
+
+    @staticmethod
+    def _make_key(model: Type[Base], value: Any, column: Optional[Any]) -> Tuple[Type[Base], str, Any]:
+        return (model, column.key if column is not None else "__pk__", value)
+
+    async def get_or_load(
+        self,
+        session: AsyncSession,
+        model: Type[Base],
+        value: Any,
+        column: Optional[Any] = None,
+    ) -> Optional[Base]:
+        """
+        Возвращает объект модели из кэша запроса или загружает его из БД.
+
+        Args:
+            session: Сессия, через которую выполняется загрузка при промахе.
+            model: ORM-класс.
+            value: Значение первичного ключа или колонки `column`.
+            column: Уникальная колонка для поиска (например, `User.telegram_id`).
+                    Если не указана, используется `session.get()` по первичному ключу.
+        """
+        key = self._make_key(model, value, column)
+        cached = self._items.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached  # type: ignore[return-value]
+
+        if column is None:
+            instance = await session.get(model, value)
+        else:
+            result = await session.execute(_lookup_stmt(model, column), {"lookup_value": value})
+            instance = result.scalars().first()
+        self._items[key] = instance
+        return instance
+
+    def put(self, model: Type[Base], value: Any, instance: Optional[Base], column: Optional[Any] = None) -> None:
+        """Кладет (или заменяет) объект в кэше запроса."""
+        self._items[self._make_key(model, value, column)] = instance
+
+    def invalidate(self, model: Type[Base], value: Any, column: Optional[Any] = None) -> None:
+        """Удаляет объект из кэша запроса (например, после изменения)."""
+        self._items.pop(self._make_key(model, value, column), None)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+class RequestCacheMiddleware(BaseMiddleware):
+    """
+    Создает новый RequestCache для каждого Update и кладет его в data["request_cache"].
+    Должен регистрироваться самым внешним, чтобы кэш был доступен остальным middleware.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        data[REQUEST_CACHE_DATA_KEY] = RequestCache()
+        return await handler(event, data)
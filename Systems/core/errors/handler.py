@@ -4,7 +4,9 @@
 """
 
 import traceback
-from typing import Optional, Dict, Any
+from functools import partial
+from typing import Optional, Dict, Any, Callable, Awaitable
+from weakref import WeakKeyDictionary
 from loguru import logger
 
 from aiogram import BaseMiddleware
@@ -18,6 +20,16 @@ from .exceptions import (
 )
 
 
+# Отправитель сообщения об ошибке: (текст, show_alert) -> None
+ErrorSender = Callable[..., Awaitable[None]]
+
+# (подстрока в тексте TelegramBadRequest, ответ пользователю) - проверяются по порядку
+_TELEGRAM_BAD_REQUEST_REPLIES = (
+    ("message is too long", "❌ Сообщение слишком длинное."),
+    ("can't parse", "❌ Ошибка форматирования сообщения."),
+)
+
+
 class ErrorHandlerMiddleware(BaseMiddleware):
     """
     Middleware для централизованной обработки ошибок
@@ -26,6 +38,21 @@ class ErrorHandlerMiddleware(BaseMiddleware):
     def __init__(self):
         super().__init__()
         self._logger = logger.bind(service="ErrorHandlerMiddleware")
+        # Таблица "класс исключения -> обработчик". Ищется по MRO, поэтому подклассы
+        # (например, TelegramBadRequest) попадают в обработчик ближайшего предка.
+        self._dispatch: Dict[type, Callable[[Any, ErrorSender], Awaitable[Any]]] = {
+            RateLimitError: self._handle_rate_limit_error,
+            PermissionError: self._handle_permission_error,
+            ValidationError: self._handle_validation_error,
+            DatabaseError: self._handle_database_error,
+            ModuleError: self._handle_module_error,
+            TelegramRetryAfter: self._handle_telegram_retry_after,
+            TelegramBadRequest: self._handle_telegram_bad_request,
+            TelegramAPIError: self._handle_telegram_api_error,
+            SDBException: self._handle_sdb_exception,
+        }
+        # Кэш результата поиска по MRO для уже встречавшихся классов исключений
+        self._resolved_handlers: 'WeakKeyDictionary[type, Callable[[Any, ErrorSender], Awaitable[Any]]]' = WeakKeyDictionary()
     
     async def __call__(
         self,
@@ -36,85 +63,79 @@ class ErrorHandlerMiddleware(BaseMiddleware):
         """Обработка с перехватом исключений"""
         try:
             return await handler(event, data)
-        except RateLimitError as e:
-            return await self._handle_rate_limit_error(e, event)
-        except PermissionError as e:
-            return await self._handle_permission_error(e, event)
-        except ValidationError as e:
-            return await self._handle_validation_error(e, event)
-        except DatabaseError as e:
-            return await self._handle_database_error(e, event)
-        except ModuleError as e:
-            return await self._handle_module_error(e, event)
-        except TelegramRetryAfter as e:
-            return await self._handle_telegram_retry_after(e, event)
-        except TelegramAPIError as e:
-            return await self._handle_telegram_api_error(e, event)
-        except SDBException as e:
-            return await self._handle_sdb_exception(e, event)
         except Exception as e:
-            return await self._handle_unexpected_error(e, event)
+            return await self._resolve_error_handler(type(e))(e, self._pick_sender(event))
+
+    def _resolve_error_handler(self, error_cls: type) -> Callable[[Any, ErrorSender], Awaitable[Any]]:
+        """Находит обработчик для класса исключения (с кэшированием)"""
+        error_handler = self._resolved_handlers.get(error_cls)
+        if error_handler is None:
+            error_handler = self._handle_unexpected_error
+            for cls in error_cls.__mro__:
+                candidate = self._dispatch.get(cls)
+                if candidate is not None:
+                    error_handler = candidate
+                    break
+            self._resolved_handlers[error_cls] = error_handler
+        return error_handler
     
-    async def _handle_rate_limit_error(self, error: RateLimitError, event: Update):
+    async def _handle_rate_limit_error(self, error: RateLimitError, send: ErrorSender):
         """Обработка ошибки rate limit"""
         self._logger.warning(f"Rate limit error: {error.message}")
         message = f"⏳ Слишком много запросов. Подождите {error.retry_after} секунд."
-        return await self._send_error_message(event, message)
+        return await send(message)
     
-    async def _handle_permission_error(self, error: PermissionError, event: Update):
+    async def _handle_permission_error(self, error: PermissionError, send: ErrorSender):
         """Обработка ошибки прав доступа"""
         self._logger.warning(f"Permission error: {error.message} (permission: {error.permission})")
         message = f"❌ У вас нет прав для выполнения этого действия.\n{error.message}"
-        return await self._send_error_message(event, message, show_alert=True)
+        return await send(message, show_alert=True)
     
-    async def _handle_validation_error(self, error: ValidationError, event: Update):
+    async def _handle_validation_error(self, error: ValidationError, send: ErrorSender):
         """Обработка ошибки валидации"""
         self._logger.warning(f"Validation error: {error.message} (field: {error.field})")
         message = f"❌ Ошибка валидации: {error.message}"
-        return await self._send_error_message(event, message)
+        return await send(message)
     
-    async def _handle_database_error(self, error: DatabaseError, event: Update):
+    async def _handle_database_error(self, error: DatabaseError, send: ErrorSender):
         """Обработка ошибки БД"""
         self._logger.error(f"Database error: {error.message}", exc_info=True)
         message = "❌ Произошла ошибка при работе с базой данных. Попробуйте позже."
-        return await self._send_error_message(event, message)
+        return await send(message)
     
-    async def _handle_module_error(self, error: ModuleError, event: Update):
+    async def _handle_module_error(self, error: ModuleError, send: ErrorSender):
         """Обработка ошибки модуля"""
         self._logger.error(f"Module error in {error.module_name}: {error.message}", exc_info=True)
         message = f"❌ Ошибка модуля {error.module_name}: {error.message}"
-        return await self._send_error_message(event, message)
+        return await send(message)
     
-    async def _handle_telegram_retry_after(self, error: TelegramRetryAfter, event: Update):
+    async def _handle_telegram_retry_after(self, error: TelegramRetryAfter, send: ErrorSender):
         """Обработка Telegram RetryAfter"""
         self._logger.warning(f"Telegram RetryAfter: {error.retry_after} seconds")
         # Не отправляем сообщение пользователю, просто логируем
         return None
     
-    async def _handle_telegram_api_error(self, error: TelegramAPIError, event: Update):
+    async def _handle_telegram_api_error(self, error: TelegramAPIError, send: ErrorSender):
         """Обработка ошибки Telegram API"""
         self._logger.error(f"Telegram API error: {error.message}", exc_info=True)
-        
-        # Специальная обработка для некоторых типов ошибок
-        if isinstance(error, TelegramBadRequest):
-            if "message is too long" in str(error).lower():
-                message = "❌ Сообщение слишком длинное."
-            elif "can't parse" in str(error).lower():
-                message = "❌ Ошибка форматирования сообщения."
-            else:
-                message = "❌ Ошибка при отправке сообщения."
-        else:
-            message = "❌ Временная ошибка Telegram API. Попробуйте позже."
-        
-        return await self._send_error_message(event, message)
+        return await send("❌ Временная ошибка Telegram API. Попробуйте позже.")
+
+    async def _handle_telegram_bad_request(self, error: TelegramBadRequest, send: ErrorSender):
+        """Обработка TelegramBadRequest: ответ выбирается по тексту ошибки"""
+        self._logger.error(f"Telegram API error: {error.message}", exc_info=True)
+        error_message_lower = (error.message or "").lower()
+        for needle, reply in _TELEGRAM_BAD_REQUEST_REPLIES:
+            if needle in error_message_lower:
+                return await send(reply)
+        return await send("❌ Ошибка при отправке сообщения.")
     
-    async def _handle_sdb_exception(self, error: SDBException, event: Update):
+    async def _handle_sdb_exception(self, error: SDBException, send: ErrorSender):
         """Обработка кастомного исключения SDB"""
         self._logger.error(f"SDB Exception [{error.error_code}]: {error.message}", exc_info=True)
         message = f"❌ Ошибка: {error.message}"
-        return await self._send_error_message(event, message)
+        return await send(message)
     
-    async def _handle_unexpected_error(self, error: Exception, event: Update):
+    async def _handle_unexpected_error(self, error: Exception, send: ErrorSender):
         """Обработка неожиданных ошибок"""
         error_traceback = traceback.format_exc()
         self._logger.critical(
@@ -124,24 +145,39 @@ class ErrorHandlerMiddleware(BaseMiddleware):
         
         # В продакшене не показываем детали пользователю
         message = "❌ Произошла неожиданная ошибка. Администратор уведомлен."
-        return await self._send_error_message(event, message)
+        return await send(message)
     
+    def _pick_sender(self, event: Update) -> ErrorSender:
+        """Один раз определяет, куда отвечать на событие (message или callback_query)"""
+        message = getattr(event, "message", None)
+        if message:
+            return partial(self._send_error_message, message.answer, False)
+        callback_query = getattr(event, "callback_query", None)
+        if callback_query:
+            return partial(self._send_error_message, callback_query.answer, True)
+        return self._send_nothing
+
     async def _send_error_message(
-        self, 
-        event: Update, 
-        message: str, 
+        self,
+        answer: Callable[..., Awaitable[Any]],
+        supports_alert: bool,
+        message: str,
         show_alert: bool = False
     ) -> Optional[Any]:
         """Отправляет сообщение об ошибке пользователю"""
         try:
-            if event.message:
-                await event.message.answer(message)
-            elif event.callback_query:
-                await event.callback_query.answer(message, show_alert=show_alert)
+            if supports_alert:
+                await answer(message, show_alert=show_alert)
+            else:
+                await answer(message)
         except Exception as e:
             self._logger.error(f"Failed to send error message: {e}")
         return None
 
+    async def _send_nothing(self, message: str, show_alert: bool = False) -> None:
+        """Событие без message/callback_query - отвечать некуда"""
+        return None
+
 
 async def handle_error(event: ErrorEvent, exception: Exception):
     """
@@ -1,8 +1,7 @@
 # core/events/dispatcher.py
 
 import asyncio
-from collections import defaultdict
-from typing import Callable, Any, Coroutine, List, Dict, Optional, Union, TYPE_CHECKING # Добавил Optional, Union
+from typing import Callable, Any, Coroutine, List, Dict, Optional, Tuple, Union, TYPE_CHECKING # Добавил Optional, Union
 from loguru import logger
 
 if TYPE_CHECKING:
@@ -18,14 +17,25 @@ class EventDispatcher:
     и подписываться на них, не имея прямых зависимостей друг от друга.
     """
 
-    def __init__(self):
+    def __init__(self, max_concurrent: int = 32):
         # Словарь, где ключ - строковое имя (тип) события,
-        # значение - список асинхронных функций-обработчиков (корутин).
-        self._listeners: Dict[str, List[Callable[..., Coroutine[Any, Any, None]]]] = defaultdict(list)
+        # значение - кортеж асинхронных функций-обработчиков (корутин).
+        # Кортежи неизменяемы: subscribe/unsubscribe подменяют их целиком (copy-on-write),
+        # поэтому publish может итерировать текущий снимок без копирования.
+        self._listeners: Dict[str, Tuple[Callable[..., Coroutine[Any, Any, None]], ...]] = {}
+        # Ограничение числа одновременно выполняемых обработчиков одного события,
+        # чтобы массовая рассылка события не исчерпала пул соединений БД.
+        self._max_concurrent = max_concurrent
+        self._max_concurrent_by_event: Dict[str, int] = {}
         self._logger = logger.bind(service="EventDispatcher")
-        self._logger.info("EventDispatcher инициализирован.")
-
-    def subscribe(self, event_type: str, handler: Callable[..., Coroutine[Any, Any, None]]) -> None:
+        self._logger.info(f"EventDispatcher инициализирован (max_concurrent={max_concurrent}).")
+
+    def subscribe(
+        self,
+        event_type: str,
+        handler: Callable[..., Coroutine[Any, Any, None]],
+        max_concurrent: Optional[int] = None
+    ) -> None:
         """
         Подписывает асинхронный обработчик на указанный тип события.
 
@@ -35,6 +45,8 @@ class EventDispatcher:
             handler: Асинхронная функция-обработчик (корутина), которая будет вызвана при публикации события.
                      Обработчик должен принимать те же позиционные (*args) и именованные (**kwargs) аргументы,
                      что и передаются в метод publish().
+            max_concurrent: Если указан, задает для этого события собственный лимит
+                            одновременно выполняемых обработчиков (вместо общего).
 
         Raises:
             TypeError: Если переданный обработчик не является асинхронной функцией (корутиной).
@@ -45,7 +57,9 @@ class EventDispatcher:
             self._logger.error(err_msg)
             raise TypeError(err_msg) # Делаем проверку строже
 
-        self._listeners[event_type].append(handler)
+        self._listeners[event_type] = self._listeners.get(event_type, ()) + (handler,)
+        if max_concurrent is not None:
+            self._max_concurrent_by_event[event_type] = max_concurrent
         self._logger.debug(f"Обработчик '{handler.__qualname__}' успешно подписан на событие '{event_type}'.")
 
     def unsubscribe(self, event_type: str, handler: Callable[..., Coroutine[Any, Any, None]]) -> None:
@@ -56,20 +70,31 @@ class EventDispatcher:
             event_type: Имя (тип) события.
             handler: Функция-обработчик, которую необходимо отписать.
         """
-        try:
-            self._listeners[event_type].remove(handler)
-            self._logger.debug(f"Обработчик '{handler.__qualname__}' успешно отписан от события '{event_type}'.")
-        except ValueError: # Обработчик не найден в списке для данного события
+        current_handlers = self._listeners.get(event_type)
+        if current_handlers is None: # Такого типа события вообще нет в _listeners
+            self._logger.warning(f"Попытка отписаться от несуществующего типа события '{event_type}'.")
+            return
+        if handler not in current_handlers: # Обработчик не найден для данного события
             self._logger.warning(f"Попытка отписать необъявленный обработчик '{handler.__qualname__}' "
                                  f"от события '{event_type}'. Обработчик не найден.")
-        except KeyError: # Такого типа события вообще нет в _listeners
-            self._logger.warning(f"Попытка отписаться от несуществующего типа события '{event_type}'.")
+            return
+
+        # Удаляем только первое вхождение (как list.remove)
+        index = current_handlers.index(handler)
+        remaining_handlers = current_handlers[:index] + current_handlers[index + 1:]
+        if remaining_handlers:
+            self._listeners[event_type] = remaining_handlers
+        else:
+            del self._listeners[event_type]
+            self._max_concurrent_by_event.pop(event_type, None)
+        self._logger.debug(f"Обработчик '{handler.__qualname__}' успешно отписан от события '{event_type}'.")
 
     async def publish(self, event_type: str, *args: Any, **kwargs: Any) -> List[Union[Any, Exception]]:
         """
         Асинхронно публикует событие, вызывая всех подписанных на него обработчиков.
 
-        Обработчики для одного события запускаются конкурентно с использованием `asyncio.gather()`.
+        Обработчики для одного события запускаются конкурентно с использованием `asyncio.gather()`
+        (единственный подписчик вызывается напрямую, без `gather`).
         Если какой-либо обработчик вызывает исключение, это исключение будет поймано,
         залогировано, и вместо результата этого обработчика в возвращаемом списке будет объект исключения.
         Остальные обработчики продолжат выполняться.
@@ -85,36 +110,55 @@ class EventDispatcher:
             Если обработчик вызвал исключение, в списке на его месте будет объект этого исключения.
             Если подписчиков на событие нет, возвращается пустой список.
         """
-        if event_type not in self._listeners or not self._listeners[event_type]:
+        handlers_to_call = self._listeners.get(event_type)
+        if not handlers_to_call:
             self._logger.trace(f"Нет подписчиков для события '{event_type}'. Публикация пропущена.")
             return []
 
-        handlers_to_call = self._listeners[event_type]
-        # Формируем строку с аргументами для лога, чтобы не показывать слишком много данных
-        args_repr = f"{len(args)} positional"
-        kwargs_repr = f"{len(kwargs)} keyword"
-        
-        self._logger.info(f"Публикация события '{event_type}' для {len(handlers_to_call)} подписчиков. "
-                          f"Аргументы: ({args_repr}), ({kwargs_repr}).")
+        # Аргументы передаются отдельно: loguru форматирует строку, только если уровень INFO реально пишется
+        self._logger.info(
+            "Публикация события '{}' для {} подписчиков. Аргументы: ({} positional), ({} keyword).",
+            event_type, len(handlers_to_call), len(args), len(kwargs)
+        )
+
+        # Быстрый путь для единственного подписчика: без asyncio.gather и его служебных future
+        if len(handlers_to_call) == 1:
+            single_handler = handlers_to_call[0]
+            try:
+                return [await single_handler(*args, **kwargs)]
+            except Exception as e:
+                self._log_handler_error(single_handler, event_type, e)
+                return [e]
 
-        # Создаем список корутин для вызова
-        tasks = [handler(*args, **kwargs) for handler in handlers_to_call]
-        
         # Запускаем все обработчики конкурентно и собираем результаты или исключения
-        results: List[Union[Any, Exception]] = await asyncio.gather(*tasks, return_exceptions=True)
+        max_concurrent = self._max_concurrent_by_event.get(event_type, self._max_concurrent)
+        if len(handlers_to_call) <= max_concurrent:
+            coroutines = (handler(*args, **kwargs) for handler in handlers_to_call)
+        else:
+            # Обработчиков больше лимита - ограничиваем число одновременно выполняемых семафором
+            semaphore = asyncio.Semaphore(max_concurrent)
+
+            async def _bounded(handler: Callable[..., Coroutine[Any, Any, Any]]) -> Any:
+                async with semaphore:
+                    return await handler(*args, **kwargs)
+
+            coroutines = (_bounded(handler) for handler in handlers_to_call)
+        results: List[Union[Any, Exception]] = await asyncio.gather(*coroutines, return_exceptions=True)
 
         # Логируем ошибки, если они произошли в обработчиках
         for i, result_or_exc in enumerate(results):
             if isinstance(result_or_exc, Exception):
-                failed_handler_name = handlers_to_call[i].__qualname__
-                self._logger.error(
-                    f"Ошибка в обработчике события '{failed_handler_name}' при обработке события '{event_type}': "
-                    f"{type(result_or_exc).__name__}('{result_or_exc}')",
-                    exc_info=result_or_exc # Для полного трейсбека исключения
-                )
+                self._log_handler_error(handlers_to_call[i], event_type, result_or_exc)
         
         return results
 
+    def _log_handler_error(self, handler: Callable[..., Any], event_type: str, exc: Exception) -> None:
+        self._logger.error(
+            f"Ошибка в обработчике события '{handler.__qualname__}' при обработке события '{event_type}': "
+            f"{type(exc).__name__}('{exc}')",
+            exc_info=exc # Для полного трейсбека исключения
+        )
+
     def get_listeners_count(self, event_type: Optional[str] = None) -> Union[int, Dict[str, int]]:
         """
         Возвращает количество подписчиков.
@@ -122,11 +166,12 @@ class EventDispatcher:
         Если `event_type` не указан (None), возвращает словарь {event_type: count} для всех событий.
         """
         if event_type:
-            return len(self._listeners.get(event_type, []))
+            return len(self._listeners.get(event_type, ()))
         else:
             return {etype: len(handler_list) for etype, handler_list in self._listeners.items() if handler_list}
 
     async def dispose(self) -> None: # Сделаем async, если в будущем понадобится асинхронная очистка
         """Очищает всех подписчиков. Полезно при остановке или перезагрузке системы."""
         self._listeners.clear()
+        self._max_concurrent_by_event.clear()
         self._logger.info("EventDispatcher очищен (все подписчики и списки событий удалены).")
\ No newline at end of file
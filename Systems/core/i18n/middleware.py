@@ -1,7 +1,11 @@
 # core/i18n/middleware.py
 
-from typing import Callable, Dict, Any, Awaitable, Optional
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, Dict, Any, Awaitable, Optional, Tuple, TYPE_CHECKING
 from aiogram import BaseMiddleware
+from loguru import logger
 from aiogram.types import TelegramObject, User as AiogramUser # User из aiogram.types
 
 # Импортируем наш Translator и AppSettings (для дефолтного языка и списка доступных)
@@ -9,6 +13,13 @@ from .translator import Translator
 from Systems.core.app_settings import settings as sdb_settings # Глобальные настройки
 from Systems.core.database.core_models import User as DBUser # Наша модель User из БД
 from sqlalchemy.ext.asyncio import AsyncSession # Для работы с БД
+from Systems.core.database.request_cache import REQUEST_CACHE_DATA_KEY, RequestCache
+
+if TYPE_CHECKING:
+    from Systems.core.events.dispatcher import EventDispatcher
+
+# Событие смены языка пользователем. Аргументы: telegram_id (int), locale (Optional[str]).
+LOCALE_CHANGED_EVENT = "sdb:i18n:locale_changed"
 
 # Для доступа к BotServicesProvider из workflow_data диспетчера (если он там есть)
 # from Systems.core.services_provider import BotServicesProvider
@@ -19,13 +30,68 @@ class I18nMiddleware(BaseMiddleware):
     Middleware для определения языка пользователя и предоставления
     инструментов локализации (gettext) в хэндлеры.
     """
-    def __init__(self, translator: Translator):
+    def __init__(
+        self,
+        translator: Translator,
+        events: Optional['EventDispatcher'] = None,
+        locale_cache_maxsize: int = 10_000,
+        locale_cache_ttl: float = 300.0,
+    ):
         super().__init__()
         self.translator = translator
         self.default_locale = translator.default_locale
-        self.available_locales = translator.available_locales
+        # frozenset - проверки `in` на каждый Update за O(1)
+        self.available_locales = frozenset(translator.available_locales)
         # logger здесь можно получить из data, если BotServicesProvider его передает, или создать свой
 
+        # Готовый набор ключей data для каждого языка (user_locale, gettext, ngettext, translator):
+        # на Update - один data.update(), без создания замыканий
+        self._context_by_locale: Dict[str, Dict[str, Any]] = {}
+        for locale in {*self.available_locales, self.default_locale}:
+            self._build_locale_context(locale)
+
+        # Кэш определенного языка: {telegram_id: (locale, время записи по monotonic)}.
+        # Язык меняется редко, поэтому не ходим в БД на каждый Update.
+        self._locale_cache: 'OrderedDict[int, Tuple[str, float]]' = OrderedDict()
+        self._locale_cache_maxsize = locale_cache_maxsize
+        self._locale_cache_ttl = locale_cache_ttl
+        if events is not None:
+            events.subscribe(LOCALE_CHANGED_EVENT, self._on_locale_changed)
+
+    def _build_locale_context(self, locale: str) -> Dict[str, Any]:
+        locale_context = {
+            "user_locale": locale,
+            "gettext": partial(self.translator.gettext, locale=locale),
+            "ngettext": partial(self.translator.ngettext, locale=locale),
+            "translator": self.translator,
+        }
+        self._context_by_locale[locale] = locale_context
+        return locale_context
+
+    def invalidate(self, telegram_id: int) -> None:
+        """Сбрасывает закэшированный язык пользователя (вызывать после смены языка)."""
+        self._locale_cache.pop(telegram_id, None)
+
+    async def _on_locale_changed(self, telegram_id: int, locale: Optional[str] = None) -> None:
+        self.invalidate(telegram_id)
+
+    def _get_cached_locale(self, telegram_id: int) -> Optional[str]:
+        cached = self._locale_cache.get(telegram_id)
+        if cached is None:
+            return None
+        locale, stored_at = cached
+        if time.monotonic() - stored_at > self._locale_cache_ttl:
+            del self._locale_cache[telegram_id]
+            return None
+        self._locale_cache.move_to_end(telegram_id)
+        return locale
+
+    def _store_cached_locale(self, telegram_id: int, locale: str) -> None:
+        self._locale_cache[telegram_id] = (locale, time.monotonic())
+        self._locale_cache.move_to_end(telegram_id)
+        while len(self._locale_cache) > self._locale_cache_maxsize:
+            self._locale_cache.popitem(last=False)
+
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
@@ -38,34 +104,40 @@ class I18nMiddleware(BaseMiddleware):
         
         user_locale: str = self.default_locale # По умолчанию язык системы
 
-        if aiogram_event_user:
+        cached_locale = self._get_cached_locale(aiogram_event_user.id) if aiogram_event_user else None
+        if cached_locale is not None:
+            user_locale = cached_locale
+        elif aiogram_event_user:
             # Пытаемся получить язык пользователя из нашей БД
             # Для этого нужен доступ к DBManager или сессии
             # Предположим, что BotServicesProvider (services) доступен в data
             services = data.get("services_provider") # Имя ключа зависит от того, как мы его положили в Dispatcher
             
-            db_user: Optional[DBUser] = None
             if services and hasattr(services, 'db'):
                 try:
-                    async with services.db.get_session() as session: # type: AsyncSession
-                        # Ищем пользователя по telegram_id
-                        from sqlalchemy import select # Ленивый импорт
-                        stmt = select(DBUser).where(DBUser.telegram_id == aiogram_event_user.id)
-                        result = await session.execute(stmt)
-                        db_user = result.scalars().first()
+                    async with services.db.read_only_session() as session: # type: AsyncSession
+                        request_cache = data.get(REQUEST_CACHE_DATA_KEY)
+                        if request_cache is None:
+                            # RequestCacheMiddleware не зарегистрирован - создаем кэш запроса здесь
+                            request_cache = data[REQUEST_CACHE_DATA_KEY] = RequestCache()
+                        # Загружаем пользователя через кэш запроса: UserStatusMiddleware переиспользует этот объект
+                        db_user = await request_cache.get_or_load(session, DBUser, aiogram_event_user.id, DBUser.telegram_id)
+                        db_user_found = db_user is not None
+                        db_lang_code: Optional[str] = db_user.preferred_language_code if db_user is not None else None
                         
-                        if db_user and db_user.preferred_language_code and db_user.preferred_language_code in self.available_locales:
-                            user_locale = db_user.preferred_language_code
-                        elif db_user and not db_user.preferred_language_code:
+                        if db_user_found and db_lang_code and db_lang_code in self.available_locales:
+                            user_locale = db_lang_code
+                        elif db_user_found and not db_lang_code:
                             # Если у пользователя в БД нет языка, но есть язык в Telegram и он поддерживается
                             if aiogram_event_user.language_code and aiogram_event_user.language_code in self.available_locales:
                                 user_locale = aiogram_event_user.language_code
                                 # Можно обновить язык в БД для этого пользователя
                                 # db_user.preferred_language_code = user_locale
                                 # await session.commit() # ОСТОРОЖНО: commit в middleware
-                        elif not db_user: # Если пользователя нет в БД
+                        elif not db_user_found: # Если пользователя нет в БД
                             if aiogram_event_user.language_code and aiogram_event_user.language_code in self.available_locales:
                                 user_locale = aiogram_event_user.language_code
+                    self._store_cached_locale(aiogram_event_user.id, user_locale)
                 except Exception as e:
                     # logger.error(f"Ошибка получения языка пользователя из БД для TG ID {aiogram_event_user.id}: {e}")
                     # Используем логгер из data, если он там есть
@@ -77,17 +149,13 @@ class I18nMiddleware(BaseMiddleware):
                  if aiogram_event_user.language_code and aiogram_event_user.language_code in self.available_locales:
                      user_locale = aiogram_event_user.language_code
         
-        # Сохраняем определенный язык в data для доступа в хэндлерах
-        data["user_locale"] = user_locale
-        
-        # Предоставляем хэндлерам удобные функции для перевода
-        # Они будут использовать user_locale, сохраненный в data
-        # Это обертки, чтобы не передавать locale каждый раз
-        data["gettext"] = lambda message_key, **kwargs: self.translator.gettext(message_key, user_locale, **kwargs)
-        data["ngettext"] = lambda singular_key, plural_key, count, **kwargs: self.translator.ngettext(singular_key, plural_key, count, user_locale, **kwargs)
-        
-        # Также можно передать сам объект translator, если это удобнее
-        data["translator"] = self.translator 
+        # Сохраняем определенный язык в data для доступа в хэндлерах вместе с
+        # заранее подготовленными функциями перевода (partial, чтобы не передавать locale каждый раз)
+        # и самим объектом translator
+        locale_context = self._context_by_locale.get(user_locale)
+        if locale_context is None:
+            locale_context = self._build_locale_context(user_locale)
+        data.update(locale_context)
         
         # data.get("logger", logger).debug(f"I18nMiddleware: Установлен язык '{user_locale}' для TG ID {aiogram_event_user.id if aiogram_event_user else 'N/A'}.")
         
@@ -1,10 +1,120 @@
 # core/i18n/translator.py
 
+import json
+import os
+import string
+import sys
+import threading
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Set, Tuple, Union
 from loguru import logger
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml: разбор в C
+except ImportError:  # pragma: no cover - PyYAML собран без libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+_MISSING = object()
+
+# Предел кэша отсутствующих ключей: при переполнении он очищается (защита от произвольных ключей)
+_MISSING_KEYS_MAXSIZE = 10_000
+
+
+def _plural_index_one_other(n: int) -> int:
+    """en и похожие: 1 -> 0 (one), иначе 1 (other)"""
+    return 0 if n == 1 else 1
+
+
+def _plural_index_east_slavic(n: int) -> int:
+    """ru/uk (CLDR): 1, 21, 31... -> 0 (one); 2-4, 22-24... -> 1 (few); иначе 2 (many)"""
+    n10 = n % 10
+    n100 = n % 100
+    if n10 == 1 and n100 != 11:
+        return 0
+    if 2 <= n10 <= 4 and not 12 <= n100 <= 14:
+        return 1
+    return 2
+
+
+# Правила выбора формы множественного числа по языку: count -> индекс формы
+_PLURAL_RULES: Dict[str, Callable[[int], int]] = {
+    "en": _plural_index_one_other,
+    "ru": _plural_index_east_slavic,
+    "uk": _plural_index_east_slavic,
+    "ua": _plural_index_east_slavic,  # файл переводов украинского языка называется ua.yaml
+}
+
+# Суффикс JSON-копии YAML файла переводов (аналог .mo для .po): ru.yaml -> ru.yaml.json
+_SIDECAR_SUFFIX = ".json"
+
+
+def _read_translations_file(yaml_file: Path, cache_dir: Optional[Path] = None) -> Any:
+    """
+    Читает файл переводов. Если в cache_dir есть JSON-копия не старее YAML, читается она
+    (один вызов json.loads); иначе разбирается YAML и копия перезаписывается.
+    Без cache_dir копия не используется.
+    """
+    sidecar = cache_dir / (yaml_file.name + _SIDECAR_SUFFIX) if cache_dir is not None else None
+    if sidecar is not None:
+        try:
+            if sidecar.stat().st_mtime_ns >= yaml_file.stat().st_mtime_ns:
+                return json.loads(sidecar.read_bytes())
+        except (OSError, ValueError):
+            pass  # Копии нет, она устарела или повреждена - читаем YAML
+
+    # Файл читается целиком одним read(); libyaml разбирает непрерывный буфер (UTF-8 определяется по байтам)
+    translations = yaml.load(yaml_file.read_bytes(), Loader=_YamlLoader) or {}
+
+    if sidecar is not None and isinstance(translations, dict):
+        try:
+            dumped = json.dumps(translations, ensure_ascii=False)
+            # Не-строковые ключи YAML (числа, yes/no) JSON превратил бы в строки - такую копию не пишем
+            if json.loads(dumped) == translations:
+                sidecar.parent.mkdir(parents=True, exist_ok=True)
+                sidecar.write_text(dumped, encoding='utf-8')
+        except (OSError, TypeError, ValueError) as e:
+            # Каталог только для чтения или значения не сериализуются в JSON - работаем без копии
+            logger.trace(f"Не удалось записать кэш переводов '{sidecar}': {e}")
+    return translations
+
+
+def _is_count_only_template(template: str) -> bool:
+    if "{{" in template or "}}" in template:
+        return False
+    try:
+        fields = {
+            (field_name, format_spec, conversion)
+            for _, field_name, format_spec, conversion in string.Formatter().parse(template)
+            if field_name is not None
+        }
+    except ValueError:
+        return False  # Некорректный шаблон - пусть ошибку обработает обычный путь
+    return fields == {("count", "", None)}
+
+
+class _Fmt:
+    """Заранее подготовленный шаблон перевода с плейсхолдерами ({name})."""
+    __slots__ = ("s", "count_only")
+
+    def __init__(self, s: str):
+        self.s = s
+        # Единственный плейсхолдер - "{count}" (без спецификаторов и экранированных скобок):
+        # ngettext подставляет его через str.replace вместо format_map
+        self.count_only = _is_count_only_template(s)
+
+    def __call__(self, kwargs: Dict[str, Any]) -> str:
+        # format_map не копирует kwargs в новый dict, в отличие от format(**kwargs)
+        return self.s.format_map(kwargs)
+
+
+def _compile_translation(value: Any) -> Union[Any, _Fmt]:
+    """Строки с '{' оборачиваются в _Fmt, остальные значения хранятся как есть."""
+    if isinstance(value, str) and "{" in value:
+        return _Fmt(value)
+    return value
+
 class Translator:
     """
     Сервис для работы с переводами (локализацией) строк.
@@ -17,6 +127,8 @@ class Translator:
         domain: str = "bot",  # Имя домена переводов (не используется для YAML, но оставлено для совместимости)
         default_locale: str = "ru",
         available_locales: Optional[List[str]] = None,
+        eager_load: bool = False,
+        cache_dir: Optional[Path] = None,
     ):
         """
         Инициализирует транслятор.
@@ -27,22 +139,42 @@ class Translator:
             default_locale: Язык по умолчанию, если перевод для языка пользователя не найден.
             available_locales: Список поддерживаемых языков (например, ['en', 'uk', 'ru']).
                                Если None, попытается определить из YAML файлов в locales_dir.
+            eager_load: Загрузить все переводы сразу (например, перед fork воркеров).
+                        По умолчанию язык загружается при первом обращении к нему.
+            cache_dir: Каталог для JSON-копий файлов переводов (ускоряют повторную загрузку).
+                       Если None, копии не используются. Дерево locales_dir не изменяется.
         """
         self.locales_dir = locales_dir
+        self.cache_dir = cache_dir
         self.domain = domain
-        self.default_locale = default_locale
+        self.default_locale = sys.intern(default_locale)
         self._translations: Dict[str, Dict[str, str]] = {} # Кэш загруженных переводов: {locale: {key: value}}
+        # Параллельный кэш: {locale: {key: str | _Fmt}} - признак шаблона вычисляется один раз при загрузке
+        self._compiled: Dict[str, Dict[str, Union[str, _Fmt]]] = {}
+        # Итоговые словари {locale: {**default, **locale}}: fallback на дефолтный язык уже учтен
+        self._effective: Dict[str, Dict[str, Union[str, _Fmt]]] = {}
+        # Общий для всех языков пул строк-значений (одинаковые переводы хранятся одним объектом)
+        self._canonical_values: Dict[str, str] = {}
+        # (locale, key), для которых перевода нет: предупреждение пишется один раз
+        self._missing_keys: Set[Tuple[str, str]] = set()
+        # Блокировки загрузки по языкам: одновременные первые обращения не разбирают файл дважды
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._load_locks_guard = threading.Lock()
 
         if available_locales:
-            self.available_locales = available_locales
+            self.available_locales = [sys.intern(locale) for locale in available_locales]
         else:
             # Пытаемся определить доступные языки по YAML файлам в locales_dir
             self.available_locales = []
-            if self.locales_dir.is_dir():
-                for item in self.locales_dir.iterdir():
-                    if item.is_file() and item.suffix == ".yaml":
-                        locale_name = item.stem  # Имя файла без расширения (en, uk, ru)
-                        self.available_locales.append(locale_name)
+            # Один проход os.scandir: тип записи берется из readdir, без отдельного stat на файл
+            try:
+                with os.scandir(self.locales_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".yaml") and entry.name != ".yaml" and entry.is_file():
+                            locale_name = entry.name[:-5]  # Имя файла без расширения (en, uk, ru)
+                            self.available_locales.append(sys.intern(locale_name))
+            except (FileNotFoundError, NotADirectoryError):
+                pass
             if not self.available_locales:
                  logger.warning(f"Не найдены YAML файлы переводов в {self.locales_dir}. "
                                 f"Локализация может не работать.")
@@ -53,15 +185,35 @@ class Translator:
         logger.info(f"Translator инициализирован. Locales dir: '{self.locales_dir}', Domain: '{self.domain}', "
                     f"Default: '{self.default_locale}', Available: {self.available_locales}")
         
-        # Предзагрузка переводов
-        self.load_all_translations()
+        # Правило множественного числа для каждого языка выбирается один раз.
+        # Для языков без своего правила (de, es...) - общее "one/other", а не правило языка по умолчанию
+        self._plural_rules: Dict[str, Callable[[int], int]] = {
+            locale: _PLURAL_RULES.get(locale, _plural_index_one_other) for locale in self.available_locales
+        }
+        # Неподдерживаемый язык получает тексты языка по умолчанию - и его правило
+        self._default_plural_rule = _PLURAL_RULES.get(self.default_locale, _plural_index_one_other)
+
+        # Переводы загружаются лениво при первом gettext() для языка
+        if eager_load:
+            self.load_all_translations()
 
 
     def load_translation(self, locale: str) -> Optional[Dict[str, str]]:
         """Загружает или возвращает из кэша словарь переводов для указанного языка."""
-        if locale in self._translations:
-            return self._translations[locale]
-        
+        translations = self._translations.get(locale, _MISSING)
+        if translations is not _MISSING:
+            return translations
+
+        with self._load_locks_guard:
+            load_lock = self._load_locks.setdefault(locale, threading.Lock())
+        with load_lock:
+            translations = self._translations.get(locale, _MISSING)
+            if translations is not _MISSING:
+                return translations  # Загружено другим потоком, пока ждали блокировку
+            return self._load_translation_unlocked(locale)
+
+    def _load_translation_unlocked(self, locale: str) -> Optional[Dict[str, str]]:
+        """Читает файл переводов языка. Вызывается под блокировкой языка."""
         if locale not in self.available_locales:
             logger.trace(f"Язык '{locale}' не поддерживается или для него нет файлов перевода.")
             return None
@@ -76,12 +228,14 @@ class Translator:
                     return self.load_translation(self.default_locale)
                 return None
             
-            with open(yaml_file, 'r', encoding='utf-8') as f:
-                translations = yaml.safe_load(f) or {}
+            translations = _read_translations_file(yaml_file, self.cache_dir)
             
             # Конвертируем формат "key = value" в словарь, если нужно
             # Если YAML уже в формате словаря, используем его как есть
             if isinstance(translations, dict):
+                translations = self._canonicalize(translations)
+                # _compiled заполняется первым: gettext смотрит в него без блокировки
+                self._compiled[locale] = {key: _compile_translation(value) for key, value in translations.items()}
                 self._translations[locale] = translations
                 logger.debug(f"Переводы для языка '{locale}' успешно загружены ({len(translations)} ключей).")
                 return translations
@@ -96,13 +250,56 @@ class Translator:
                 return self.load_translation(self.default_locale)
             return None
 
+    def _canonicalize(self, translations: Dict[Any, Any]) -> Dict[Any, Any]:
+        """
+        Интернирует ключи и заменяет одинаковые строки-значения (в т.ч. между языками)
+        одним объектом: меньше памяти, а сравнение ключей при поиске идет по идентичности.
+        """
+        canon = self._canonical_values
+        return {
+            (sys.intern(key) if key.__class__ is str else key):
+                (canon.setdefault(value, value) if value.__class__ is str else value)
+            for key, value in translations.items()
+        }
+
     def load_all_translations(self) -> None:
         """Предзагружает все доступные переводы."""
         logger.info(f"Предзагрузка всех доступных переводов ({self.available_locales})...")
-        for lang in self.available_locales:
-            self.load_translation(lang)
+        if len(self.available_locales) > 1:
+            # Чтение файлов (и JSON-копий) перекрывается между языками; блокировки языков - в load_translation
+            with ThreadPoolExecutor(max_workers=min(8, len(self.available_locales)),
+                                    thread_name_prefix="sdb-i18n-load") as executor:
+                list(executor.map(self.load_translation, self.available_locales))
+        else:
+            for lang in self.available_locales:
+                self.load_translation(lang)
         logger.info(f"Загружено переводов для {len(self._translations)} языков.")
 
+    def _get_compiled(self, locale: str) -> Optional[Dict[str, Union[str, _Fmt]]]:
+        """Возвращает подготовленные переводы языка, при необходимости загружая их."""
+        compiled = self._compiled.get(locale)
+        if compiled is None and self.load_translation(locale) is not None:
+            compiled = self._compiled.get(locale)
+        return compiled
+
+    def _build_effective(self, locale: str) -> Dict[str, Union[str, _Fmt]]:
+        """
+        Собирает словарь языка поверх переводов дефолтного языка.
+        Кэшируется только для известных языков; для остальных возвращается словарь дефолтного.
+        """
+        if locale != self.default_locale and locale not in self.available_locales:
+            # Неизвестный язык - отдаем словарь дефолтного, не кэшируя произвольные коды
+            return self._effective.get(self.default_locale) or self._build_effective(self.default_locale)
+
+        default_compiled = self._get_compiled(self.default_locale) or {}
+        if locale == self.default_locale:
+            effective = default_compiled
+        else:
+            compiled = self._get_compiled(locale)
+            effective = {**default_compiled, **compiled} if compiled else dict(default_compiled)
+        self._effective[locale] = effective
+        return effective
+
     def gettext(self, message_key: str, locale: str, **kwargs: Any) -> str:
         """
         Получает переведенную строку по ключу для указанного языка.
@@ -116,59 +313,98 @@ class Translator:
         Returns:
             Переведенная строка или сам ключ, если перевод не найден
         """
-        # Загружаем переводы для указанного языка
-        translations = self._translations.get(locale)
-        if not translations:
-            translations = self.load_translation(locale)
-        
-        # Если перевод не найден, пытаемся использовать дефолтный язык
-        if not translations or message_key not in translations:
-            if locale != self.default_locale:
-                default_translations = self._translations.get(self.default_locale)
-                if not default_translations:
-                    default_translations = self.load_translation(self.default_locale)
-                if default_translations and message_key in default_translations:
-                    translations = default_translations
-                    logger.trace(f"Использован перевод из дефолтного языка '{self.default_locale}' для ключа '{message_key}'")
-        
-        # Получаем переведенный текст
-        if translations and message_key in translations:
-            translated_text = translations[message_key]
-        else:
-            # Если перевод не найден, возвращаем ключ
-            logger.warning(f"Перевод не найден для ключа '{message_key}' (locale: {locale}). Возвращается ключ.")
-            translated_text = message_key
+        # Частые случаи (обычная строка, шаблон с kwargs) обрабатываются здесь,
+        # остальные (промах, шаблон без kwargs, ошибка форматирования) - в _translate
+        effective = self._effective.get(locale)
+        if effective is None:
+            effective = self._build_effective(locale)
+        entry = effective.get(message_key, _MISSING)
+        if entry.__class__ is str:
+            return entry
+        if entry.__class__ is _Fmt and kwargs:
+            try:
+                return entry(kwargs)
+            except (KeyError, IndexError):
+                pass
+        return self._translate(message_key, locale, kwargs)
+
+    def _translate(self, message_key: str, locale: str, kwargs: Dict[str, Any]) -> str:
+        """Реализация gettext: kwargs передается словарем и идет в format_map без копирования."""
+        # Один поиск по ключу: словарь языка уже содержит переводы дефолтного языка
+        effective = self._effective.get(locale)
+        if effective is None:
+            effective = self._build_effective(locale)
+        entry = effective.get(message_key, _MISSING)
+
+        if entry is _MISSING:
+            # Если перевод не найден, возвращаем ключ (о промахе предупреждаем один раз)
+            missing_key = (locale, message_key)
+            if missing_key not in self._missing_keys:
+                if len(self._missing_keys) >= _MISSING_KEYS_MAXSIZE:
+                    self._missing_keys.clear()
+                self._missing_keys.add(missing_key)
+                logger.warning("Перевод не найден для ключа '{}' (locale: {}). Возвращается ключ.", message_key, locale)
+            return message_key
+
+        if entry.__class__ is not _Fmt:
+            # Нет плейсхолдеров - форматирование не требуется
+            return entry
+        if not kwargs:
+            return entry.s
 
         try:
-            # Применяем форматирование, если есть kwargs
-            return translated_text.format(**kwargs) if kwargs else translated_text
+            # Применяем форматирование
+            return entry(kwargs)
         except (KeyError, IndexError) as e_format:
-            logger.warning(f"Ошибка форматирования для ключа '{message_key}' (locale: {locale}): {e_format}. "
-                           f"Переведенный текст: '{translated_text}', kwargs: {kwargs}")
-            return translated_text # Возвращаем неформатированный текст в случае ошибки
+            # Аргументы отдельно: строка (и repr kwargs) собирается loguru, только если запись выводится
+            logger.warning("Ошибка форматирования для ключа '{}' (locale: {}): {}. Переведенный текст: '{}', kwargs: {}",
+                           message_key, locale, e_format, entry.s, kwargs)
+            return entry.s # Возвращаем неформатированный текст в случае ошибки
 
-    def ngettext(self, singular_key: str, plural_key: str, count: int, locale: str, **kwargs: Any) -> str:
+    def ngettext(
+        self,
+        singular_key: str,
+        plural_key: str,
+        count: int,
+        locale: str,
+        many_key: Optional[str] = None,
+        **kwargs: Any
+    ) -> str:
         """
         Получает переведенную строку с учетом множественного числа.
         
         Args:
-            singular_key: Ключ для единственного числа
-            plural_key: Ключ для множественного числа
+            singular_key: Ключ для единственного числа (1, а для ru/ua также 21, 31...)
+            plural_key: Ключ для множественного числа (для ru/ua - форма "2-4")
             count: Количество для определения формы
             locale: Код языка
+            many_key: Ключ формы "много" для ru/ua (5-20, 25...). Если не указан, используется plural_key
             **kwargs: Параметры для форматирования строки
             
         Returns:
             Переведенная строка с учетом числа
         """
-        # Для простоты используем singular_key если count == 1, иначе plural_key
-        # В будущем можно добавить поддержку правил множественного числа для разных языков
-        key_to_use = singular_key if count == 1 else plural_key
-        
-        # Добавляем count в kwargs для форматирования
-        format_kwargs = {**kwargs, 'count': count}
+        plural_rule = self._plural_rules.get(locale, self._default_plural_rule)
+        form_index = plural_rule(abs(count))
+        if form_index == 0:
+            key_to_use = singular_key
+        elif form_index == 2 and many_key is not None:
+            key_to_use = many_key
+        else:
+            key_to_use = plural_key
         
-        return self.gettext(key_to_use, locale, **format_kwargs)
+        if not kwargs:
+            # Частый случай: шаблон с единственным {count} - str.replace вместо format_map
+            effective = self._effective.get(locale)
+            if effective is None:
+                effective = self._build_effective(locale)
+            entry = effective.get(key_to_use)
+            if entry.__class__ is _Fmt and entry.count_only:
+                return entry.s.replace("{count}", str(count))
+
+        # kwargs - собственный словарь этого вызова, count добавляется в него без копирования
+        kwargs['count'] = count
+        return self._translate(key_to_use, locale, kwargs)
 
     # Можно добавить методы для получения переводов для конкретного пользователя,
     # если язык пользователя известен сервису.
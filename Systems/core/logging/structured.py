@@ -4,11 +4,97 @@
 """
 
 import json
+import re
 import sys
+import threading
+import traceback
 from typing import Any, Dict, Optional
-from datetime import datetime
 from loguru import logger
 
+# Условный импорт orjson (C-расширение, сериализует сразу в bytes)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None  # type: ignore
+    ORJSON_AVAILABLE = False
+
+
+def _dumps_json_bytes(data: Dict[str, Any]) -> bytes:
+    """Сериализует запись лога в JSON (bytes, UTF-8); несериализуемые значения extra приводятся к str"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str)
+    return json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+
+
+# Разметка цветов loguru (<red>, </b>, ...) с экранирующими обратными слешами - тот же шаблон, что у loguru
+_MARKUP_TAG_RE = re.compile(r"(\\*)(</?(?:[fb]g\s)?[^<>\s]*>)")
+
+
+def _escape_as_format_template(text: str) -> str:
+    """Превращает готовый текст в шаблон format loguru, который выводит этот текст без изменений"""
+    text = text.replace("{", "{{").replace("}", "}}")
+    # N слешей перед тегом loguru выводит как N // 2, а нечетное число делает тег обычным текстом
+    return _MARKUP_TAG_RE.sub(lambda m: "\\" * (2 * len(m.group(1)) + 1) + m.group(2), text)
+
+
+def _build_log_dict(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Общие поля JSON-записи лога (каждое поле record читается один раз)"""
+    log_data = {
+        "timestamp": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "module": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+    }
+    extra = record["extra"]
+    if extra:
+        log_data.update(extra)
+    exception = record["exception"]
+    if exception:
+        log_data["exception"] = {
+            "type": exception.type.__name__ if exception.type else None,
+            "value": str(exception.value) if exception.value is not None else None,
+            "traceback": "".join(
+                traceback.format_exception(exception.type, exception.value, exception.traceback)
+            ) if exception.type else None
+        }
+    return log_data
+
+
+# Буфер строки лога на поток: JSON и перевод строки собираются в нем без новой bytes на каждую запись
+_scratch = threading.local()
+
+
+def _json_stdout_sink(message) -> None:
+    """Sink loguru: пишет запись одной JSON-строкой прямо в sys.stdout.buffer"""
+    payload = getattr(_scratch, "buf", None)
+    if payload is None:
+        payload = _scratch.buf = bytearray()
+    payload.clear()
+    payload += _dumps_json_bytes(_build_log_dict(message.record))
+    payload += b"\n"
+    # write() копирует данные, поэтому буфер можно переиспользовать сразу после вызова
+    stream = sys.stdout
+    buffer = getattr(stream, "buffer", None)
+    if buffer is not None:
+        buffer.write(payload)
+        buffer.flush()
+    else:
+        # Поток без байтового буфера (например, подмененный в тестах)
+        stream.write(payload.decode("utf-8"))
+
+
+def _json_file_format(record: Dict[str, Any]) -> str:
+    """
+    format= для файлового handler'а (нужна ротация, поэтому не callable-sink).
+    loguru ожидает от format шаблон, а не готовый текст, поэтому JSON возвращается
+    шаблоном без полей: скобки и теги разметки экранируются и при подстановке дают сам JSON.
+    record не изменяется - остальные handler'ы получают его в исходном виде.
+    """
+    return _escape_as_format_template(_dumps_json_bytes(_build_log_dict(record)).decode("utf-8")) + "\n"
+
 
 class StructuredLogger:
     """
@@ -26,38 +112,20 @@ class StructuredLogger:
             # Удаляем стандартный handler
             logger.remove()
             
-            # Добавляем JSON handler
+            # Добавляем JSON handler (sink сам пишет готовую JSON-строку, без serialize=True)
             logger.add(
-                sys.stdout,
-                format=self._json_formatter,
-                serialize=True,
+                self._json_sink,
                 level="DEBUG"
             )
     
     def _json_formatter(self, record: Dict[str, Any]) -> str:
         """Форматирует запись лога в JSON"""
-        log_data = {
-            "timestamp": datetime.fromtimestamp(record["time"].timestamp()).isoformat(),
-            "level": record["level"].name,
-            "message": record["message"],
-            "module": record.get("name", ""),
-            "function": record.get("function", ""),
-            "line": record.get("line", 0),
-        }
-        
-        # Добавляем дополнительные поля
-        if "extra" in record:
-            log_data.update(record["extra"])
-        
-        # Добавляем exception info если есть
-        if "exception" in record:
-            log_data["exception"] = {
-                "type": record["exception"].type.__name__ if record["exception"] else None,
-                "value": str(record["exception"].value) if record["exception"] else None,
-                "traceback": record["exception"].traceback if record["exception"] else None
-            }
-        
-        return json.dumps(log_data, indent=self.indent, ensure_ascii=False)
+        log_data = _build_log_dict(record)
+        return json.dumps(log_data, indent=self.indent, ensure_ascii=False, default=str)
+
+    def _json_sink(self, message) -> None:
+        """Sink loguru: выводит запись, отформатированную _json_formatter"""
+        sys.stdout.write(self._json_formatter(message.record) + "\n")
     
     def bind(self, **kwargs):
         """Привязывает дополнительные поля к логгеру"""
@@ -85,20 +153,7 @@ def setup_structured_logging(
     
     if json_output:
         # JSON формат для консоли
-        logger.add(
-            sys.stdout,
-            format=lambda record: json.dumps({
-                "timestamp": datetime.fromtimestamp(record["time"].timestamp()).isoformat(),
-                "level": record["level"].name,
-                "message": record["message"],
-                "module": record.get("name", ""),
-                "function": record.get("function", ""),
-                "line": record.get("line", 0),
-                **record.get("extra", {})
-            }, ensure_ascii=False),
-            serialize=True,
-            level=level
-        )
+        logger.add(_json_stdout_sink, level=level)
     else:
         # Стандартный формат
         logger.add(
@@ -111,18 +166,8 @@ def setup_structured_logging(
     if log_file:
         logger.add(
             log_file,
-            format=lambda record: json.dumps({
-                "timestamp": datetime.fromtimestamp(record["time"].timestamp()).isoformat(),
-                "level": record["level"].name,
-                "message": record["message"],
-                "module": record.get("name", ""),
-                "function": record.get("function", ""),
-                "line": record.get("line", 0),
-                **record.get("extra", {})
-            }, ensure_ascii=False),
-            serialize=True,
+            format=_json_file_format,
             rotation=rotation,
             retention=retention,
             level="DEBUG"  # В файл пишем все
         )
-
@@ -1,45 +1,314 @@
 # core/logging_manager.py
 import asyncio
-import shutil
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Any, TYPE_CHECKING
+from collections import deque
+from types import MappingProxyType
+from typing import Optional, Any, Awaitable, Callable, Deque, Dict, List, Set, Tuple, TYPE_CHECKING
 
 from loguru import logger as global_logger 
-import parsedatetime as pdt 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler 
-from apscheduler.triggers.cron import CronTrigger
+
+# Условный импорт zstandard (быстрее zlib при сопоставимой степени сжатия)
+try:
+    import zstandard
+    ZSTANDARD_AVAILABLE = True
+except ImportError:
+    zstandard = None  # type: ignore
+    ZSTANDARD_AVAILABLE = False
 
 if TYPE_CHECKING:
     from Systems.core.app_settings import AppSettings
 
+_MONTH_NAMES_EN = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+# Расписание фоновых задач (секунды от полуночи UTC; эпоха Unix начинается в полночь UTC)
+_HOUR_SECONDS = 3600
+_DAY_SECONDS = 24 * _HOUR_SECONDS
+_CLEANUP_OFFSET_SECONDS = 3 * _HOUR_SECONDS + 30 * 60  # 03:30 UTC
+
+
+def _seconds_until_next_run(now_ts: float, period: int, offset: int = 0) -> float:
+    """Секунды от now_ts до ближайшего момента t > now_ts, для которого (t - offset) кратно period."""
+    return period - ((now_ts - offset) % period)
+
+
+_SIZE_UNITS = {
+    "": 1, "b": 1,
+    "kb": 1000, "mb": 1000 ** 2, "gb": 1000 ** 3, "tb": 1000 ** 4,
+    "kib": 1024, "mib": 1024 ** 2, "gib": 1024 ** 3, "tib": 1024 ** 4,
+}
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([a-z]*)\s*$", re.IGNORECASE)
+
+
+def _parse_size(size_str: str) -> Optional[int]:
+    """'100 MB' -> 100_000_000 байт (KB/MB - десятичные, KiB/MiB - двоичные). None, если строка не распознана."""
+    match = _SIZE_RE.match(size_str or "")
+    if not match:
+        return None
+    multiplier = _SIZE_UNITS.get(match.group(2).lower())
+    if multiplier is None:
+        return None
+    return int(float(match.group(1)) * multiplier)
+
+
+def _raise_walk_error(error: OSError) -> None:
+    raise error
+
+
+def _fast_rmtree(path: str) -> None:
+    """
+    Рекурсивно удаляет дерево каталогов снизу вверх.
+    os.walk уже разделил записи на файлы и каталоги (по данным readdir),
+    поэтому на каждую запись приходится один unlink/rmdir без лишних stat.
+    """
+    join = os.path.join
+    unlink = os.unlink
+    for root, dir_names, file_names in os.walk(path, topdown=False, onerror=_raise_walk_error):
+        for name in file_names:
+            unlink(join(root, name))
+        for name in dir_names:
+            dir_path = join(root, name)
+            # Символическая ссылка на каталог попадает в dir_names, но удаляется как файл
+            if os.path.islink(dir_path):
+                unlink(dir_path)
+            else:
+                os.rmdir(dir_path)
+    os.rmdir(path)
+
+
+def _build_log_keep_sets(cutoff_dt: datetime, now_dt: datetime):
+    """
+    Наборы имен директорий (год / месяц / день), которые нужно сохранить при очистке:
+    все дни от даты отсечения до завтрашнего дня (запас на расхождение часов).
+    Возвращает (годы, (год, месяц), (год, месяц, день), частично хранимые (год, месяц)).
+    """
+    first_day = cutoff_dt.date()
+    last_day = now_dt.date() + timedelta(days=1)
+    keep_days = set()
+    day = first_day
+    while day <= last_day:
+        keep_days.add((f"{day.year:04d}", f"{day.month:02d}", f"{day.day:02d}"))
+        day += timedelta(days=1)
+    keep_months = {(year, month) for year, month, _ in keep_days}
+    keep_years = {year for year, _ in keep_months}
+    # Только в первом и последнем месяце периода есть дни, которые нужно удалять
+    partial_months = {
+        (f"{first_day.year:04d}", f"{first_day.month:02d}"),
+        (f"{last_day.year:04d}", f"{last_day.month:02d}"),
+    }
+    return keep_years, keep_months, keep_days, partial_months
+
+
+def _compress_rotated_log(rotated_path: Path) -> None:
+    """Сжимает ротированный лог-файл (zstd, если доступен, иначе zip) и удаляет исходник."""
+    try:
+        if ZSTANDARD_AVAILABLE:
+            with open(rotated_path, "rb") as fin, open(f"{rotated_path}.zst", "wb") as fout:
+                zstandard.ZstdCompressor(level=3, threads=-1).copy_stream(fin, fout)
+        else:
+            with zipfile.ZipFile(f"{rotated_path}.zip", "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.write(rotated_path, arcname=rotated_path.name)
+        os.unlink(rotated_path)
+    except Exception as e:
+        print(f"[LoggingManager] Ошибка сжатия лог-файла '{rotated_path}': {e}", file=sys.stderr)
+
+
+# Неизменяемые параметры файлового sink, общие для всех часовых файлов.
+# Между пересозданиями sink меняются только writer (путь), уровень и backtrace/diagnose.
+_FILE_SINK_KWARGS = MappingProxyType({
+    "format": "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}",
+    "enqueue": False,  # Буферизацию и поток записи обеспечивает _BufferedLogFileWriter
+})
+
+
+class _BufferedLogFileWriter:
+    """
+    Файловый sink для loguru: несколько буферов в памяти и один поток записи.
+
+    Записи дописываются в текущий ("заполняемый") буфер; заполненный буфер
+    (buffer_size байт или старше flush_interval секунд) передается потоку записи
+    и пишется одним write(), а логирующие потоки продолжают писать в свободный буфер.
+    Если свободных буферов нет, логирующий поток ждет - память ограничена
+    buffer_count * buffer_size (в отличие от неограниченной очереди enqueue=True).
+    Ротация по размеру выполняется здесь же (как rotation у loguru), а сжатие
+    ротированного файла - в отдельном потоке, чтобы не задерживать запись новых логов.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        rotation_size: Optional[int] = None,
+        buffer_size: int = 512 * 1024,
+        buffer_count: int = 4,
+        flush_interval: float = 0.2,
+    ):
+        self.path = path
+        self._rotation_size = rotation_size
+        self._buffer_size = buffer_size
+        self._flush_interval = flush_interval
+        self._cond = threading.Condition(threading.Lock())
+        self._filling = bytearray()
+        self._free: Deque[bytearray] = deque(bytearray() for _ in range(buffer_count - 1))
+        self._full: Deque[bytearray] = deque()
+        self._closed = False
+        self._writing = False  # Поток записи пишет буферы вне блокировки
+        self._file = self._open(path)
+        self._size = self._file.tell()
+        self._compress_threads: List[threading.Thread] = []
+        self._thread = threading.Thread(target=self._run, name="sdb-log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        """Sink loguru: дописывает запись в заполняемый буфер."""
+        data = message.encode("utf-8")
+        with self._cond:
+            self._filling += data
+            if len(self._filling) >= self._buffer_size:
+                while not self._free and not self._closed:
+                    self._cond.wait()  # Все буферы ждут записи на диск
+                self._swap_filling_locked()
+
+    def stop(self) -> None:
+        """Вызывается loguru при удалении хендлера (в том числе при выходе из процесса)."""
+        self.close()
+
+    def close(self) -> None:
+        """Дописывает все буферы и закрывает файл."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        for compress_thread in self._compress_threads:
+            compress_thread.join()
+
+    def switch_file(self, new_path: Path) -> None:
+        """
+        Переключает запись на новый файл без пересоздания sink в loguru.
+        Все записи, сделанные до вызова, дописываются в старый файл; логирующие
+        потоки ждут только на время открытия нового файла.
+        """
+        with self._cond:
+            while (self._full or self._writing) and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return
+            if self._filling:
+                self._write_batch(self._filling)
+                self._filling.clear()
+            new_file = self._open(new_path)  # При ошибке продолжаем писать в старый файл
+            self._file.close()
+            self._file = new_file
+            self.path = new_path
+            self._size = new_file.tell()
+
+    @staticmethod
+    def _open(path: Path):
+        """Открывает лог-файл без буфера Python: записи и так приходят крупными пакетами."""
+        return open(path, "ab", buffering=0)
+
+    def _swap_filling_locked(self) -> None:
+        """Передает заполняемый буфер потоку записи (вызывается под self._cond)."""
+        if not self._filling:
+            return
+        self._full.append(self._filling)
+        self._filling = self._free.popleft() if self._free else bytearray()
+        self._cond.notify_all()
+
+    def _run(self) -> None:
+        cond = self._cond
+        while True:
+            with cond:
+                if not self._full and not self._closed:
+                    cond.wait(timeout=self._flush_interval)
+                # По таймауту (или при закрытии) отдаем и частично заполненный буфер
+                if not self._full and self._filling and (self._free or self._closed):
+                    self._swap_filling_locked()
+                buffers = list(self._full)
+                self._full.clear()
+                closing = self._closed
+                self._writing = bool(buffers)
+            for buffer in buffers:
+                self._write_batch(buffer)
+                buffer.clear()
+            with cond:
+                self._writing = False
+                self._free.extend(buffers)
+                cond.notify_all()
+                if closing and not self._full and not self._filling:
+                    break
+        self._file.close()
+
+    def _write_batch(self, data: bytearray) -> None:
+        try:
+            # Буфер уже содержит готовые байты UTF-8: пишем его напрямую в fd, без промежуточной копии
+            view = memoryview(data)
+            while view:
+                view = view[self._file.write(view):]
+            self._size += len(data)
+            if self._rotation_size and self._size >= self._rotation_size:
+                self._rotate()
+        except Exception as e:
+            # Логировать через loguru отсюда нельзя (рекурсия в этот же sink)
+            print(f"[LoggingManager] Ошибка записи лог-файла '{self.path}': {e}", file=sys.stderr)
+
+    def _rotate(self) -> None:
+        """Переименовывает заполненный файл (как loguru: name.YYYY-MM-DD_HH-MM-SS_ffffff.log), открывает новый и сжимает старый в фоне."""
+        self._file.close()
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+        rotated_path = self.path.with_name(f"{self.path.stem}.{timestamp}{self.path.suffix}")
+        os.replace(self.path, rotated_path)
+        self._file = self._open(self.path)
+        self._size = 0
+        compress_thread = threading.Thread(
+            target=_compress_rotated_log, args=(rotated_path,), name="sdb-log-compress", daemon=True
+        )
+        compress_thread.start()
+        self._compress_threads = [t for t in self._compress_threads if t.is_alive()]
+        self._compress_threads.append(compress_thread)
+
+
 class LoggingManager:
     def __init__(self, app_settings: 'AppSettings'):
         self._settings = app_settings.core
         self._app_settings_ref = app_settings 
         self._current_log_handler_id: Optional[int] = None
         self._current_log_file_path: Optional[Path] = None
-        self._scheduler: Optional[AsyncIOScheduler] = None
+        self._current_hour_epoch: Optional[int] = None  # Номер часа (time.time() // 3600) текущего файла
+        self._current_log_writer: Optional[_BufferedLogFileWriter] = None
+        self._known_log_dirs: Set[Path] = set()  # Каталоги часовых логов, уже созданные этим процессом
+        self._scheduled_tasks: List[asyncio.Task] = []
+        # Расписание фоновых задач по имени задачи: (job, период, сдвиг от полуночи UTC), в секундах
+        self._task_schedules: Dict[str, Tuple[Callable[[], Awaitable[None]], int, int]] = {}
         self._is_initialized = False
+        self._pdt_calendar: Optional[Any] = None  # parsedatetime.Calendar, создается при первой очистке
+        self._retention_cache: Optional[Tuple[str, timedelta]] = None  # (строка периода, timedelta)
+        # Корень структурированных логов вычисляется один раз
+        self._base_logs_dir: Path = app_settings.core.project_data_path / self._settings.log_structured_dir
 
         self._logger = global_logger.bind(service="LoggingManager")
         self._logger.info("LoggingManager инициализирован.")
 
+    def _compute_log_file_path(self, now: time.struct_time) -> Path:
+        """Вычисляет путь к лог-файлу для часа `now` (UTC struct_time, без обращения к файловой системе)."""
+        # Имя месяца - из таблицы, а не strftime("%B"): не зависит от локали системы
+        month_name_str = _MONTH_NAMES_EN[now.tm_mon - 1]
+        target_dir = self._base_logs_dir / f"{now.tm_year:04d}" / f"{now.tm_mon:02d}-{month_name_str}" / f"{now.tm_mday:02d}"
+        return target_dir / f"{now.tm_hour:02d}_sdb.log"
+
     def _get_log_file_path_for_current_hour(self) -> Path:
-        """Генерирует путь к лог-файлу на основе текущего времени."""
-        now = datetime.now(timezone.utc)
-        year_str = now.strftime("%Y")
-        month_num_str = now.strftime("%m")
-        month_name_str = now.strftime("%B") # Имя месяца зависит от локали системы
-        day_str = now.strftime("%d")
-        hour_str = now.strftime("%H")
-
-        base_logs_dir = self._app_settings_ref.core.project_data_path / self._settings.log_structured_dir
-        
-        target_dir = base_logs_dir / year_str / f"{month_num_str}-{month_name_str}" / day_str
-        target_dir.mkdir(parents=True, exist_ok=True)
-        
-        return target_dir / f"{hour_str}_sdb.log"
+        """Генерирует путь к лог-файлу на основе текущего времени (UTC)."""
+        return self._compute_log_file_path(time.gmtime())
 
     def _setup_loguru_file_sink(self) -> None: 
         """Настраивает (или перенастраивает) файловый sink для Loguru."""
@@ -49,14 +318,17 @@ class LoggingManager:
                 self._logger.trace(f"Предыдущий файловый хендлер (ID: {self._current_log_handler_id}) удален.")
             except ValueError:
                 self._logger.warning(f"Не удалось удалить предыдущий файловый хендлер ID: {self._current_log_handler_id} (возможно, уже удален).")
+            self._close_current_writer()
             self._current_log_handler_id = None
             self._current_log_file_path = None
+            self._current_hour_epoch = None
 
         if not self._settings.log_to_file:
             self._logger.info("Запись логов в файл отключена в настройках.")
             return
 
-        new_log_file_path = self._get_log_file_path_for_current_hour()
+        now_ts = time.time()
+        new_log_file_path = self._compute_log_file_path(time.gmtime(now_ts))
         
         # --- ЖЕСТКО УСТАНАВЛИВАЕМ УРОВЕНЬ ДЛЯ ФАЙЛОВОГО ЛОГА ---
         log_level_for_file = "DEBUG"  # Используем DEBUG для файлов по умолчанию
@@ -64,26 +336,57 @@ class LoggingManager:
         # log_level_for_file = "TRACE" 
         # ---------------------------------------------------------
         
+        # Подробные трассировки с локальными переменными - дорого и может раскрыть секреты,
+        # поэтому только при отладочном уровне логирования
+        debug_mode = self._settings.log_level in ("TRACE", "DEBUG")
+
         try:
-            handler_id = global_logger.add(
-                sink=str(new_log_file_path),
-                level=log_level_for_file, 
-                rotation=self._settings.log_rotation_size, 
-                compression="zip",
-                format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}",
-                encoding="utf-8",
-                enqueue=True,
-                backtrace=True,
-                diagnose=True 
-            )
+            # Каталог создается только при (пере)создании sink и только если этот процесс его еще не создавал
+            self._ensure_log_dir(new_log_file_path.parent)
+            rotation_size = _parse_size(self._settings.log_rotation_size)
+            # Буферы в памяти + поток записи вместо enqueue=True (у loguru очередь не ограничена)
+            try:
+                writer = _BufferedLogFileWriter(new_log_file_path, rotation_size=rotation_size)
+            except FileNotFoundError:
+                # Каталог удален извне после того, как попал в кэш
+                self._ensure_log_dir(new_log_file_path.parent, force=True)
+                writer = _BufferedLogFileWriter(new_log_file_path, rotation_size=rotation_size)
+            try:
+                # Сам writer (а не writer.write): loguru вызывает его stop() в remove() и при выходе,
+                # и буферы дописываются на диск до завершения потока записи
+                handler_id = global_logger.add(
+                    sink=writer,
+                    level=log_level_for_file,
+                    backtrace=debug_mode,
+                    diagnose=debug_mode,
+                    **_FILE_SINK_KWARGS
+                )
+            except Exception:
+                writer.close()
+                raise
+            self._current_log_writer = writer
             self._current_log_handler_id = handler_id
             self._current_log_file_path = new_log_file_path
+            self._current_hour_epoch = int(now_ts) // _HOUR_SECONDS
             self._logger.success(f"Файловый логгер настроен. Уровень: {log_level_for_file}. Файл: {new_log_file_path}")
         except Exception as e:
             self._logger.error(f"Ошибка при настройке файлового логгера для '{new_log_file_path}': {e}", exc_info=True)
             self._current_log_handler_id = None
             self._current_log_file_path = None
 
+    def _ensure_log_dir(self, log_dir: Path, force: bool = False) -> None:
+        """Создает каталог логов, пропуская mkdir для каталогов, уже созданных ранее."""
+        if force or log_dir not in self._known_log_dirs:
+            log_dir.mkdir(parents=True, exist_ok=True)
+            self._known_log_dirs.add(log_dir)
+
+    def _close_current_writer(self) -> None:
+        """Дописывает и закрывает файл текущего sink (после удаления хендлера из loguru)."""
+        writer = self._current_log_writer
+        self._current_log_writer = None
+        if writer is not None:
+            writer.close()
+
     async def _hourly_log_rotation_check(self) -> None:
         """Проверяет, нужно ли ротировать лог-файл (начался новый час)."""
         self._logger.trace("Выполняется ежечасная проверка ротации логов...")
@@ -91,75 +394,167 @@ class LoggingManager:
             self._logger.trace("Проверка ротации пропущена: менеджер не инициализирован или логирование в файл отключено.")
             return
 
-        expected_log_file = self._get_log_file_path_for_current_hour()
-        if self._current_log_file_path != expected_log_file:
-            self._logger.info(f"Начался новый час. Перенастройка файлового логгера на: {expected_log_file}")
-            self._setup_loguru_file_sink() 
-        else:
+        # Сравнение номеров часов вместо построения пути; защищает и от повторной ротации в тот же час
+        if int(time.time()) // _HOUR_SECONDS == self._current_hour_epoch:
             self._logger.trace(f"Ротация лог-файла не требуется, текущий файл: {self._current_log_file_path}")
+            return
+
+        writer = self._current_log_writer
+        if writer is None or self._current_log_handler_id is None:
+            self._logger.info("Начался новый час. Перенастройка файлового логгера.")
+            self._setup_loguru_file_sink()
+            return
+
+        # Хендлер loguru остается прежним: writer лишь переключается на файл нового часа
+        now_ts = time.time()
+        new_log_file_path = self._compute_log_file_path(time.gmtime(now_ts))
+        try:
+            try:
+                self._ensure_log_dir(new_log_file_path.parent)
+                writer.switch_file(new_log_file_path)
+            except FileNotFoundError:
+                self._ensure_log_dir(new_log_file_path.parent, force=True)
+                writer.switch_file(new_log_file_path)
+        except Exception as e_switch:
+            self._logger.error(f"Не удалось переключить лог-файл на '{new_log_file_path}': {e_switch}. Пересоздание sink.")
+            self._setup_loguru_file_sink()
+            return
+        self._current_log_file_path = new_log_file_path
+        self._current_hour_epoch = int(now_ts) // _HOUR_SECONDS
+        self._logger.info(f"Начался новый час. Запись логов переключена на: {new_log_file_path}")
+
+    def _remove_log_dir(self, path: str, level_name: str) -> int:
+        """Удаляет директорию логов; возвращает 1 при успехе, 0 при ошибке."""
+        try:
+            _fast_rmtree(path)
+        except Exception as e_rm:
+            self._logger.error(f"Ошибка удаления директории логов '{path}': {e_rm}")
+            return 0
+        self._logger.info(f"Удалена директория старых логов ({level_name}): {path}")
+        return 1
+
+    def _get_retention_delta(self, retention_str: str, now_dt: datetime) -> Optional[timedelta]:
+        """
+        Переводит период хранения ('30 days', '3 months') в timedelta.
+        Результат кэшируется по строке периода: parsedatetime вызывается только при ее изменении.
+        """
+        cached = self._retention_cache
+        if cached is not None and cached[0] == retention_str:
+            return cached[1]
+
+        if self._pdt_calendar is None:
+            import parsedatetime as pdt  # Отложенный импорт: нужен только задаче очистки
+            self._pdt_calendar = pdt.Calendar()
+        past_target_dt, parse_status = self._pdt_calendar.parseDT(f"{retention_str} ago", sourceTime=now_dt) # type: ignore
+        if parse_status == 0 or not past_target_dt:
+            return None
+
+        # parseDT возвращает naive datetime во времени sourceTime
+        retention_delta = now_dt.replace(tzinfo=None) - past_target_dt.replace(tzinfo=None)
+        self._retention_cache = (retention_str, retention_delta)
+        return retention_delta
 
     async def _cleanup_old_logs(self) -> None:
-        """Удаляет старые директории логов на основе log_retention_period_structured."""
+        """Удаляет старые директории логов в пуле потоков, не блокируя event loop."""
+        await asyncio.get_running_loop().run_in_executor(None, self._cleanup_old_logs_sync)
+
+    def _cleanup_old_logs_sync(self) -> None:
+        """Удаляет старые директории логов на основе log_retention_period_structured (блокирующая часть)."""
         self._logger.info("Запуск задачи очистки старых логов...")
         if not self._settings.log_to_file:
             self._logger.info("Очистка старых логов пропущена: логирование в файл отключено.")
             return
 
         retention_str = self._settings.log_retention_period_structured
-        cal = pdt.Calendar()
         
         now_dt = datetime.now(timezone.utc)
-        past_target_dt, parse_status = cal.parseDT(f"{retention_str} ago", sourceTime=now_dt) # type: ignore
-        
-        if parse_status == 0 or not past_target_dt:
+        retention_delta = self._get_retention_delta(retention_str, now_dt)
+        if retention_delta is None:
             self._logger.error(f"Не удалось распарсить период хранения логов: '{retention_str}'. Очистка отменена.")
             return
         
-        cutoff_date = past_target_dt 
+        cutoff_date = now_dt - retention_delta
         self._logger.info(f"Очистка логов старше {cutoff_date.strftime('%Y-%m-%d %H:%M:%S %Z')} (период: '{retention_str}').")
 
-        structured_logs_root = self._app_settings_ref.core.project_data_path / self._settings.log_structured_dir
+        structured_logs_root = self._base_logs_dir
         if not structured_logs_root.is_dir():
             return
 
+        keep_years, keep_months, keep_days, partial_months = _build_log_keep_sets(cutoff_date, now_dt)
+
+        # os.scandir: имя и тип записи берутся из readdir, без отдельного stat на каждую директорию.
+        # Удаляется все, чего нет в наборах хранимых дат; спускаемся только в частично хранимые месяцы.
         deleted_dirs_count = 0
-        for year_dir in structured_logs_root.iterdir():
-            if year_dir.is_dir() and year_dir.name.isdigit():
-                if int(year_dir.name) < cutoff_date.year:
-                    try:
-                        shutil.rmtree(year_dir)
-                        self._logger.info(f"Удалена директория старых логов (год): {year_dir}")
-                        deleted_dirs_count += 1
-                    except Exception as e_rm_year:
-                        self._logger.error(f"Ошибка удаления директории логов '{year_dir}': {e_rm_year}")
-                    continue 
-
-                if int(year_dir.name) == cutoff_date.year:
-                    for month_dir in year_dir.iterdir():
-                        if month_dir.is_dir() and "-" in month_dir.name:
-                            try:
-                                month_num_str = month_dir.name.split("-")[0]
-                                if month_num_str.isdigit() and int(month_num_str) < cutoff_date.month:
-                                    shutil.rmtree(month_dir)
-                                    self._logger.info(f"Удалена директория старых логов (месяц): {month_dir}")
-                                    deleted_dirs_count +=1
-                                    continue
-                                
-                                if int(month_num_str) == cutoff_date.month:
-                                    for day_dir in month_dir.iterdir():
-                                        if day_dir.is_dir() and day_dir.name.isdigit():
-                                            if int(day_dir.name) < cutoff_date.day:
-                                                shutil.rmtree(day_dir)
-                                                self._logger.info(f"Удалена директория старых логов (день): {day_dir}")
-                                                deleted_dirs_count += 1
-                            except Exception as e_rm_month_day:
-                                self._logger.error(f"Ошибка удаления директории логов '{month_dir}' или ее поддиректории: {e_rm_month_day}")
+        with os.scandir(structured_logs_root) as year_entries:
+            for year_dir in year_entries:
+                year = year_dir.name
+                if not (year.isdigit() and year_dir.is_dir(follow_symlinks=False)):
+                    continue
+                if year not in keep_years:
+                    deleted_dirs_count += self._remove_log_dir(year_dir.path, "год")
+                    continue
+
+                with os.scandir(year_dir.path) as month_entries:
+                    for month_dir in month_entries:
+                        month_key = (year, month_dir.name.partition("-")[0])
+                        if not (month_key[1].isdigit() and month_dir.is_dir(follow_symlinks=False)):
+                            continue
+                        if month_key not in keep_months:
+                            deleted_dirs_count += self._remove_log_dir(month_dir.path, "месяц")
+                            continue
+                        if month_key not in partial_months:
+                            continue  # Месяц целиком в периоде хранения
+
+                        with os.scandir(month_dir.path) as day_entries:
+                            for day_dir in day_entries:
+                                day = day_dir.name
+                                if (day.isdigit() and (year, month_key[1], day) not in keep_days
+                                        and day_dir.is_dir(follow_symlinks=False)):
+                                    deleted_dirs_count += self._remove_log_dir(day_dir.path, "день")
         if deleted_dirs_count > 0:
             self._logger.success(f"Очистка старых логов завершена. Удалено директорий: {deleted_dirs_count}.")
         else:
             self._logger.info("Очистка старых логов завершена. Не найдено директорий для удаления.")
 
 
+    async def _run_periodically(self, job: Callable[[], Awaitable[None]], period: int, offset: int = 0) -> None:
+        """Запускает job в моменты, кратные period секундам (со сдвигом offset от полуночи UTC)."""
+        while True:
+            await asyncio.sleep(_seconds_until_next_run(time.time(), period, offset))
+            try:
+                await job()
+            except Exception as e_job:
+                self._logger.error(f"Ошибка в фоновой задаче LoggingManager '{job.__name__}': {e_job}", exc_info=True)
+
+    def _schedule_periodic_task(
+        self, name: str, job: Callable[[], Awaitable[None]], period: int, offset: int = 0
+    ) -> None:
+        self._scheduled_tasks.append(asyncio.create_task(self._run_periodically(job, period, offset), name=name))
+        self._task_schedules[name] = (job, period, offset)
+
+    def get_scheduled_jobs(self) -> List[Dict[str, Any]]:
+        """Описание запущенных фоновых задач: имя, интервал и время следующего запуска (UTC)."""
+        now_ts = time.time()
+        jobs: List[Dict[str, Any]] = []
+        for task in self._scheduled_tasks:
+            if task.done():
+                continue
+            name = task.get_name()
+            job, period, offset = self._task_schedules[name]
+            next_run_ts = now_ts + _seconds_until_next_run(now_ts, period, offset)
+            trigger = f"interval[{timedelta(seconds=period)}]"
+            if offset:
+                trigger += f" +{timedelta(seconds=offset)} UTC"
+            jobs.append({
+                "id": name,
+                "name": name,
+                "func": job.__name__,
+                "interval_seconds": period,
+                "next_run_time": datetime.fromtimestamp(next_run_ts, tz=timezone.utc).isoformat(),
+                "trigger": trigger,
+            })
+        return jobs
+
     async def initialize_logging(self) -> None: 
         """Инициализирует систему логирования, включая файловый sink и задачи по расписанию."""
         if self._is_initialized:
@@ -170,31 +565,27 @@ class LoggingManager:
         
         self._setup_loguru_file_sink() 
         
-        self._scheduler = AsyncIOScheduler(timezone=str(timezone.utc))
-        self._scheduler.add_job(self._hourly_log_rotation_check, CronTrigger(minute=0)) 
-        self._logger.info("Задача _hourly_log_rotation_check добавлена в планировщик (ежечасно).")
-        self._scheduler.add_job(self._cleanup_old_logs, CronTrigger(hour=3, minute=30)) 
-        self._logger.info("Задача _cleanup_old_logs добавлена в планировщик (ежедневно в 03:30 UTC).")
-        
-        try:
-            self._scheduler.start()
-            self._logger.success("Планировщик задач LoggingManager успешно запущен.")
-        except Exception as e_scheduler_start:
-            self._logger.error(f"Не удалось запустить планировщик задач LoggingManager: {e_scheduler_start}", exc_info=True)
-            self._scheduler = None 
+        # Две фоновые задачи asyncio вместо планировщика: каждая спит до своего следующего запуска
+        self._schedule_periodic_task("sdb-log-rotation-check", self._hourly_log_rotation_check, _HOUR_SECONDS)
+        self._schedule_periodic_task(
+            "sdb-log-cleanup", self._cleanup_old_logs, _DAY_SECONDS, _CLEANUP_OFFSET_SECONDS
+        )
+        self._logger.info("Задача _hourly_log_rotation_check запланирована (ежечасно).")
+        self._logger.info("Задача _cleanup_old_logs запланирована (ежедневно в 03:30 UTC).")
 
         self._is_initialized = True
         self._logger.info("LoggingManager успешно инициализирован.")
 
     async def shutdown_logging(self) -> None:
-        """Останавливает планировщик и корректно завершает работу."""
+        """Останавливает фоновые задачи и корректно завершает работу."""
         self._logger.info("Начало процедуры остановки LoggingManager...")
-        if self._scheduler and self._scheduler.running:
-            try:
-                self._scheduler.shutdown(wait=False) 
-                self._logger.info("Планировщик задач LoggingManager остановлен.")
-            except Exception as e_scheduler_shutdown:
-                self._logger.error(f"Ошибка при остановке планировщика LoggingManager: {e_scheduler_shutdown}", exc_info=True)
+        if self._scheduled_tasks:
+            for task in self._scheduled_tasks:
+                task.cancel()
+            await asyncio.gather(*self._scheduled_tasks, return_exceptions=True)
+            self._scheduled_tasks = []
+            self._task_schedules.clear()
+            self._logger.info("Фоновые задачи LoggingManager остановлены.")
         
         if self._current_log_handler_id is not None:
             try:
@@ -202,6 +593,8 @@ class LoggingManager:
                 self._logger.info(f"Файловый хендлер (ID: {self._current_log_handler_id}) удален при остановке.")
             except ValueError:
                 pass 
+            self._current_log_handler_id = None
+        self._close_current_writer()
         
         self._is_initialized = False
         self._logger.info("LoggingManager остановлен.")
\ No newline at end of file
@@ -4,17 +4,40 @@ import asyncio
 import importlib
 import importlib.util
 import json
-import re
+import os
 import shutil
+import stat
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import (TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple,
+from typing import (TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple,
                     Type)
 
 import yaml  # type: ignore
+
+try:
+    # libyaml: разбор и запись YAML в C
+    from yaml import CSafeDumper as _YamlDumper
+    from yaml import CSafeLoader as _YamlLoader
+    _LIBYAML_AVAILABLE = True
+except ImportError:  # pragma: no cover - PyYAML собран без libyaml
+    from yaml import SafeDumper as _YamlDumper
+    from yaml import SafeLoader as _YamlLoader
+    _LIBYAML_AVAILABLE = False
+
+# Условный импорт orjson (разбирает bytes напрямую, быстрее stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None  # type: ignore
+    ORJSON_AVAILABLE = False
 from aiogram import Bot, Dispatcher
 from loguru import logger
-from pydantic import BaseModel as PydanticBaseModel
+from packaging.version import Version
+from packaging.version import parse as parse_version
 from pydantic import ValidationError
 
 # Добавляем PermissionManifest в импорты
@@ -31,6 +54,63 @@ MODULE_ENTRY_POINT_FILENAME = "__init__.py"
 SETUP_FUNCTION_NAME = "setup_module"
 USER_MODULES_SETTINGS_DIR_NAME = "modules_settings"
 MODULE_DEFAULT_SETTINGS_FILENAME = "module_settings.yaml"
+_MANIFEST_FILE_NAMES = frozenset({MANIFEST_YAML_NAME, MANIFEST_JSON_NAME})
+_SCAN_MAX_WORKERS = 16
+
+
+_BOOL_TRUE_STRINGS = frozenset({"true", "1", "yes", "on", "t"})
+
+
+def _coerce_bool_setting(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.lower() in _BOOL_TRUE_STRINGS
+    return bool(value)
+
+
+# Приведение значения настройки к типу из манифеста (типы без записи - choice/multichoice - не приводятся)
+_SETTING_TYPE_COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "bool": _coerce_bool_setting,
+    "int": int,
+    "float": float,
+    "string": str,
+    "text": str,
+}
+_NUMERIC_SETTING_TYPES = frozenset({"int", "float"})
+
+
+@lru_cache(maxsize=None)
+def _parse_version_cached(version_str: str) -> Version:
+    # Версии ядра и min_sdb_core_version повторяются между модулями - разбираем каждую строку один раз
+    return parse_version(version_str)
+
+
+def _as_settings_mapping(data: Any) -> Dict[str, Any]:
+    """Результат разбора файла настроек: пустой файл -> {}, не-словарь -> ошибка."""
+    if not data:
+        return {}
+    if not isinstance(data, dict):
+        raise ValueError(f"ожидался словарь настроек, получен {type(data).__name__}")
+    return data
+
+
+def _write_file_atomic(path: Path, data: bytes) -> None:
+    """Записывает файл через временный файл в том же каталоге и os.replace (без полузаписанных файлов)."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb", buffering=0) as f:
+            view = memoryview(data)
+            while view:  # Небуферизованный write может записать не все байты за раз
+                view = view[f.write(view):]
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _load_json_file(path: Path) -> Any:
+    """Читает JSON-файл целиком в bytes и разбирает его (orjson, если доступен)."""
+    raw = path.read_bytes()
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
 
 
 def get_module_required_permission(module_name: str, manifest: Optional[ModuleManifest]) -> Optional[str]:
@@ -95,6 +175,36 @@ def get_module_permission_to_check(module_name: str, manifest: Optional[ModuleMa
     return None
 
 
+def _group_modules_by_dependency_level(modules: List["ModuleInfo"]) -> List[List["ModuleInfo"]]:
+    """
+    Разбивает модули на уровни по sdb_module_dependencies: модули одного уровня не зависят друг от друга,
+    а каждый модуль зависит только от модулей предыдущих уровней. Зависимости вне списка не учитываются
+    (их проверяет _check_module_dependencies). Модули из циклов попадают в последний уровень.
+    Внутри уровня сохраняется исходный порядок.
+    """
+    names_in_batch = {module_info.name for module_info in modules}
+    pending: Dict[str, Set[str]] = {
+        module_info.name: {
+            dep_name for dep_name in (module_info.manifest.sdb_module_dependencies if module_info.manifest else ())
+            if dep_name in names_in_batch and dep_name != module_info.name
+        }
+        for module_info in modules
+    }
+    remaining = list(modules)
+    levels: List[List["ModuleInfo"]] = []
+    while remaining:
+        level = [module_info for module_info in remaining if not pending[module_info.name]]
+        if not level:
+            levels.append(remaining)  # Циклическая зависимость: загрузка этих модулей завершится ошибкой зависимостей
+            break
+        levels.append(level)
+        level_names = {module_info.name for module_info in level}
+        remaining = [module_info for module_info in remaining if module_info.name not in level_names]
+        for module_info in remaining:
+            pending[module_info.name] -= level_names
+    return levels
+
+
 class ModuleInfo:
     def __init__(
         self,
@@ -116,18 +226,13 @@ class ModuleInfo:
         self.current_settings: Dict[str, Any] = {}
 
     def __repr__(self) -> str:
-        status_parts = []
-        if self.is_system_module:
-            status_parts.append("system")
-        if self.is_enabled or self.is_system_module:
-            status_parts.append("active_target")
-        if self.is_loaded_successfully:
-            status_parts.append("loaded")
-        if self.current_settings:
-            status_parts.append("settings_loaded")
-        if self.error:
-            status_parts.append(f"error='{self.error[:30]}...'")
-        status_str = ", ".join(status_parts) if status_parts else "discovered"
+        status_str = ", ".join(filter(None, (
+            "system" if self.is_system_module else None,
+            "active_target" if self.is_enabled or self.is_system_module else None,
+            "loaded" if self.is_loaded_successfully else None,
+            "settings_loaded" if self.current_settings else None,
+            f"error='{self.error[:30]}...'" if self.error else None,
+        ))) or "discovered"
         return f"<ModuleInfo name='{self.name}' ({status_str})>"
 
 
@@ -139,6 +244,9 @@ class ModuleLoader:
 
         self.plugins_root_dir: Path = settings.core.project_data_path.parent / "Modules"
         self.core_sys_modules_root_dir: Path = settings.core.project_data_path.parent / "Systems" / "core" / "sys_modules"
+        # Строки для сравнений и импорта вычисляются один раз, а не на каждый модуль
+        self._sys_modules_root_str: str = os.fspath(self.core_sys_modules_root_dir)
+        self._sys_import_base: str = f"Systems.{self.core_sys_modules_root_dir.parent.name}.{self.core_sys_modules_root_dir.name}"
 
         self.user_module_settings_base_path: Path = (
             self._core_settings.project_data_path / "Config" / USER_MODULES_SETTINGS_DIR_NAME
@@ -146,43 +254,68 @@ class ModuleLoader:
         self.user_module_settings_base_path.mkdir(parents=True, exist_ok=True)
 
         self.available_modules: Dict[str, ModuleInfo] = {}
+        # Путь манифеста -> ((st_mtime_ns, st_size, module_name_override), разобранный манифест)
+        self._manifest_cache: Dict[Path, Tuple[Tuple[int, int, Optional[str]], ModuleManifest]] = {}
         self.enabled_plugin_names: List[str] = []
+        self._enabled_config_stamp: Optional[Tuple[int, int]] = None  # (st_mtime_ns, st_size) прочитанного списка плагинов
+        # Содержимое файлов пользовательских настроек; заполняется только на время scan_all_available_modules
+        self._user_settings_blobs: Optional[Dict[str, Optional[bytes]]] = None
 
         self._logger = logger.bind(service="ModuleLoader")
         self._logger.info(
             f"ModuleLoader инициализирован. "
-            f"Плагины: {self.plugins_root_dir.resolve()}, "
-            f"Системные модули: {self.core_sys_modules_root_dir.resolve()}, "
-            f"Пользовательские настройки модулей: {self.user_module_settings_base_path.resolve()}"
+            f"Плагины: {os.path.abspath(self.plugins_root_dir)}, "
+            f"Системные модули: {os.path.abspath(self.core_sys_modules_root_dir)}, "
+            f"Пользовательские настройки модулей: {os.path.abspath(self.user_module_settings_base_path)}"
         )
+        if not _LIBYAML_AVAILABLE:
+            self._logger.warning(
+                "PyYAML собран без libyaml: манифесты и настройки модулей разбираются медленным Python-парсером."
+            )
 
     def _parse_manifest_file(
         self, module_path: Path, module_name_override: Optional[str] = None
     ) -> Optional[ModuleManifest]:
-        yaml_manifest_path = module_path / MANIFEST_YAML_NAME
-        json_manifest_path = module_path / MANIFEST_JSON_NAME
-        manifest_file_to_parse: Optional[Path] = None
-        parser_type: Optional[str] = None
-
-        if yaml_manifest_path.is_file():
-            manifest_file_to_parse = yaml_manifest_path
-            parser_type = "yaml"
-            if json_manifest_path.is_file():
+        # Один проход readdir по папке модуля вместо stat для каждого возможного имени манифеста
+        manifest_entries: Dict[str, os.DirEntry] = {}
+        try:
+            with os.scandir(module_path) as entries:
+                for entry in entries:
+                    if entry.name in _MANIFEST_FILE_NAMES and entry.is_file():
+                        manifest_entries[entry.name] = entry
+        except OSError:
+            pass
+        # JSON разбирается намного быстрее YAML, поэтому при наличии обоих используется JSON
+        json_entry = manifest_entries.get(MANIFEST_JSON_NAME)
+        yaml_entry = manifest_entries.get(MANIFEST_YAML_NAME)
+        if json_entry is not None:
+            manifest_entry, parser_type = json_entry, "json"
+            if yaml_entry is not None:
                 self._logger.warning(
-                    f"В модуле '{module_path.name}' найдены и YAML, и JSON манифесты. Используется YAML."
+                    f"В модуле '{module_path.name}' найдены и YAML, и JSON манифесты. Используется JSON."
                 )
-        elif json_manifest_path.is_file():
-            manifest_file_to_parse = json_manifest_path
-            parser_type = "json"
-
-        if not manifest_file_to_parse:
-            is_plugin = not (module_path.parent.name == "sys_modules" and module_path.parent.parent.name == "core")
+        elif yaml_entry is not None:
+            manifest_entry, parser_type = yaml_entry, "yaml"
+        else:
+            is_plugin = os.path.dirname(module_path) != self._sys_modules_root_str
             log_func = self._logger.warning if is_plugin else self._logger.debug
             log_func(f"Манифест не найден для модуля '{module_path.name}'.")
             return None
+        manifest_file_to_parse = module_path / manifest_entry.name
+        manifest_stat = manifest_entry.stat()
+
+        # Повторное сканирование (например, при перезагрузке) не разбирает неизмененный манифест заново
+        cache_stamp = (manifest_stat.st_mtime_ns, manifest_stat.st_size, module_name_override)
+        cached = self._manifest_cache.get(manifest_file_to_parse)
+        if cached is not None and cached[0] == cache_stamp:
+            return cached[1]
+
         try:
-            with open(manifest_file_to_parse, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f) if parser_type == "yaml" else json.load(f)
+            if parser_type == "yaml":
+                with open(manifest_file_to_parse, "r", encoding="utf-8") as f:
+                    data = yaml.load(f, Loader=_YamlLoader)
+            else:
+                data = _load_json_file(manifest_file_to_parse)
             if not data:
                 self._logger.error(f"Манифест {manifest_file_to_parse.name} в модуле {module_path.name} пуст.")
                 return None
@@ -195,7 +328,8 @@ class ModuleLoader:
                     f"для {manifest_file_to_parse.name}. Используется имя из манифеста: '{data['name']}'."
                 )
 
-            manifest = ModuleManifest(**data)
+            manifest = ModuleManifest.model_validate(data)
+            self._manifest_cache[manifest_file_to_parse] = (cache_stamp, manifest)
             return manifest
         except Exception as e:
             self._logger.error(
@@ -211,39 +345,58 @@ class ModuleLoader:
             )
             return
 
-        for module_dir_path in directory.iterdir():
-            if module_dir_path.is_dir() and not module_dir_path.name.startswith((".", "_")):
-                module_name_from_path = module_dir_path.name
-                manifest = self._parse_manifest_file(
-                    module_dir_path, module_name_override=module_name_from_path if is_system_dir else None
-                )
-
-                actual_module_name = manifest.name if manifest and manifest.name else module_name_from_path
-
-                if actual_module_name in self.available_modules:
-                    self._logger.warning(
-                        f"Дублирующееся имя модуля '{actual_module_name}' (из папки '{module_dir_path.name}', "
-                        f"тип: {'системный' if is_system_dir else 'плагин'}). "
-                        f"Предыдущий модуль с таким именем будет перезаписан в списке доступных."
-                    )
+        # os.scandir: тип записи берется из readdir, без отдельного stat на каждую папку
+        with os.scandir(directory) as dir_entries:
+            module_dir_entries = [
+                entry for entry in dir_entries
+                if not entry.name.startswith((".", "_")) and entry.is_dir()
+            ]
+        module_dir_paths = [Path(entry.path) for entry in module_dir_entries]
+        # Разбор манифестов и настроек - файловый ввод-вывод и libyaml (отпускает GIL), поэтому модули
+        # обрабатываются параллельно; в available_modules они добавляются здесь же, в исходном порядке
+        if len(module_dir_paths) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(_SCAN_MAX_WORKERS, len(module_dir_paths)), thread_name_prefix="sdb-module-scan"
+            ) as executor:
+                module_infos = list(executor.map(
+                    lambda module_dir_path: self._build_module_info(module_dir_path, is_system_dir), module_dir_paths
+                ))
+        else:
+            module_infos = [self._build_module_info(module_dir_path, is_system_dir) for module_dir_path in module_dir_paths]
 
-                module_info = ModuleInfo(
-                    name=actual_module_name,
-                    path=module_dir_path,
-                    manifest=manifest,
-                    is_system_module=is_system_dir,
-                    is_enabled=is_system_dir,
+        log_msg_type = "системный модуль" if is_system_dir else "плагин"
+        for module_info in module_infos:
+            actual_module_name = module_info.name
+            if actual_module_name in self.available_modules:
+                self._logger.warning(
+                    f"Дублирующееся имя модуля '{actual_module_name}' (из папки '{module_info.path.name}', "
+                    f"тип: {'системный' if is_system_dir else 'плагин'}). "
+                    f"Предыдущий модуль с таким именем будет перезаписан в списке доступных."
                 )
 
-                if manifest and manifest.settings:
-                    self._load_and_validate_module_settings(module_info)
+            self.available_modules[actual_module_name] = module_info
+            manifest = module_info.manifest
+            log_msg_details = f"v{manifest.version}" if manifest and manifest.version else "без манифеста/версии"
+            self._logger.info(
+                f"Найден {log_msg_type} '{actual_module_name}' ({log_msg_details}) в '{module_info.path.name}'."
+            )
 
-                self.available_modules[actual_module_name] = module_info
-                log_msg_type = "системный модуль" if is_system_dir else "плагин"
-                log_msg_details = f"v{manifest.version}" if manifest and manifest.version else "без манифеста/версии"
-                self._logger.info(
-                    f"Найден {log_msg_type} '{actual_module_name}' ({log_msg_details}) в '{module_dir_path.name}'."
-                )
+    def _build_module_info(self, module_dir_path: Path, is_system_dir: bool) -> ModuleInfo:
+        """Разбирает манифест модуля и загружает его настройки (может выполняться в потоке пула)."""
+        module_name_from_path = module_dir_path.name
+        manifest = self._parse_manifest_file(
+            module_dir_path, module_name_override=module_name_from_path if is_system_dir else None
+        )
+        module_info = ModuleInfo(
+            name=manifest.name if manifest and manifest.name else module_name_from_path,
+            path=module_dir_path,
+            manifest=manifest,
+            is_system_module=is_system_dir,
+            is_enabled=is_system_dir,
+        )
+        if manifest and manifest.settings:
+            self._load_and_validate_module_settings(module_info)
+        return module_info
 
     def _load_and_validate_module_settings(self, module_info: ModuleInfo) -> None:
         module_name = module_info.name
@@ -256,35 +409,56 @@ class ModuleLoader:
         module_default_config_file = module_info.path / MODULE_DEFAULT_SETTINGS_FILENAME
         user_module_config_file = self.user_module_settings_base_path / f"{module_name}.yaml"
 
-        final_settings: Dict[str, Any] = {}
-        for key, setting_mft_def in manifest.settings.items():
-            final_settings[key] = setting_mft_def.default
-
+        # Источники значений по приоритету: пользовательский файл > module_settings.yaml > default из манифеста.
+        # Итоговый словарь не собирается: значение каждой настройки берется по цепочке прямо при валидации.
         module_defaults_from_file: Dict[str, Any] = {}
+        module_defaults_raw: Optional[bytes] = None  # Исходные байты module_settings.yaml (для копирования)
         if module_default_config_file.is_file():
             try:
-                with open(module_default_config_file, "r", encoding="utf-8") as f:
-                    module_defaults_from_file = yaml.safe_load(f) or {}
-                final_settings.update(module_defaults_from_file)
+                module_defaults_raw = module_default_config_file.read_bytes()
+                module_defaults_from_file = _as_settings_mapping(yaml.load(module_defaults_raw, Loader=_YamlLoader))
                 self._logger.trace(
-                    f"Загружены настройки по умолчанию из файла модуля '{module_name}': {module_default_config_file}"
+                    "Загружены настройки по умолчанию из файла модуля '{}': {}", module_name, module_default_config_file
                 )
             except Exception as e:
+                module_defaults_from_file = {}
+                module_defaults_raw = None
                 self._logger.warning(
                     f"Ошибка чтения файла '{module_default_config_file}' для модуля '{module_name}': {e}."
                 )
 
-        if not user_module_config_file.exists():
+        user_settings_blobs = self._user_settings_blobs
+        user_settings_raw: Optional[bytes] = None
+        if user_settings_blobs is not None and module_name not in user_settings_blobs:
+            user_config_exists = False
+        elif user_settings_blobs is not None and user_settings_blobs[module_name] is not None:
+            user_settings_raw = user_settings_blobs[module_name]
+            user_config_exists = True
+        else:
+            user_config_exists = user_module_config_file.exists()
+
+        user_settings_from_file: Dict[str, Any] = {}
+        if not user_config_exists:
             self._logger.info(
                 f"Файл пользовательских настроек для модуля '{module_name}' не найден ({user_module_config_file})."
             )
-            source_for_user_config = final_settings.copy()
+            source_for_user_config = {key: setting_mft_def.default for key, setting_mft_def in manifest.settings.items()}
+            source_for_user_config.update(module_defaults_from_file)
 
             if source_for_user_config:
                 try:
+                    if module_defaults_raw is not None and source_for_user_config == module_defaults_from_file:
+                        # Файл модуля уже содержит все итоговые значения: копируем его байты
+                        # (с комментариями) вместо повторной сериализации в YAML
+                        user_config_bytes = module_defaults_raw
+                    else:
+                        # С encoding yaml.dump сразу отдает bytes - без промежуточной str и ее копии при encode
+                        user_config_bytes = yaml.dump(
+                            source_for_user_config, Dumper=_YamlDumper, indent=2, sort_keys=False,
+                            allow_unicode=True, encoding="utf-8"
+                        )
                     user_module_config_file.parent.mkdir(parents=True, exist_ok=True)
-                    with open(user_module_config_file, "w", encoding="utf-8") as f:
-                        yaml.dump(source_for_user_config, f, indent=2, sort_keys=False, allow_unicode=True)
+                    _write_file_atomic(user_module_config_file, user_config_bytes)
                     self._logger.info(
                         f"Создан файл пользовательских настроек для '{module_name}' на основе дефолтов: {user_module_config_file}"
                     )
@@ -298,13 +472,14 @@ class ModuleLoader:
                 )
         else:
             try:
-                with open(user_module_config_file, "r", encoding="utf-8") as f:
-                    user_settings_from_file = yaml.safe_load(f) or {}
+                if user_settings_raw is None:
+                    user_settings_raw = user_module_config_file.read_bytes()
+                user_settings_from_file = _as_settings_mapping(yaml.load(user_settings_raw, Loader=_YamlLoader))
                 self._logger.info(
                     f"Загружены пользовательские настройки для модуля '{module_name}' из: {user_module_config_file}"
                 )
-                final_settings.update(user_settings_from_file)
             except Exception as e_load_user:
+                user_settings_from_file = {}
                 self._logger.error(
                     f"Ошибка загрузки пользовательского файла настроек '{user_module_config_file}' для '{module_name}': {e_load_user}."
                 )
@@ -313,7 +488,9 @@ class ModuleLoader:
         validation_errors: List[str] = []
 
         for key, setting_mft_def in manifest.settings.items():
-            value_to_validate = final_settings.get(key)
+            value_to_validate = user_settings_from_file.get(
+                key, module_defaults_from_file.get(key, setting_mft_def.default)
+            )
 
             if value_to_validate is None:
                 if setting_mft_def.required:
@@ -326,27 +503,18 @@ class ModuleLoader:
                     continue
 
             try:
-                validated_value = value_to_validate
-                if setting_mft_def.type == "bool":
-                    if isinstance(value_to_validate, str):
-                        validated_value = value_to_validate.lower() in ["true", "1", "yes", "on", "t"]
-                    else:
-                        validated_value = bool(value_to_validate)
-                elif setting_mft_def.type == "int":
-                    validated_value = int(value_to_validate)
-                elif setting_mft_def.type == "float":
-                    validated_value = float(value_to_validate)
-                elif setting_mft_def.type in ["string", "text"]:
-                    validated_value = str(value_to_validate)
+                setting_type = setting_mft_def.type
+                coerce = _SETTING_TYPE_COERCERS.get(setting_type)
+                validated_value = coerce(value_to_validate) if coerce is not None else value_to_validate
 
                 key_specific_errors = False
-                if setting_mft_def.type == "string" and setting_mft_def.regex_validator:
-                    if not re.fullmatch(setting_mft_def.regex_validator, str(validated_value)):
+                if setting_type == "string" and setting_mft_def.regex_validator:
+                    if not setting_mft_def.compiled_regex.fullmatch(str(validated_value)):  # type: ignore[union-attr]
                         validation_errors.append(
                             f"Значение '{validated_value}' для '{key}' не соответствует regex: {setting_mft_def.regex_validator}"
                         )
                         key_specific_errors = True
-                if setting_mft_def.type in ["int", "float"]:
+                if setting_type in _NUMERIC_SETTING_TYPES:
                     if setting_mft_def.min_value is not None and validated_value < setting_mft_def.min_value:  # type: ignore
                         validation_errors.append(
                             f"Значение {validated_value} для '{key}' < min ({setting_mft_def.min_value})"
@@ -357,13 +525,10 @@ class ModuleLoader:
                             f"Значение {validated_value} для '{key}' > max ({setting_mft_def.max_value})"
                         )
                         key_specific_errors = True
-                if setting_mft_def.type == "choice" and setting_mft_def.options:
-                    option_values = [
-                        opt.value if isinstance(opt, PydanticBaseModel) else opt for opt in setting_mft_def.options
-                    ]
-                    if validated_value not in option_values:
+                if setting_type == "choice" and setting_mft_def.options:
+                    if not setting_mft_def.is_valid_option(validated_value):
                         validation_errors.append(
-                            f"Значение '{validated_value}' для '{key}' не является допустимым вариантом ({option_values})."
+                            f"Значение '{validated_value}' для '{key}' не является допустимым вариантом ({list(setting_mft_def.option_values)})."
                         )
                         key_specific_errors = True
 
@@ -389,26 +554,67 @@ class ModuleLoader:
         if validated_settings or not manifest.settings:
             self._logger.info(f"Актуальные настройки для модуля '{module_name}' загружены и провалидированы.")
             if validated_settings:
-                self._logger.debug(f"Итоговые настройки модуля '{module_name}': {validated_settings}")
+                # Аргументы вместо f-строки: repr словаря строится только при включенном DEBUG
+                self._logger.debug("Итоговые настройки модуля '{}': {}", module_name, validated_settings)
         else:
             self._logger.warning(
                 f"Для модуля '{module_name}' не удалось загрузить/провалидировать ни одной настройки, хотя они описаны в манифесте."
             )
 
+    def _read_user_settings_blobs(self) -> Dict[str, Optional[bytes]]:
+        """
+        Читает все <module>.yaml из каталога пользовательских настроек: имя модуля -> содержимое.
+        None - файл есть, но прочитать его не удалось (ошибка будет залогирована при загрузке настроек модуля).
+        """
+        blobs: Dict[str, Optional[bytes]] = {}
+        try:
+            with os.scandir(self.user_module_settings_base_path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".yaml") and entry.is_file():
+                        try:
+                            with open(entry.path, "rb") as f:
+                                blobs[entry.name[:-5]] = f.read()
+                        except OSError:
+                            blobs[entry.name[:-5]] = None
+        except OSError as e_scan:
+            self._logger.warning(
+                f"Не удалось прочитать каталог пользовательских настроек модулей {self.user_module_settings_base_path}: {e_scan}"
+            )
+        return blobs
+
     def scan_all_available_modules(self) -> None:
         self.available_modules.clear()
         self._logger.info("Начало сканирования всех модулей...")
-        self._scan_directory_for_modules(self.plugins_root_dir, is_system_dir=False)
-        self._scan_directory_for_modules(self.core_sys_modules_root_dir, is_system_dir=True)
+        # Пользовательские настройки всех модулей читаются одним проходом по каталогу
+        self._user_settings_blobs = self._read_user_settings_blobs()
+        try:
+            self._scan_directory_for_modules(self.plugins_root_dir, is_system_dir=False)
+            self._scan_directory_for_modules(self.core_sys_modules_root_dir, is_system_dir=True)
+        finally:
+            self._user_settings_blobs = None
         self._logger.info(f"Сканирование всех модулей завершено. Всего найдено: {len(self.available_modules)}")
 
     def _load_enabled_plugin_names(self) -> None:
         config_file = self._core_settings.enabled_modules_config_path
-        self.enabled_plugin_names.clear()
-        if config_file.is_file():
+        try:
+            config_stat: Optional[os.stat_result] = os.stat(config_file)
+        except OSError:
+            config_stat = None
+        if config_stat is None or not stat.S_ISREG(config_stat.st_mode):
+            self.enabled_plugin_names.clear()
+            self._enabled_config_stamp = None
+            self._logger.warning(f"Файл со списком активных плагинов {config_file} не найден.")
+            return
+
+        config_stamp = (config_stat.st_mtime_ns, config_stat.st_size)
+        if config_stamp == self._enabled_config_stamp:
+            # Файл не менялся с прошлого чтения - список уже актуален
+            self._logger.debug(f"Список активных плагинов из {config_file} не изменился, повторный разбор пропущен.")
+        else:
+            self.enabled_plugin_names.clear()
+            self._enabled_config_stamp = None
             try:
-                with open(config_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                data = _load_json_file(config_file)
                 if isinstance(data, list):
                     self.enabled_plugin_names = [m_name for m_name in data if isinstance(m_name, str)]
                 elif isinstance(data, dict) and "active_modules" in data and isinstance(data["active_modules"], list):
@@ -417,25 +623,24 @@ class ModuleLoader:
                     self._logger.error(
                         f"Неверный формат файла {config_file}. Ожидался список или {{'active_modules': [...]}}."
                     )
-
-                for name, module_info in self.available_modules.items():
-                    if not module_info.is_system_module:
-                        module_info.is_enabled = name in self.enabled_plugin_names
+                self._enabled_config_stamp = config_stamp
                 self._logger.info(f"Загружен список активных плагинов из {config_file}: {self.enabled_plugin_names}")
             except Exception as e:
                 self._logger.error(f"Ошибка загрузки списка активных плагинов из {config_file}: {e}", exc_info=True)
-        else:
-            self._logger.warning(f"Файл со списком активных плагинов {config_file} не найден.")
+                return
+
+        enabled_names = set(self.enabled_plugin_names)
+        for name, module_info in self.available_modules.items():
+            if not module_info.is_system_module:
+                module_info.is_enabled = name in enabled_names
 
     def _check_module_dependencies(self, module_info: ModuleInfo) -> bool:
         if not module_info.manifest:
             return True
         if module_info.manifest.metadata and module_info.manifest.metadata.min_sdb_core_version:
-            from packaging.version import parse as parse_version
-
             current_sdb_version_str = self._settings.core.sdb_version
             try:
-                if parse_version(current_sdb_version_str) < parse_version(
+                if _parse_version_cached(current_sdb_version_str) < _parse_version_cached(
                     module_info.manifest.metadata.min_sdb_core_version
                 ):
                     module_info.error = (
@@ -466,36 +671,54 @@ class ModuleLoader:
     async def _setup_single_module(
         self, module_info: ModuleInfo, dp: Dispatcher, bot: Bot, import_base_path: str
     ) -> None:
+        loaded_py_module = await self._import_module_for_setup(module_info, import_base_path)
+        if loaded_py_module is not None:
+            await self._run_module_setup(module_info, loaded_py_module, dp, bot)
+
+    async def _import_module_for_setup(self, module_info: ModuleInfo, import_base_path: str) -> Optional[Any]:
+        """Проверяет готовность модуля к загрузке и импортирует его пакет (в потоке, чтобы не блокировать event loop)."""
         if not module_info.manifest and not module_info.is_system_module:
             module_info.error = "Манифест отсутствует."
             self._logger.error(f"Плагин '{module_info.name}': {module_info.error}")
-            return
+            return None
 
         if module_info.error:
             self._logger.error(
                 f"Модуль '{module_info.name}' не будет загружен из-за предыдущей ошибки: {module_info.error}"
             )
-            return
+            return None
 
         if not self._check_module_dependencies(module_info):
-            return
+            return None
 
         entry_point_py_file = module_info.path / MODULE_ENTRY_POINT_FILENAME
         if not entry_point_py_file.is_file():
             module_info.error = f"Файл точки входа '{MODULE_ENTRY_POINT_FILENAME}' не найден."
             self._logger.error(f"Модуль '{module_info.name}': {module_info.error}")
-            return
+            return None
         try:
             import_path_str = f"{import_base_path}.{module_info.path.name}"
-            self._logger.debug(f"Импорт модуля '{module_info.name}' через '{import_path_str}'...")
-            loaded_py_module = importlib.import_module(import_path_str)
-            module_info.imported_py_module = loaded_py_module
-            if not hasattr(loaded_py_module, SETUP_FUNCTION_NAME):
+            self._logger.debug("Импорт модуля '{}' через '{}'...", module_info.name, import_path_str)
+            # Уже импортированный пакет (повторная настройка) берется из sys.modules без finder'ов и потока
+            loaded_py_module = sys.modules.get(import_path_str)
+            if loaded_py_module is None:
+                loaded_py_module = await asyncio.to_thread(importlib.import_module, import_path_str)
+        except Exception as e:
+            module_info.error = f"Ошибка загрузки/настройки: {e}"
+            self._logger.error(f"Модуль '{module_info.name}': {module_info.error}", exc_info=True)
+            return None
+        module_info.imported_py_module = loaded_py_module
+        return loaded_py_module
+
+    async def _run_module_setup(self, module_info: ModuleInfo, loaded_py_module: Any, dp: Dispatcher, bot: Bot) -> None:
+        """Вызывает setup_module() импортированного модуля и регистрирует его UI-точку входа."""
+        try:
+            setup_function: Optional[Callable] = getattr(loaded_py_module, SETUP_FUNCTION_NAME, None)
+            if setup_function is None:
                 module_info.error = f"Функция '{SETUP_FUNCTION_NAME}' не найдена."
                 self._logger.error(f"Модуль '{module_info.name}': {module_info.error}")
                 return
 
-            setup_function: Callable = getattr(loaded_py_module, SETUP_FUNCTION_NAME)
             self._logger.info(f"Вызов {SETUP_FUNCTION_NAME}() для модуля '{module_info.name}'...")
             if asyncio.iscoroutinefunction(setup_function):
                 await setup_function(dp=dp, bot=bot, services=self._services)
@@ -512,6 +735,22 @@ class ModuleLoader:
             module_info.error = f"Ошибка загрузки/настройки: {e}"
             self._logger.error(f"Модуль '{module_info.name}': {module_info.error}", exc_info=True)
 
+    async def _setup_modules_by_dependency_levels(
+        self, modules: List[ModuleInfo], dp: Dispatcher, bot: Bot, import_base_path: str
+    ) -> None:
+        """
+        Настраивает модули по уровням зависимостей. Пакеты модулей одного уровня импортируются
+        параллельно, а setup_module() вызывается последовательно в исходном порядке:
+        от него зависит порядок регистрации роутеров в Dispatcher.
+        """
+        for level in _group_modules_by_dependency_level(modules):
+            loaded_py_modules = await asyncio.gather(
+                *(self._import_module_for_setup(module_info, import_base_path) for module_info in level)
+            )
+            for module_info, loaded_py_module in zip(level, loaded_py_modules):
+                if loaded_py_module is not None:
+                    await self._run_module_setup(module_info, loaded_py_module, dp, bot)
+
     async def _auto_register_module_ui_entry(self, module_info: ModuleInfo) -> None:
         """
         Автоматически регистрирует UI точку входа для модуля на основе его манифеста.
@@ -575,6 +814,7 @@ class ModuleLoader:
 
         # Сначала настраиваем системные модули ядра
         self._logger.info("Настройка системных модулей ядра...")
+        system_modules_to_setup: List[ModuleInfo] = []
         for module_name, module_info in self.available_modules.items():
             if module_info.is_system_module:
                 if module_info.error:
@@ -582,20 +822,20 @@ class ModuleLoader:
                         f"Системный модуль '{module_name}' не будет настроен из-за предыдущей ошибки: {module_info.error}"
                     )
                     continue
-                await self._setup_single_module(
-                    module_info,
-                    dp,
-                    bot,
-                    import_base_path="Systems." + self.core_sys_modules_root_dir.parent.name
-                    + "."
-                    + self.core_sys_modules_root_dir.name,
-                )
+                system_modules_to_setup.append(module_info)
+        await self._setup_modules_by_dependency_levels(
+            system_modules_to_setup,
+            dp,
+            bot,
+            import_base_path=self._sys_import_base,
+        )
         self._logger.info("Настройка системных модулей ядра завершена.")
 
         if not self.enabled_plugin_names:
             self._logger.info("Нет активных плагинов для настройки.")
         else:
             self._logger.info(f"Настройка {len(self.enabled_plugin_names)} активных плагинов...")
+            plugins_to_setup: List[ModuleInfo] = []
             for plugin_name in self.enabled_plugin_names:
                 module_info = self.available_modules.get(plugin_name)
                 if not module_info:
@@ -609,7 +849,8 @@ class ModuleLoader:
                         f"Модуль '{plugin_name}' не будет настроен из-за предыдущей ошибки: {module_info.error}"
                     )
                     continue
-                await self._setup_single_module(module_info, dp, bot, import_base_path="Modules")
+                plugins_to_setup.append(module_info)
+            await self._setup_modules_by_dependency_levels(plugins_to_setup, dp, bot, import_base_path="Modules")
             self._logger.info("Настройка активных плагинов завершена.")
 
     def get_module_info(self, module_name: str) -> Optional[ModuleInfo]:
@@ -632,21 +873,20 @@ class ModuleLoader:
             if module_info.current_settings:
                 return module_info.current_settings
             elif module_info.manifest and module_info.manifest.settings:
-                manifest_defaults = {
-                    k: v.default for k, v in module_info.manifest.settings.items() if v.default is not None
-                }
+                manifest_defaults = module_info.manifest.default_settings
                 if manifest_defaults:
                     self._logger.debug(
-                        f"current_settings для модуля '{module_name}' пусты, возвращаем дефолты из манифеста."
+                        "current_settings для модуля '{}' пусты, возвращаем дефолты из манифеста.", module_name
                     )
-                    return manifest_defaults
+                    # Копия: изменения вызывающего кода не должны попадать в кэшированные дефолты манифеста
+                    return dict(manifest_defaults)
                 else:
                     self._logger.debug(
-                        f"Модуль '{module_name}' не имеет актуальных или дефолтных настроек в манифесте."
+                        "Модуль '{}' не имеет актуальных или дефолтных настроек в манифесте.", module_name
                     )
                     return {}  # Возвращаем пустой словарь, если нет ни current_settings, ни дефолтов в манифесте
             else:
-                self._logger.debug(f"Модуль '{module_name}' не имеет описания настроек в манифесте.")
+                self._logger.debug("Модуль '{}' не имеет описания настроек в манифесте.", module_name)
                 return {}  # Возвращаем пустой словарь
         self._logger.warning(f"Попытка получить настройки для неизвестного модуля '{module_name}'.")
         return None
@@ -659,27 +899,23 @@ class ModuleLoader:
         """
         all_perms: Dict[str, PermissionManifest] = {}
 
-        modules_to_check: List[ModuleInfo] = []
+        # Имя модуля -> ModuleInfo: dict сохраняет порядок и проверяет дубли за O(1)
+        modules_to_check: Dict[str, ModuleInfo] = {}
         # Добавляем активные плагины
         for module_name in self.enabled_plugin_names:
             module_info = self.available_modules.get(module_name)
             if module_info and not module_info.is_system_module and not module_info.error:
-                modules_to_check.append(module_info)
+                modules_to_check[module_info.name] = module_info
 
-        # Добавляем системные модули
+        # Добавляем системные модули (setdefault - если системный модуль как-то попал в enabled_plugin_names)
         for module_info in self.available_modules.values():
             if module_info.is_system_module and not module_info.error:
-                if (
-                    module_info not in modules_to_check
-                ):  # Избегаем дублирования, если системный модуль как-то попал в enabled_plugin_names
-                    modules_to_check.append(module_info)
+                modules_to_check.setdefault(module_info.name, module_info)
 
-        for module_info in modules_to_check:
+        for module_info in modules_to_check.values():
             if module_info.manifest and module_info.manifest.declared_permissions:
                 for perm_mft in module_info.manifest.declared_permissions:
-                    if perm_mft.name not in all_perms:
-                        all_perms[perm_mft.name] = perm_mft
-                    else:
+                    if all_perms.setdefault(perm_mft.name, perm_mft) is not perm_mft:
                         self._logger.warning(
                             f"Дублирующееся объявление разрешения '{perm_mft.name}' "
                             f"обнаружено (модуль: '{module_info.name}'). Будет использовано первое встреченное."
@@ -4,6 +4,8 @@ Health check endpoints для мониторинга
 """
 
 import asyncio
+import time
+from collections import Counter
 from typing import Dict, Optional, List
 from datetime import datetime
 from loguru import logger
@@ -11,6 +13,7 @@ from loguru import logger
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from Systems.core.services_provider import BotServicesProvider
+    from Systems.core.database.module_migrations import ModuleMigrationManager
 
 
 class HealthStatus:
@@ -38,9 +41,20 @@ class HealthChecker:
     Проверка здоровья системы и компонентов
     """
     
-    def __init__(self, services_provider: Optional['BotServicesProvider'] = None):
+    def __init__(
+        self,
+        services_provider: Optional['BotServicesProvider'] = None,
+        migration_manager: Optional['ModuleMigrationManager'] = None,
+        cache_ttl: float = 2.0
+    ):
         self.services = services_provider
+        self.migration_manager = migration_manager
         self._logger = logger.bind(service="HealthChecker")
+        # Результат check_all переиспользуется cache_ttl секунд, чтобы частые опросы не дергали БД/кэш/Telegram
+        self.cache_ttl = cache_ttl
+        self._cache_result: Optional[Dict] = None
+        self._cache_expires: float = 0.0
+        self._cache_lock = asyncio.Lock()
     
     async def check_database(self) -> HealthStatus:
         """Проверка состояния базы данных"""
@@ -52,14 +66,14 @@ class HealthChecker:
                     "DBManager не инициализирован"
                 )
             
-            start_time = datetime.now()
+            start = time.perf_counter()
             async with self.services.db.get_session() as session:
                 # Простой запрос для проверки соединения
                 from sqlalchemy import text
                 result = await session.execute(text("SELECT 1"))
                 result.scalar()
             
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start
             
             if duration > 1.0:
                 return HealthStatus(
@@ -105,11 +119,11 @@ class HealthChecker:
             test_key = "__health_check__"
             test_value = "test"
             
-            start_time = datetime.now()
+            start = time.perf_counter()
             await self.services.cache.set(test_key, test_value, ttl=10)
             cached_value = await self.services.cache.get(test_key)
             await self.services.cache.delete(test_key)
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start
             
             if cached_value != test_value:
                 return HealthStatus(
@@ -143,9 +157,9 @@ class HealthChecker:
                     "Bot не инициализирован"
                 )
             
-            start_time = datetime.now()
+            start = time.perf_counter()
             bot_info = await self.services.bot.get_me()
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start
             
             return HealthStatus(
                 "telegram_api",
@@ -198,17 +212,16 @@ class HealthChecker:
                 status = "healthy"
                 message = f"Все модули загружены ({loaded}/{total})"
             
-            return HealthStatus(
-                "modules",
-                status,
-                message,
-                {
-                    "total": total,
-                    "loaded": loaded,
-                    "failed": failed,
-                    "failed_modules": [m.name for m in failed_modules]
-                }
-            )
+            details = {
+                "total": total,
+                "loaded": loaded,
+                "failed": failed,
+                "failed_modules": [m.name for m in failed_modules]
+            }
+            if self.migration_manager is not None:
+                details["migrations"] = self.migration_manager.get_migration_status_all()
+            
+            return HealthStatus("modules", status, message, details)
         
         except Exception as e:
             self._logger.error(f"Modules health check failed: {e}")
@@ -225,6 +238,19 @@ class HealthChecker:
         Returns:
             Словарь с результатами всех проверок
         """
+        if self._cache_result is not None and time.monotonic() < self._cache_expires:
+            return self._cache_result
+        async with self._cache_lock:
+            # Пока ждали блокировку, результат мог обновить другой запрос
+            if self._cache_result is not None and time.monotonic() < self._cache_expires:
+                return self._cache_result
+            result = await self._run_all_checks()
+            if self.cache_ttl > 0:
+                self._cache_result = result
+                self._cache_expires = time.monotonic() + self.cache_ttl
+            return result
+    
+    async def _run_all_checks(self) -> Dict:
         checks = await asyncio.gather(
             self.check_database(),
             self.check_cache(),
@@ -259,22 +285,14 @@ class HealthChecker:
     async def get_health_summary(self) -> Dict:
         """Краткая сводка о здоровье системы"""
         health_data = await self.check_all()
+        status_counts = Counter(c["status"] for c in health_data["checks"].values())
         
         return {
             "status": health_data["status"],
             "timestamp": health_data["timestamp"],
             "checks_count": len(health_data["checks"]),
-            "healthy_count": sum(
-                1 for c in health_data["checks"].values() 
-                if c["status"] == "healthy"
-            ),
-            "degraded_count": sum(
-                1 for c in health_data["checks"].values() 
-                if c["status"] == "degraded"
-            ),
-            "unhealthy_count": sum(
-                1 for c in health_data["checks"].values() 
-                if c["status"] == "unhealthy"
-            )
+            "healthy_count": status_counts["healthy"],
+            "degraded_count": status_counts["degraded"],
+            "unhealthy_count": status_counts["unhealthy"]
         }
 
@@ -4,7 +4,8 @@ Prometheus метрики для мониторинга
 """
 
 import time
-from typing import Dict, Optional, Any
+from functools import lru_cache
+from typing import Dict, Optional, Any, Tuple
 from collections import defaultdict
 from datetime import datetime
 from loguru import logger
@@ -13,6 +14,42 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from Systems.core.services_provider import BotServicesProvider
 
+# (атрибут Update, тип события для меток) - проверяются по порядку
+_EVENT_TYPES = (
+    ("message", "message"),
+    ("callback_query", "callback"),
+    ("inline_query", "inline_query"),
+)
+
+@lru_cache(maxsize=1024)
+def _format_labeled_key(name: str, label_items: Tuple[Tuple[str, str], ...]) -> str:
+    # Набор (имя, лейблы) у middleware фиксирован - сортировка и сборка строки выполняются один раз на набор
+    label_str = ",".join(f"{k}={v}" for k, v in sorted(label_items))
+    return f"{name}{{{label_str}}}"
+
+
+class _HistogramStats:
+    """Агрегаты гистограммы, обновляемые при каждой записи"""
+    
+    __slots__ = ("count", "sum", "min", "max")
+    
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = 0.0
+        self.max = 0.0
+    
+    def add(self, value: float) -> None:
+        if self.count:
+            if value < self.min:
+                self.min = value
+            elif value > self.max:
+                self.max = value
+        else:
+            self.min = self.max = value
+        self.count += 1
+        self.sum += value
+
 
 class MetricsCollector:
     """
@@ -25,8 +62,8 @@ class MetricsCollector:
         # Счетчики
         self._counters: Dict[str, int] = defaultdict(int)
         
-        # Метрики времени выполнения
-        self._histograms: Dict[str, list] = defaultdict(list)
+        # Метрики времени выполнения: count/sum/min/max считаются при записи, а не при экспорте
+        self._histograms: Dict[str, _HistogramStats] = defaultdict(_HistogramStats)
         
         # Gauge метрики (текущие значения)
         self._gauges: Dict[str, float] = defaultdict(float)
@@ -43,10 +80,7 @@ class MetricsCollector:
     def record_histogram(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
         """Записать значение в гистограмму"""
         key = self._format_key(name, labels)
-        self._histograms[key].append(value)
-        # Храним только последние 1000 значений
-        if len(self._histograms[key]) > 1000:
-            self._histograms[key] = self._histograms[key][-1000:]
+        self._histograms[key].add(value)
         self._last_update[key] = datetime.now()
     
     def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
@@ -59,8 +93,7 @@ class MetricsCollector:
         """Форматирует ключ метрики с лейблами"""
         if not labels:
             return name
-        label_str = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
-        return f"{name}{{{label_str}}}"
+        return _format_labeled_key(name, tuple(labels.items()))
     
     def get_prometheus_format(self) -> str:
         """
@@ -79,16 +112,14 @@ class MetricsCollector:
             lines.append(f"{key} {value}")
         
         # Histograms (как summary)
-        for key, values in self._histograms.items():
-            if values:
+        for key, stats in self._histograms.items():
+            if stats.count:
                 lines.append(f"# TYPE {key.split('{')[0]} summary")
-                lines.append(f"{key}_count {len(values)}")
-                lines.append(f"{key}_sum {sum(values)}")
-                lines.append(f"{key}_avg {sum(values) / len(values)}")
-                if values:
-                    sorted_values = sorted(values)
-                    lines.append(f"{key}_min {sorted_values[0]}")
-                    lines.append(f"{key}_max {sorted_values[-1]}")
+                lines.append(f"{key}_count {stats.count}")
+                lines.append(f"{key}_sum {stats.sum}")
+                lines.append(f"{key}_avg {stats.sum / stats.count}")
+                lines.append(f"{key}_min {stats.min}")
+                lines.append(f"{key}_max {stats.max}")
         
         return "\n".join(lines) + "\n"
     
@@ -99,13 +130,13 @@ class MetricsCollector:
             "gauges": dict(self._gauges),
             "histograms": {
                 k: {
-                    "count": len(v),
-                    "sum": sum(v),
-                    "avg": sum(v) / len(v) if v else 0,
-                    "min": min(v) if v else 0,
-                    "max": max(v) if v else 0
+                    "count": stats.count,
+                    "sum": stats.sum,
+                    "avg": stats.sum / stats.count if stats.count else 0,
+                    "min": stats.min,
+                    "max": stats.max
                 }
-                for k, v in self._histograms.items()
+                for k, stats in self._histograms.items()
             }
         }
 
@@ -124,13 +155,10 @@ class MetricsMiddleware:
         start_time = time.time()
         
         # Определяем тип события
-        event_type = "unknown"
-        if hasattr(event, 'message') and event.message:
-            event_type = "message"
-        elif hasattr(event, 'callback_query') and event.callback_query:
-            event_type = "callback"
-        elif hasattr(event, 'inline_query') and event.inline_query:
-            event_type = "inline_query"
+        event_type = next(
+            (type_name for attr, type_name in _EVENT_TYPES if getattr(event, attr, None)),
+            "unknown"
+        )
         
         # Увеличиваем счетчик событий
         self.metrics.increment_counter(
@@ -1,5 +1,6 @@
 # core/schemas/module_manifest.py
 
+from functools import cached_property
 from typing import List, Optional, Dict, Any, Union, Literal
 from pydantic import BaseModel, Field, field_validator, HttpUrl, ValidationInfo
 import re
@@ -63,6 +64,33 @@ class SettingManifest(BaseModel):
             except re.error as e: raise ValueError(f"Невалидный regex в 'regex_validator': {e}")
         return v
 
+    @cached_property
+    def compiled_regex(self) -> Optional['re.Pattern[str]']:
+        """Скомпилированный regex_validator (компилируется один раз на манифест)."""
+        return re.compile(self.regex_validator) if self.regex_validator is not None else None
+
+    @cached_property
+    def option_values(self) -> tuple:
+        """Значения вариантов из options (SettingChoiceOption разворачивается в .value), вычисляются один раз."""
+        return tuple(opt.value if isinstance(opt, SettingChoiceOption) else opt for opt in (self.options or ()))
+
+    @cached_property
+    def _option_values_set(self) -> Optional[frozenset]:
+        try:
+            return frozenset(self.option_values)
+        except TypeError:  # Нехэшируемые значения вариантов - проверка перебором
+            return None
+
+    def is_valid_option(self, value: Any) -> bool:
+        """Проверяет, что value - одно из допустимых значений options."""
+        option_values_set = self._option_values_set
+        if option_values_set is not None:
+            try:
+                return value in option_values_set
+            except TypeError:  # Нехэшируемое значение не может совпасть с хэшируемыми вариантами
+                return False
+        return value in self.option_values
+
     @field_validator('default', mode='after') 
     @classmethod
     def _check_default_for_required(cls, v: Optional[Any], info: ValidationInfo) -> Optional[Any]:
@@ -129,6 +157,11 @@ class ModuleManifest(BaseModel):
     background_tasks: Dict[str, BackgroundTaskManifest] = Field(default_factory=dict)
     metadata: ModuleMetadata = Field(default_factory=ModuleMetadata) # <--- ИЗМЕНЕНО: metadata теперь не Optional, чтобы всегда было поле assign_default_access_to_user_role
 
+    @cached_property
+    def default_settings(self) -> Dict[str, Any]:
+        """Значения default из описаний настроек (None пропускаются), вычисляются один раз на манифест."""
+        return {key: setting.default for key, setting in self.settings.items() if setting.default is not None}
+
     @field_validator('version', mode='before')
     @classmethod
     def _validate_module_version_format(cls, v: str) -> str:
@@ -1,5 +1,6 @@
 # core/services_provider.py
 
+import asyncio
 from typing import Optional, TYPE_CHECKING
 
 from loguru import logger as global_logger 
@@ -21,6 +22,8 @@ if TYPE_CHECKING:
     from Systems.core.security.code_scanner import ModuleCodeScanner
     from Systems.core.security.security_levels import SecurityLevelManager
     from Systems.core.security.anomaly_detection import AnomalyDetector
+    from Systems.core.logging_manager import LoggingManager
+    from Systems.core.database.module_migrations import ModuleMigrationManager
 
 
 class BotServicesProvider:
@@ -46,6 +49,11 @@ class BotServicesProvider:
         self._security_level_manager: Optional['SecurityLevelManager'] = None
         self._anomaly_detector: Optional['AnomalyDetector'] = None
 
+        # LoggingManager создается точкой входа до провайдера; ссылка нужна веб-панели (фоновые задачи логов)
+        self.logging_manager: Optional['LoggingManager'] = None
+        # Менеджер миграций модулей создается точкой входа после загрузки модулей (статусы - в health check)
+        self.migration_manager: Optional['ModuleMigrationManager'] = None
+
         self._logger.info(f"BotServicesProvider создан (версия SDB: {settings.core.sdb_version}). Ожидает настройки сервисов.")
 
     async def setup_services(self) -> None:
@@ -53,7 +61,8 @@ class BotServicesProvider:
         
         from Systems.core.database.manager import DBManager 
         try:
-            self._db_manager = DBManager(db_settings=self._settings.db, app_settings=self._settings)
+            # Конструктор DBManager делает Path.resolve()/mkdir для SQLite - выносим его из event loop
+            self._db_manager = await asyncio.to_thread(DBManager, db_settings=self._settings.db, app_settings=self._settings)
             await self._db_manager.initialize() 
             self._logger.success("Сервис DBManager успешно настроен.")
         except Exception as e:
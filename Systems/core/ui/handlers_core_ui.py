@@ -22,6 +22,7 @@ from Systems.core.database.core_models import User as DBUser
 from Systems.core.ui.registry_ui import ModuleUIEntry 
 from sqlalchemy import select 
 from Systems.core.i18n.translator import Translator
+from Systems.core.i18n.middleware import LOCALE_CHANGED_EVENT
 from Systems.core.module_loader import get_module_permission_to_check 
 
 from typing import TYPE_CHECKING, Optional, List, Union, Dict
@@ -44,7 +45,8 @@ def _get_translator_for_handler(services_provider: 'BotServicesProvider') -> 'Tr
             locales_dir=services_provider.config.core.i18n.locales_dir,
             domain=services_provider.config.core.i18n.domain,
             default_locale=services_provider.config.core.i18n.default_locale,
-            available_locales=services_provider.config.core.i18n.available_locales
+            available_locales=services_provider.config.core.i18n.available_locales,
+            cache_dir=services_provider.config.core.i18n_cache_dir
         )
     return _translator_cache
 
@@ -1128,6 +1130,10 @@ async def cq_profile_set_language(
                     # Обновляем объект sdb_user
                     sdb_user.preferred_language_code = saved_lang
                     language_updated = True
+                    # Сбрасываем закэшированный язык в I18nMiddleware
+                    events = getattr(services_provider, "events", None)
+                    if events:
+                        await events.publish(LOCALE_CHANGED_EVENT, user_id, saved_lang)
                     
                     logger.success(f"[{MODULE_NAME_FOR_LOG}] Язык для пользователя {user_id} успешно изменен на {new_lang_code} в БД (подтверждено: {saved_lang}).")
                     
@@ -27,7 +27,8 @@ def _get_translator(services_provider: 'BotServicesProvider') -> 'Translator':
             locales_dir=services_provider.config.core.i18n.locales_dir,
             domain=services_provider.config.core.i18n.domain,
             default_locale=services_provider.config.core.i18n.default_locale,
-            available_locales=services_provider.config.core.i18n.available_locales
+            available_locales=services_provider.config.core.i18n.available_locales,
+            cache_dir=services_provider.config.core.i18n_cache_dir
         )
     return _translator_cache 
 
@@ -375,11 +376,12 @@ async def get_language_selection_keyboard( # Остается инлайн
         if not locale:
             locale = current_lang_code or services_provider.config.core.i18n.default_locale
         translator = _get_translator(services_provider)
+        locale_translations = translator.load_translation(locale) or {}
         
         for lang_code in available_locales:
             prefix = "✅ " if lang_code == current_lang_code else "▫️ "
             lang_key = f"language_{lang_code}"
-            display_name = translator.gettext(lang_key, locale) if lang_key in translator._translations.get(locale, {}) else lang_code.upper()
+            display_name = translator.gettext(lang_key, locale) if lang_key in locale_translations else lang_code.upper()
             builder.button(
                 text=f"{prefix}{display_name}",
                 callback_data=CoreMenuNavigate(target_menu="profile_set_lang", payload=lang_code).pack()
@@ -47,7 +47,8 @@ async def cq_nav_to_main_menu(
         locales_dir=services_provider.config.core.i18n.locales_dir,
         domain=services_provider.config.core.i18n.domain,
         default_locale=services_provider.config.core.i18n.default_locale,
-        available_locales=services_provider.config.core.i18n.available_locales
+        available_locales=services_provider.config.core.i18n.available_locales,
+        cache_dir=services_provider.config.core.i18n_cache_dir
     )
     
     text = translator.gettext("main_menu_title", user_locale)
@@ -100,7 +101,8 @@ async def cq_nav_to_modules_list(
         locales_dir=services_provider.config.core.i18n.locales_dir,
         domain=services_provider.config.core.i18n.domain,
         default_locale=services_provider.config.core.i18n.default_locale,
-        available_locales=services_provider.config.core.i18n.available_locales
+        available_locales=services_provider.config.core.i18n.available_locales,
+        cache_dir=services_provider.config.core.i18n_cache_dir
     )
     
     module_ui_entries = services_provider.ui_registry.get_all_module_entries()
@@ -6,6 +6,7 @@ from loguru import logger
 from datetime import datetime, timezone 
 
 from Systems.core.database.core_models import User as DBUser
+from Systems.core.database.request_cache import RequestCache, REQUEST_CACHE_DATA_KEY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -47,11 +48,16 @@ class UserStatusMiddleware(BaseMiddleware):
         user_service: 'UserService' = services_provider.user_service
         user_was_created_in_this_middleware_call = False # Флаг для этого вызова middleware
 
+        request_cache: Optional[RequestCache] = data.get(REQUEST_CACHE_DATA_KEY)
         try:
             async with services_provider.db.get_session() as session:
-                stmt = select(DBUser).where(DBUser.telegram_id == user_tg_id)
-                result = await session.execute(stmt)
-                db_user = result.scalars().first()
+                if request_cache is not None:
+                    # Пользователь мог быть уже загружен в этом Update (например, I18nMiddleware)
+                    db_user = await request_cache.get_or_load(session, DBUser, user_tg_id, DBUser.telegram_id)
+                else:
+                    stmt = select(DBUser).where(DBUser.telegram_id == user_tg_id)
+                    result = await session.execute(stmt)
+                    db_user = result.scalars().first()
         except Exception as e_get_user:
             logger.error(f"[{MODULE_NAME_FOR_LOG}] Ошибка БД при первоначальном получении пользователя {user_mention}: {e_get_user}", exc_info=True)
             if event.message: await event.message.reply("Внутренняя ошибка сервера. Попробуйте позже.")
@@ -149,6 +155,8 @@ class UserStatusMiddleware(BaseMiddleware):
             
         logger.trace(f"[{MODULE_NAME_FOR_LOG}] Пользователь {user_mention} (DB ID: {db_user.id}) проверки прошел. Доступ разрешен.")
         data['sdb_user'] = db_user
+        if request_cache is not None:
+            request_cache.put(DBUser, user_tg_id, db_user, DBUser.telegram_id)
         # --- ПЕРЕДАЕМ ФЛАГ О СОЗДАНИИ В ХЭНДЛЕР /start ---
         if is_start_command: # Только для команды /start передаем этот флаг
             data['user_was_just_created'] = user_was_created_in_this_middleware_call
@@ -94,14 +94,27 @@ def create_app(sdb_services=None, debug: bool = False) -> FastAPI:
                 return FileResponse(str(index_path))
             return HTMLResponse("<h1>SwiftDevBot Dashboard</h1><p>Please build the frontend: npm run build</p>")
     
+    # One HealthChecker per app so its short-lived check_all cache is shared between requests
+    health_checker = None
+
+    def get_health_checker():
+        nonlocal health_checker
+        if health_checker is None:
+            from Systems.core.monitoring.health import HealthChecker
+            health_checker = HealthChecker(
+                sdb_services, migration_manager=getattr(sdb_services, 'migration_manager', None)
+            )
+        elif health_checker.migration_manager is None:
+            # Менеджер миграций появляется после загрузки модулей - подхватываем его, когда он создан
+            health_checker.migration_manager = getattr(sdb_services, 'migration_manager', None)
+        return health_checker
+
     # API routes
     @app.get("/api/health")
     async def health_check():
         """Health check endpoint."""
         if sdb_services:
-            from Systems.core.monitoring.health import HealthChecker
-            health_checker = HealthChecker(sdb_services)
-            return await health_checker.get_health_summary()
+            return await get_health_checker().get_health_summary()
         return {
             "status": "healthy",
             "service": "SwiftDevBot Dashboard",
@@ -112,9 +125,7 @@ def create_app(sdb_services=None, debug: bool = False) -> FastAPI:
     async def health_check_detailed():
         """Detailed health check endpoint."""
         if sdb_services:
-            from Systems.core.monitoring.health import HealthChecker
-            health_checker = HealthChecker(sdb_services)
-            return await health_checker.check_all()
+            return await get_health_checker().check_all()
         return {
             "status": "healthy",
             "service": "SwiftDevBot Dashboard",
@@ -989,25 +1000,12 @@ def create_app(sdb_services=None, debug: bool = False) -> FastAPI:
             if not payload:
                 return []
             
-            # Try to get scheduler from LoggingManager
+            # Background jobs of LoggingManager (asyncio tasks)
             jobs = []
             if sdb_services:
-                try:
-                    # Access LoggingManager's scheduler
-                    logging_manager = getattr(sdb_services, 'logging_manager', None)
-                    if logging_manager and hasattr(logging_manager, '_scheduler') and logging_manager._scheduler:
-                        scheduler = logging_manager._scheduler
-                        for job in scheduler.get_jobs():
-                            jobs.append({
-                                "id": job.id,
-                                "name": job.name or job.id,
-                                "func": job.func.__name__ if hasattr(job.func, '__name__') else str(job.func),
-                                "next_run_time": job.next_run_time.isoformat() if job.next_run_time else None,
-                                "trigger": str(job.trigger) if job.trigger else None,
-                            })
-                except Exception as e:
-                    # If scheduler is not available, return empty list
-                    pass
+                logging_manager = getattr(sdb_services, 'logging_manager', None)
+                if logging_manager is not None:
+                    jobs = logging_manager.get_scheduled_jobs()
             
             return jobs
         except Exception:
@@ -0,0 +1,128 @@
+"""
+Тесты для массовой записи в кэш (mset)
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from Systems.core.cache.manager import BaseCache, CacheManager, MemoryCache, RedisCache, RedisError
+
+
+class _RecordingCache(BaseCache):
+    """Бэкенд без своего mset: проверяется базовая реализация через set()"""
+
+    def __init__(self):
+        self.set_calls = []
+
+    async def initialize(self): pass
+    async def dispose(self): pass
+    async def get(self, key): return None
+    async def delete(self, key): return False
+    async def exists(self, key): return False
+    async def clear(self): pass
+
+    async def set(self, key, value, ttl_seconds=None):
+        self.set_calls.append((key, value, ttl_seconds))
+
+
+def _make_redis_cache():
+    cache = RedisCache(redis_url="redis://localhost:6379/0")
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[True, True])
+    client = MagicMock()
+    client.pipeline.return_value = pipe
+    cache._redis_client = client
+    return cache, client, pipe
+
+
+class TestBaseCacheMset:
+    """Тесты базовой реализации mset"""
+
+    async def test_mset_falls_back_to_set_per_key_with_ttl(self):
+        """Тест: без собственного mset каждый ключ пишется set() со своим TTL"""
+        cache = _RecordingCache()
+        await cache.mset({"a": (1, 60), "b": ({"x": 2}, None)})
+        assert cache.set_calls == [("a", 1, 60), ("b", {"x": 2}, None)]
+
+    async def test_memory_cache_mset_respects_per_key_ttl(self, monkeypatch):
+        """Тест: ручная реализация MemoryCache (без cachetools) хранит срок жизни каждого ключа"""
+        cache = MemoryCache(default_ttl=300)
+        cache._cache, cache._maxsize, cache._uses_cachetools = {}, 10, False
+        now = 1_000.0
+        monkeypatch.setattr("Systems.core.cache.manager.time.time", lambda: now)
+
+        await cache.mset({"short": ("s", 10), "default": ("d", None)})
+        assert (await cache.get("short"), await cache.get("default")) == ("s", "d")
+
+        now += 11
+        assert await cache.get("short") is None
+        assert await cache.get("default") == "d"
+
+
+class TestRedisCacheMset:
+    """Тесты mset для RedisCache"""
+
+    async def test_mset_uses_single_non_transactional_pipeline(self):
+        """Тест: все ключи отправляются одним pipeline(transaction=False), TTL передается как EX"""
+        cache, client, pipe = _make_redis_cache()
+
+        await cache.mset({"a": ({"x": "ж"}, 60), "b": (2, None)})
+
+        client.pipeline.assert_called_once_with(transaction=False)
+        assert [call.args + (call.kwargs["ex"],) for call in pipe.set.call_args_list] == [
+            ("a", json.dumps({"x": "ж"}, ensure_ascii=False), 60),
+            ("b", "2", None),
+        ]
+        pipe.execute.assert_awaited_once()
+        client.set.assert_not_called()
+
+    async def test_mset_skips_unserializable_values(self):
+        """Тест: значение, которое не сериализуется в JSON, пропускается, остальные пишутся"""
+        cache, _, pipe = _make_redis_cache()
+        circular = {}
+        circular["self"] = circular
+
+        await cache.mset({"bad": (circular, 10), "ok": ("ok", 10)})
+
+        assert [call.args[0] for call in pipe.set.call_args_list] == ["ok"]
+        pipe.execute.assert_awaited_once()
+
+    async def test_mset_without_items_or_client_does_nothing(self):
+        """Тест: пустой набор ключей и отсутствие клиента не создают pipeline"""
+        cache, client, _ = _make_redis_cache()
+        await cache.mset({})
+        client.pipeline.assert_not_called()
+
+        cache._redis_client = None
+        await cache.mset({"a": (1, 10)})
+        client.pipeline.assert_not_called()
+
+    async def test_mset_redis_error_is_logged_not_raised(self):
+        """Тест: ошибка Redis при выполнении pipeline не пробрасывается"""
+        cache, _, pipe = _make_redis_cache()
+        pipe.execute.side_effect = RedisError("connection lost")
+        await cache.mset({"a": (1, 10)})
+        pipe.execute.assert_awaited_once()
+
+
+class TestCacheManagerMset:
+    """Тесты mset в CacheManager"""
+
+    async def test_mset_delegates_to_backend(self):
+        """Тест: CacheManager передает пачку бэкенду целиком"""
+        manager = CacheManager(SimpleNamespace(type="memory", redis_url=None))
+        await manager.initialize()
+        try:
+            await manager.mset({"a": (1, 60), "b": (2, None)})
+            assert (await manager.get("a"), await manager.get("b")) == (1, 2)
+        finally:
+            await manager.dispose()
+
+    async def test_mset_is_noop_when_cache_unavailable(self):
+        """Тест: без доступного бэкенда mset ничего не делает и не падает"""
+        manager = CacheManager(SimpleNamespace(type="unknown", redis_url=None))
+        await manager.initialize()
+        assert not manager.is_available()
+        await manager.mset({"a": (1, 60)})
+        assert await manager.get("a") is None
@@ -0,0 +1,195 @@
+"""
+Тесты для DBManager
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from Systems.core.app_settings import DBSettings
+from Systems.core.database.manager import DBManager
+
+
+def _make_app_settings(project_data_path):
+    app_settings = MagicMock()
+    app_settings.core.project_data_path = project_data_path
+    return app_settings
+
+
+class TestDBManager:
+    """Тесты для класса DBManager"""
+
+    def test_sqlite_url_is_built_on_construction(self, tmp_path):
+        """Тест: URL SQLite и каталог БД готовятся в конструкторе, без движка"""
+        db_settings = DBSettings(type="sqlite", sqlite_path="Database_files/test.db")
+        manager = DBManager(db_settings=db_settings, app_settings=_make_app_settings(tmp_path))
+
+        expected_path = (tmp_path / "Database_files" / "test.db").resolve()
+        assert manager.db_url == f"sqlite+aiosqlite:///{expected_path}"
+        assert expected_path.parent.is_dir()
+        assert manager._engine is None
+
+    def test_unsupported_db_type_fails_on_construction(self, tmp_path):
+        """Тест: некорректные настройки БД обнаруживаются при создании DBManager"""
+        db_settings = DBSettings.model_construct(type="oracle")
+        with pytest.raises(ValueError):
+            DBManager(db_settings=db_settings, app_settings=_make_app_settings(tmp_path))
+
+    async def test_sqlite_pragmas_applied_on_connect(self, tmp_path):
+        """Тест: PRAGMA SQLite применяются к новым соединениям"""
+        from sqlalchemy import text
+
+        db_settings = DBSettings(type="sqlite", sqlite_path="Database_files/test.db")
+        manager = DBManager(db_settings=db_settings, app_settings=_make_app_settings(tmp_path))
+        await manager.initialize()
+        try:
+            async with manager.get_session() as session:
+                journal_mode = (await session.execute(text("PRAGMA journal_mode"))).scalar()
+                synchronous = (await session.execute(text("PRAGMA synchronous"))).scalar()
+            assert journal_mode.lower() == "wal"
+            assert synchronous == 1  # NORMAL
+        finally:
+            await manager.dispose()
+
+    async def test_module_tables_create_and_drop_by_dependency_levels(self, tmp_path, monkeypatch):
+        """Тест создания/удаления таблиц модуля с учетом внешних ключей (на SQLite - одной транзакцией)"""
+        from types import SimpleNamespace
+        from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table, inspect
+
+        metadata = MetaData()
+        parent = Table("test_ddl_parent", metadata, Column("id", Integer, primary_key=True))
+        child = Table(
+            "test_ddl_child", metadata,
+            Column("id", Integer, primary_key=True),
+            Column("parent_id", Integer, ForeignKey("test_ddl_parent.id")),
+        )
+        other = Table("test_ddl_other", metadata, Column("id", Integer, primary_key=True))
+        models = [SimpleNamespace(__table__=table) for table in (child, other, parent)]
+
+        db_settings = DBSettings(type="sqlite", sqlite_path="Database_files/test.db")
+        manager = DBManager(db_settings=db_settings, app_settings=_make_app_settings(tmp_path))
+
+        async def _no_per_table_ddl(*args, **kwargs):
+            raise AssertionError("на SQLite DDL не должен разбиваться на транзакции по таблицам")
+
+        monkeypatch.setattr(manager, "_run_table_ddl_concurrently", _no_per_table_ddl)
+        await manager.initialize()
+        try:
+            await manager.create_specific_module_tables(models)
+            async with manager._engine.connect() as conn:
+                table_names = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+            assert {"test_ddl_parent", "test_ddl_child", "test_ddl_other"} <= set(table_names)
+
+            await manager.drop_specific_module_tables(models)
+            async with manager._engine.connect() as conn:
+                table_names = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+            assert not {"test_ddl_parent", "test_ddl_child", "test_ddl_other"} & set(table_names)
+        finally:
+            await manager.dispose()
+
+
+async def test_parallel_drop_is_not_atomic(tmp_path, monkeypatch):
+    """Тест: при параллельном DDL ошибка на одном уровне оставляет уже удаленные таблицы удаленными"""
+    from types import SimpleNamespace
+    from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table, inspect
+
+    metadata = MetaData()
+    parent = Table("test_par_parent", metadata, Column("id", Integer, primary_key=True))
+    child = Table(
+        "test_par_child", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("parent_id", Integer, ForeignKey("test_par_parent.id")),
+    )
+    models = [SimpleNamespace(__table__=table) for table in (parent, child)]
+
+    db_settings = DBSettings(type="sqlite", sqlite_path="Database_files/test.db")
+    manager = DBManager(db_settings=db_settings, app_settings=_make_app_settings(tmp_path))
+    # Имитируем СУБД с параллельным DDL (PostgreSQL/MySQL): по уровню на таблицу, транзакция на таблицу
+    monkeypatch.setattr(manager, "_ddl_parallelism", lambda: 2)
+    await manager.initialize()
+    try:
+        await manager.create_specific_module_tables(models)
+
+        def _failing_drop(*args, **kwargs):
+            raise RuntimeError("drop failed")
+
+        monkeypatch.setattr(parent, "drop", _failing_drop)
+        with pytest.raises(RuntimeError):
+            await manager.drop_specific_module_tables(models)
+
+        async with manager._engine.connect() as conn:
+            table_names = set(await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names()))
+        # Зависимая таблица удалена своей транзакцией, родительская осталась
+        assert "test_par_child" not in table_names
+        assert "test_par_parent" in table_names
+    finally:
+        await manager.dispose()
+
+
+def test_group_tables_by_dependency_level():
+    """Тест разбиения таблиц на независимые уровни"""
+    from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table
+    from Systems.core.database.manager import _group_tables_by_dependency_level
+
+    metadata = MetaData()
+    a = Table("a", metadata, Column("id", Integer, primary_key=True))
+    b = Table("b", metadata, Column("id", Integer, primary_key=True), Column("a_id", ForeignKey("a.id")))
+    c = Table("c", metadata, Column("id", Integer, primary_key=True))
+    d = Table("d", metadata, Column("id", Integer, primary_key=True), Column("b_id", ForeignKey("b.id")))
+
+    levels = _group_tables_by_dependency_level([d, c, b, a])
+    assert [set(level) for level in levels] == [{a, c}, {b}, {d}]
+
+
+def test_group_tables_by_dependency_level_detects_cycle():
+    """Тест: при циклических внешних ключах уровни не строятся"""
+    from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table
+    from Systems.core.database.manager import _group_tables_by_dependency_level
+
+    metadata = MetaData()
+    a = Table("a", metadata, Column("id", Integer, primary_key=True), Column("b_id", ForeignKey("b.id")))
+    b = Table("b", metadata, Column("id", Integer, primary_key=True), Column("a_id", ForeignKey("a.id")))
+
+    assert _group_tables_by_dependency_level([a, b]) is None
+
+
+async def test_module_tables_with_cyclic_foreign_keys_created_and_dropped(tmp_path):
+    """Тест: таблицы с циклическими внешними ключами создаются и удаляются целиком"""
+    from types import SimpleNamespace
+    from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table, inspect
+
+    metadata = MetaData()
+    a = Table("test_cycle_a", metadata, Column("id", Integer, primary_key=True),
+              Column("b_id", ForeignKey("test_cycle_b.id")))
+    b = Table("test_cycle_b", metadata, Column("id", Integer, primary_key=True),
+              Column("a_id", ForeignKey("test_cycle_a.id")))
+    models = [SimpleNamespace(__table__=table) for table in (a, b)]
+
+    db_settings = DBSettings(type="sqlite", sqlite_path="Database_files/test.db")
+    manager = DBManager(db_settings=db_settings, app_settings=_make_app_settings(tmp_path))
+    await manager.initialize()
+    try:
+        await manager.create_specific_module_tables(models)
+        async with manager._engine.connect() as conn:
+            table_names = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+        assert {"test_cycle_a", "test_cycle_b"} <= set(table_names)
+
+        await manager.drop_specific_module_tables(models)
+        async with manager._engine.connect() as conn:
+            table_names = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+        assert not {"test_cycle_a", "test_cycle_b"} & set(table_names)
+    finally:
+        await manager.dispose()
+
+
+async def test_read_only_session_reads_data(tmp_path):
+    """Тест: read_only_session позволяет читать данные"""
+    from sqlalchemy import text
+
+    db_settings = DBSettings(type="sqlite", sqlite_path="Database_files/test.db")
+    manager = DBManager(db_settings=db_settings, app_settings=_make_app_settings(tmp_path))
+    await manager.initialize()
+    try:
+        async with manager.read_only_session() as session:
+            assert (await session.execute(text("SELECT 1"))).scalar() == 1
+    finally:
+        await manager.dispose()
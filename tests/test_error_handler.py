@@ -51,3 +51,60 @@ class TestCustomExceptions:
         assert error.error_code == "MODULE_ERROR"
         assert error.module_name == "test_module"
 
+
+class TestErrorHandlerMiddleware:
+    """Тесты для ErrorHandlerMiddleware"""
+
+    def test_resolve_error_handler_by_mro(self):
+        """Тест выбора обработчика по иерархии исключений"""
+        middleware = ErrorHandlerMiddleware()
+
+        class CustomRateLimitError(RateLimitError):
+            pass
+
+        assert middleware._resolve_error_handler(RateLimitError) == middleware._handle_rate_limit_error
+        assert middleware._resolve_error_handler(CustomRateLimitError) == middleware._handle_rate_limit_error
+        assert middleware._resolve_error_handler(DatabaseError) == middleware._handle_database_error
+        assert middleware._resolve_error_handler(KeyError) == middleware._handle_unexpected_error
+
+    async def test_error_is_dispatched_to_handler(self):
+        """Тест: исключение из хэндлера обрабатывается и не пробрасывается"""
+        middleware = ErrorHandlerMiddleware()
+        event = MagicMock()
+        event.message.answer = AsyncMock()
+
+        async def failing_handler(event, data):
+            raise ValidationError("Invalid input", field="username")
+
+        result = await middleware(failing_handler, event, {})
+        assert result is None
+        event.message.answer.assert_awaited_once()
+        assert "Invalid input" in event.message.answer.await_args.args[0]
+
+    async def test_callback_query_error_uses_alert(self):
+        """Тест: для callback_query ошибка прав показывается через alert"""
+        middleware = ErrorHandlerMiddleware()
+        event = MagicMock()
+        event.message = None
+        event.callback_query.answer = AsyncMock()
+
+        async def failing_handler(event, data):
+            raise PermissionError("Access denied", permission="module.action")
+
+        await middleware(failing_handler, event, {})
+        event.callback_query.answer.assert_awaited_once()
+        assert event.callback_query.answer.await_args.kwargs["show_alert"] is True
+
+    async def test_telegram_bad_request_reply_by_message(self):
+        """Тест выбора ответа для TelegramBadRequest по тексту ошибки"""
+        from aiogram.exceptions import TelegramBadRequest
+
+        middleware = ErrorHandlerMiddleware()
+        event = MagicMock()
+        event.message.answer = AsyncMock()
+
+        async def failing_handler(event, data):
+            raise TelegramBadRequest(method=MagicMock(), message="Bad Request: message is too long")
+
+        await middleware(failing_handler, event, {})
+        assert event.message.answer.await_args.args[0] == "❌ Сообщение слишком длинное."
@@ -0,0 +1,144 @@
+"""
+Тесты для EventDispatcher
+"""
+
+import pytest
+from Systems.core.events.dispatcher import EventDispatcher
+
+
+class TestEventDispatcher:
+    """Тесты для класса EventDispatcher"""
+
+    async def test_publish_without_listeners(self):
+        """Тест публикации события без подписчиков"""
+        dispatcher = EventDispatcher()
+        assert await dispatcher.publish("sdb:test:event") == []
+        assert dispatcher.get_listeners_count("sdb:test:event") == 0
+
+    async def test_publish_calls_all_listeners(self):
+        """Тест вызова всех подписчиков с аргументами"""
+        dispatcher = EventDispatcher()
+        calls = []
+
+        async def first(value, flag=False):
+            calls.append(("first", value, flag))
+            return 1
+
+        async def second(value, flag=False):
+            calls.append(("second", value, flag))
+            return 2
+
+        dispatcher.subscribe("sdb:test:event", first)
+        dispatcher.subscribe("sdb:test:event", second)
+
+        results = await dispatcher.publish("sdb:test:event", "x", flag=True)
+        assert results == [1, 2]
+        assert calls == [("first", "x", True), ("second", "x", True)]
+
+    async def test_listener_exception_is_returned(self):
+        """Тест: исключение обработчика возвращается в результатах, остальные выполняются"""
+        dispatcher = EventDispatcher()
+
+        async def failing():
+            raise ValueError("boom")
+
+        async def ok():
+            return "ok"
+
+        dispatcher.subscribe("sdb:test:event", failing)
+        dispatcher.subscribe("sdb:test:event", ok)
+
+        results = await dispatcher.publish("sdb:test:event")
+        assert isinstance(results[0], ValueError)
+        assert results[1] == "ok"
+
+    def test_subscribe_rejects_sync_handler(self):
+        """Тест: синхронный обработчик не принимается"""
+        dispatcher = EventDispatcher()
+        with pytest.raises(TypeError):
+            dispatcher.subscribe("sdb:test:event", lambda: None)
+
+    async def test_unsubscribe(self):
+        """Тест отписки обработчика"""
+        dispatcher = EventDispatcher()
+
+        async def handler():
+            return None
+
+        dispatcher.subscribe("sdb:test:event", handler)
+        assert dispatcher.get_listeners_count("sdb:test:event") == 1
+
+        dispatcher.unsubscribe("sdb:test:event", handler)
+        assert dispatcher.get_listeners_count("sdb:test:event") == 0
+        assert dispatcher.get_listeners_count() == {}
+
+        # Повторная отписка не должна падать
+        dispatcher.unsubscribe("sdb:test:event", handler)
+
+    async def test_unsubscribe_during_publish_does_not_affect_snapshot(self):
+        """Тест: отписка во время публикации не меняет уже взятый список обработчиков"""
+        dispatcher = EventDispatcher()
+        calls = []
+
+        async def first():
+            calls.append("first")
+            dispatcher.unsubscribe("sdb:test:event", second)
+
+        async def second():
+            calls.append("second")
+
+        dispatcher.subscribe("sdb:test:event", first)
+        dispatcher.subscribe("sdb:test:event", second)
+
+        await dispatcher.publish("sdb:test:event")
+        assert calls == ["first", "second"]
+        assert dispatcher.get_listeners_count("sdb:test:event") == 1
+
+    async def test_single_listener_exception_is_returned(self):
+        """Тест: исключение единственного обработчика возвращается в результатах"""
+        dispatcher = EventDispatcher()
+
+        async def failing():
+            raise ValueError("boom")
+
+        dispatcher.subscribe("sdb:test:event", failing)
+
+        results = await dispatcher.publish("sdb:test:event")
+        assert len(results) == 1
+        assert isinstance(results[0], ValueError)
+
+    async def test_publish_respects_max_concurrent(self):
+        """Тест ограничения числа одновременно выполняемых обработчиков"""
+        import asyncio
+
+        dispatcher = EventDispatcher(max_concurrent=2)
+        in_flight = 0
+        peak = 0
+
+        async def handler():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return True
+
+        for _ in range(5):
+            # Разные функции, т.к. обработчики хранятся как есть
+            async def wrapped():
+                return await handler()
+            dispatcher.subscribe("sdb:test:event", wrapped)
+
+        results = await dispatcher.publish("sdb:test:event")
+        assert results == [True] * 5
+        assert peak == 2
+
+    async def test_reading_unknown_events_does_not_create_entries(self):
+        """Тест: публикация и подсчет по неизвестным событиям не создают пустых записей"""
+        dispatcher = EventDispatcher()
+
+        await dispatcher.publish("sdb:test:unknown")
+        dispatcher.get_listeners_count("sdb:test:unknown")
+        dispatcher.unsubscribe("sdb:test:unknown", self.test_unsubscribe)
+
+        assert dispatcher._listeners == {}
@@ -119,3 +119,63 @@ class TestHealthChecker:
             assert "checks" in result
             assert len(result["checks"]) == 4
 
+
+    @pytest.mark.asyncio
+    async def test_check_modules_includes_migration_status(self, mock_services):
+        """Тест: статусы миграций модулей попадают в детали проверки модулей"""
+        migration_manager = MagicMock()
+        migration_manager.get_migration_status_all.return_value = {"weather": "running"}
+        checker = HealthChecker(mock_services, migration_manager=migration_manager)
+        mock_services.modules.get_all_modules_info.return_value = []
+        
+        status = await checker.check_modules()
+        assert status.status == "healthy"
+        assert status.details["migrations"] == {"weather": "running"}
+
+    @pytest.mark.asyncio
+    async def test_response_time_measured_with_perf_counter(self, mock_services):
+        """Тест: время ответа считается по монотонным часам perf_counter"""
+        checker = HealthChecker(mock_services)
+        mock_services.bot.get_me = AsyncMock(return_value=MagicMock(id=1, username="sdb_bot"))
+        
+        with patch("Systems.core.monitoring.health.time.perf_counter", side_effect=[10.0, 10.25]):
+            status = await checker.check_telegram_api()
+        assert status.status == "healthy"
+        assert status.details["response_time"] == 0.25
+
+    @pytest.mark.asyncio
+    async def test_check_all_result_cached_for_ttl(self, mock_services):
+        """Тест: одновременные и повторные вызовы check_all в пределах TTL выполняют проверки один раз"""
+        import asyncio
+
+        checker = HealthChecker(mock_services, cache_ttl=60)
+        check_database = AsyncMock(return_value=HealthStatus("database", "healthy", ""))
+        
+        with patch.object(checker, 'check_database', check_database), \
+             patch.object(checker, 'check_cache', AsyncMock(return_value=HealthStatus("cache", "healthy", ""))), \
+             patch.object(checker, 'check_telegram_api', AsyncMock(return_value=HealthStatus("telegram_api", "healthy", ""))), \
+             patch.object(checker, 'check_modules', AsyncMock(return_value=HealthStatus("modules", "healthy", ""))):
+            
+            first, second = await asyncio.gather(checker.check_all(), checker.check_all())
+            assert first is second
+            assert await checker.check_all() is first
+            assert check_database.await_count == 1
+            
+            checker._cache_expires = 0.0
+            await checker.check_all()
+            assert check_database.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_health_summary_counts_statuses(self, mock_services):
+        """Тест подсчета статусов в кратком отчете"""
+        checker = HealthChecker(mock_services)
+        
+        with patch.object(checker, 'check_database', AsyncMock(return_value=HealthStatus("database", "healthy", ""))), \
+             patch.object(checker, 'check_cache', AsyncMock(return_value=HealthStatus("cache", "degraded", ""))), \
+             patch.object(checker, 'check_telegram_api', AsyncMock(return_value=HealthStatus("telegram_api", "unhealthy", ""))), \
+             patch.object(checker, 'check_modules', AsyncMock(return_value=HealthStatus("modules", "healthy", ""))):
+            
+            summary = await checker.get_health_summary()
+        assert summary["status"] == "unhealthy"
+        assert summary["checks_count"] == 4
+        assert (summary["healthy_count"], summary["degraded_count"], summary["unhealthy_count"]) == (2, 1, 1)
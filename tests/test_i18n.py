@@ -0,0 +1,324 @@
+"""
+Тесты для I18nMiddleware и Translator
+"""
+
+import pytest
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from Systems.core.i18n.translator import Translator
+from Systems.core.i18n.middleware import I18nMiddleware, LOCALE_CHANGED_EVENT
+from Systems.core.events.dispatcher import EventDispatcher
+
+
+LOCALES_DIR = Path(__file__).resolve().parent.parent / "Systems" / "locales"
+
+
+class _FakeUser:
+    def __init__(self, lang):
+        self.preferred_language_code = lang
+
+
+class _FakeResult:
+    def __init__(self, row):
+        self._row = row
+
+    def scalars(self):
+        return self
+
+    def first(self):
+        return self._row
+
+
+class _FakeSession:
+    def __init__(self, db):
+        self._db = db
+
+    async def execute(self, stmt, *args, **kwargs):
+        self._db.queries += 1
+        return _FakeResult(_FakeUser(self._db.lang))
+
+
+class _FakeDB:
+    def __init__(self, lang):
+        self.lang = lang
+        self.queries = 0
+
+    @asynccontextmanager
+    async def read_only_session(self):
+        yield _FakeSession(self)
+
+
+class _FakeServices:
+    def __init__(self, db):
+        self.db = db
+
+
+class _FakeTgUser:
+    def __init__(self, user_id, language_code="ru"):
+        self.id = user_id
+        self.language_code = language_code
+
+
+async def _locale_handler(event, data):
+    return data["user_locale"]
+
+
+@pytest.fixture
+def translator():
+    return Translator(LOCALES_DIR, default_locale="ru")
+
+
+class TestI18nMiddleware:
+    """Тесты для класса I18nMiddleware"""
+
+    async def test_locale_is_cached_between_updates(self, translator):
+        """Тест: язык из БД запрашивается один раз, затем берется из кэша"""
+        db = _FakeDB("en")
+        middleware = I18nMiddleware(translator)
+        data = {"event_from_user": _FakeTgUser(1), "services_provider": _FakeServices(db)}
+
+        assert await middleware(_locale_handler, None, dict(data)) == "en"
+        assert await middleware(_locale_handler, None, dict(data)) == "en"
+        assert db.queries == 1
+
+    async def test_locale_changed_event_invalidates_cache(self, translator):
+        """Тест: событие смены языка сбрасывает кэш"""
+        events = EventDispatcher()
+        db = _FakeDB("en")
+        middleware = I18nMiddleware(translator, events=events)
+        data = {"event_from_user": _FakeTgUser(1), "services_provider": _FakeServices(db)}
+
+        assert await middleware(_locale_handler, None, dict(data)) == "en"
+        db.lang = "ua"
+        await events.publish(LOCALE_CHANGED_EVENT, 1, "ua")
+        assert await middleware(_locale_handler, None, dict(data)) == "ua"
+        assert db.queries == 2
+
+    async def test_cache_respects_maxsize(self, translator):
+        """Тест вытеснения старых записей при переполнении кэша"""
+        db = _FakeDB("en")
+        middleware = I18nMiddleware(translator, locale_cache_maxsize=2)
+        services = _FakeServices(db)
+
+        for user_id in (1, 2, 3):
+            await middleware(_locale_handler, None, {"event_from_user": _FakeTgUser(user_id), "services_provider": services})
+        assert len(middleware._locale_cache) == 2
+        assert 1 not in middleware._locale_cache
+
+    async def test_gettext_helpers_are_reused(self, translator):
+        """Тест: для одного языка в data передаются одни и те же функции перевода"""
+        middleware = I18nMiddleware(translator)
+        captured = []
+
+        async def handler(event, data):
+            captured.append((data["gettext"], data["ngettext"]))
+            return data["gettext"]("main_menu_title")
+
+        result = await middleware(handler, None, {})
+        await middleware(handler, None, {})
+        assert captured[0][0] is captured[1][0]
+        assert captured[0][1] is captured[1][1]
+        assert result == translator.gettext("main_menu_title", translator.default_locale)
+
+    async def test_user_is_loaded_through_request_cache(self, translator):
+        """Тест: при наличии кэша запроса пользователь берется из него"""
+        from Systems.core.database.request_cache import RequestCache
+        from Systems.core.database.core_models import User as DBUser
+
+        class _CachedUser:
+            preferred_language_code = "en"
+
+        request_cache = RequestCache()
+        request_cache.put(DBUser, 1, _CachedUser(), DBUser.telegram_id)
+        db = _FakeDB("ua")
+        middleware = I18nMiddleware(translator)
+        data = {
+            "event_from_user": _FakeTgUser(1),
+            "services_provider": _FakeServices(db),
+            "request_cache": request_cache,
+        }
+
+        assert await middleware(_locale_handler, None, data) == "en"
+        assert db.queries == 0
+
+    async def test_request_cache_is_created_when_missing(self, translator):
+        """Тест: без RequestCacheMiddleware пользователь все равно загружается через кэш запроса"""
+        from Systems.core.database.request_cache import RequestCache
+
+        db = _FakeDB("en")
+        middleware = I18nMiddleware(translator)
+        data = {"event_from_user": _FakeTgUser(1), "services_provider": _FakeServices(db)}
+
+        assert await middleware(_locale_handler, None, data) == "en"
+        assert isinstance(data["request_cache"], RequestCache)
+        assert db.queries == 1
+
+
+def _write_locales(tmp_path, **locales):
+    for locale, content in locales.items():
+        (tmp_path / f"{locale}.yaml").write_text(content, encoding="utf-8")
+    return Translator(locales_dir=tmp_path, default_locale="ru")
+
+
+class TestTranslator:
+    """Тесты для Translator"""
+
+    def test_gettext_formats_precompiled_templates(self, tmp_path):
+        """Тест: шаблоны с плейсхолдерами форматируются, простые строки возвращаются как есть"""
+        translator = _write_locales(
+            tmp_path,
+            ru='plain: "Привет"\ngreet: "Привет, {name}!"\n',
+            en='greet: "Hello, {name}!"\n',
+        )
+        assert translator.gettext("plain", "ru") == "Привет"
+        assert translator.gettext("greet", "ru", name="Ann") == "Привет, Ann!"
+        assert translator.gettext("greet", "en", name="Ann") == "Hello, Ann!"
+        # Без kwargs шаблон возвращается неформатированным
+        assert translator.gettext("greet", "en") == "Hello, {name}!"
+
+    def test_gettext_is_not_shadowed_on_instance(self, tmp_path):
+        """Тест: gettext остается методом класса - его можно подменить в подклассе или через patch.object"""
+        from unittest.mock import patch
+
+        translator = _write_locales(tmp_path, ru='plain: "Привет"\n')
+        assert "gettext" not in vars(translator)
+        with patch.object(Translator, "gettext", return_value="подмена"):
+            assert translator.gettext("plain", "ru") == "подмена"
+        assert translator.gettext("plain", "ru") == "Привет"
+
+    def test_gettext_falls_back_to_default_locale(self, tmp_path):
+        """Тест: отсутствующий ключ берется из языка по умолчанию, неизвестный ключ возвращается как есть"""
+        translator = _write_locales(
+            tmp_path,
+            ru='only_ru: "Только {what}"\n',
+            en='other: "Other"\n',
+        )
+        assert translator.gettext("only_ru", "en", what="ru") == "Только ru"
+        assert translator.gettext("missing_key", "en") == "missing_key"
+
+    def test_gettext_returns_template_on_format_error(self, tmp_path):
+        """Тест: при нехватке аргументов возвращается неформатированный шаблон"""
+        translator = _write_locales(tmp_path, ru='greet: "Привет, {name}!"\n')
+        assert translator.gettext("greet", "ru", other="x") == "Привет, {name}!"
+
+    def test_translations_are_loaded_from_json_sidecar(self, tmp_path):
+        """Тест: JSON-копия создается в cache_dir (не рядом с YAML) и используется повторно"""
+        locales_dir = tmp_path / "locales"
+        cache_dir = tmp_path / "cache"
+        locales_dir.mkdir()
+        (locales_dir / "ru.yaml").write_text('greet: "Привет, {name}!"\n', encoding="utf-8")
+
+        Translator(locales_dir=locales_dir, default_locale="ru", cache_dir=cache_dir).gettext("greet", "ru")
+        sidecar = cache_dir / "ru.yaml.json"
+        assert sidecar.is_file()
+        assert list(locales_dir.glob("*.json")) == []
+
+        # Подменяем содержимое копии: если она свежее YAML, читается именно она
+        sidecar.write_text('{"greet": "Из кэша"}', encoding="utf-8")
+        translator = Translator(locales_dir=locales_dir, default_locale="ru", cache_dir=cache_dir)
+        assert translator.gettext("greet", "ru") == "Из кэша"
+
+    def test_json_sidecar_is_not_used_without_cache_dir(self, tmp_path):
+        """Тест: без cache_dir файлы переводов читаются только из YAML, копии не пишутся"""
+        translator = _write_locales(tmp_path, ru='greet: "Привет"\n')
+        assert translator.gettext("greet", "ru") == "Привет"
+        assert list(tmp_path.glob("*.json")) == []
+
+    def test_locales_are_loaded_lazily(self, tmp_path):
+        """Тест: язык загружается при первом обращении, eager_load загружает все сразу"""
+        for locale in ("ru", "en", "ua"):
+            (tmp_path / f"{locale}.yaml").write_text(f'hello: "{locale}"\n', encoding="utf-8")
+
+        translator = Translator(locales_dir=tmp_path, default_locale="ru")
+        assert translator._translations == {}
+        assert translator.gettext("hello", "en") == "en"
+        # Дефолтный язык подгружается вместе с запрошенным (для fallback), остальные - нет
+        assert set(translator._translations) == {"en", "ru"}
+
+        eager = Translator(locales_dir=tmp_path, default_locale="ru", eager_load=True)
+        assert set(eager._translations) == {"ru", "en", "ua"}
+
+    def test_unknown_locale_uses_default_translations(self, tmp_path):
+        """Тест: неизвестный язык получает переводы дефолтного и не кэшируется отдельно"""
+        translator = _write_locales(tmp_path, ru='hello: "Привет"\n', en='bye: "Bye"\n')
+        assert translator.gettext("hello", "de") == "Привет"
+        assert translator.gettext("hello", "en") == "Привет"
+        assert translator.gettext("bye", "en") == "Bye"
+        assert "de" not in translator._effective
+
+    def test_identical_values_are_shared_between_locales(self, tmp_path):
+        """Тест: одинаковые переводы разных языков хранятся одним объектом строки"""
+        translator = _write_locales(tmp_path, ru='ok: "OK"\n', en='ok: "OK"\n')
+        assert translator.gettext("ok", "ru") is translator.gettext("ok", "en")
+
+    def test_plain_strings_skip_formatting(self, tmp_path):
+        """Тест: строки без плейсхолдеров не оборачиваются в шаблон и возвращаются как есть даже с kwargs"""
+        translator = _write_locales(tmp_path, ru='plain: "Меню"\ngreet: "Привет, {name}!"\n')
+        assert translator.gettext("plain", "ru", name="Ann") is translator._compiled["ru"]["plain"]
+        assert translator._compiled["ru"]["plain"].__class__ is str
+        assert translator._compiled["ru"]["greet"].__class__ is not str
+
+    def test_ngettext_uses_locale_plural_rules(self, tmp_path):
+        """Тест: ngettext выбирает форму по правилам языка (ru - три формы, en - две)"""
+        translator = _write_locales(
+            tmp_path,
+            ru='file_one: "{count} файл"\nfile_few: "{count} файла"\nfile_many: "{count} файлов"\n',
+            en='file_one: "{count} file"\nfile_few: "{count} files"\n',
+        )
+        ru = [translator.ngettext("file_one", "file_few", n, "ru", many_key="file_many") for n in (1, 3, 5, 11, 21, 22, 112)]
+        assert ru == ["1 файл", "3 файла", "5 файлов", "11 файлов", "21 файл", "22 файла", "112 файлов"]
+        en = [translator.ngettext("file_one", "file_few", n, "en", many_key="file_many") for n in (1, 5, 21)]
+        assert en == ["1 file", "5 files", "21 files"]
+
+    def test_ngettext_uses_one_other_rule_for_locales_without_rules(self, tmp_path):
+        """Тест: язык без своего правила (de) использует формы one/other, а не правило языка по умолчанию (ru)"""
+        translator = _write_locales(
+            tmp_path,
+            ru='file_one: "{count} файл"\nfile_few: "{count} файла"\n',
+            de='file_one: "{count} Datei"\nfile_few: "{count} Dateien"\n',
+        )
+        de = [translator.ngettext("file_one", "file_few", n, "de") for n in (1, 5, 21)]
+        assert de == ["1 Datei", "5 Dateien", "21 Dateien"]
+
+    def test_missing_key_warning_is_logged_once(self, tmp_path):
+        """Тест: предупреждение об отсутствующем ключе пишется один раз на (язык, ключ)"""
+        from loguru import logger
+
+        translator = _write_locales(tmp_path, ru='hello: "Привет"\n')
+        warnings = []
+        handler_id = logger.add(warnings.append, level="WARNING", format="{message}")
+        try:
+            for _ in range(3):
+                assert translator.gettext("missing_key", "ru") == "missing_key"
+        finally:
+            logger.remove(handler_id)
+        assert len(warnings) == 1
+
+    def test_format_error_warning_contains_template_and_kwargs(self, tmp_path):
+        """Тест: предупреждение об ошибке форматирования содержит шаблон и kwargs (фигурные скобки не ломают вывод)"""
+        from loguru import logger
+
+        translator = _write_locales(tmp_path, ru='greet: "Привет, {name}!"\n')
+        warnings = []
+        handler_id = logger.add(warnings.append, level="WARNING", format="{message}")
+        try:
+            assert translator.gettext("greet", "ru", other="{x}") == "Привет, {name}!"
+        finally:
+            logger.remove(handler_id)
+        assert len(warnings) == 1
+        assert "Привет, {name}!" in warnings[0]
+        assert "{'other': '{x}'}" in warnings[0]
+
+    def test_count_only_templates_are_detected(self, tmp_path):
+        """Тест: шаблоны только с {count} помечаются для быстрой подстановки в ngettext"""
+        translator = _write_locales(
+            tmp_path,
+            ru='a: "{count} шт."\nb: "{count} из {total}"\nc: "{count:>3}"\nd: "{{count}} и {count}"\n',
+        )
+        translator.gettext("a", "ru")
+        compiled = translator._compiled["ru"]
+        assert [compiled[key].count_only for key in "abcd"] == [True, False, False, False]
+        assert translator.ngettext("a", "a", 5, "ru") == "5 шт."
+        assert translator.ngettext("c", "c", 5, "ru") == "  5"
+        assert translator.ngettext("b", "b", 5, "ru", total=7) == "5 из 7"
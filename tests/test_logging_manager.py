@@ -0,0 +1,369 @@
+"""
+Тесты для LoggingManager
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from Systems.core.app_settings import CoreAppSettings
+from Systems.core.logging_manager import LoggingManager
+
+
+def _make_manager(tmp_path, **core_overrides):
+    core = CoreAppSettings(project_data_path=tmp_path, **core_overrides)
+    return LoggingManager(app_settings=SimpleNamespace(core=core))
+
+
+class TestLoggingManager:
+    """Тесты для класса LoggingManager"""
+
+    def test_log_file_path_is_computed_without_creating_dirs(self, tmp_path):
+        """Тест: путь к часовому лог-файлу вычисляется без создания каталогов"""
+        manager = _make_manager(tmp_path, log_structured_dir="Logs")
+        path = manager._compute_log_file_path(datetime(2024, 3, 5, 7, 15, tzinfo=timezone.utc).utctimetuple())
+
+        assert path.relative_to(tmp_path / "Logs").parts[:3] == ("2024", "03-March", "05")
+        assert path.name == "07_sdb.log"
+        assert not (tmp_path / "Logs").exists()
+
+    async def test_cleanup_removes_only_expired_dirs(self, tmp_path):
+        """Тест: очистка удаляет каталоги старше периода хранения и оставляет текущие"""
+        manager = _make_manager(tmp_path, log_structured_dir="Logs", log_retention_period_structured="30 days")
+        old_log = tmp_path / "Logs" / "2000" / "01-January" / "01" / "00_sdb.log"
+        current_log = manager._get_log_file_path_for_current_hour()
+        for path in (old_log, current_log):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("log", encoding="utf-8")
+
+        await manager._cleanup_old_logs()
+
+        assert not (tmp_path / "Logs" / "2000").exists()
+        assert current_log.exists()
+
+    async def test_cleanup_compares_month_and_day_within_cutoff_year(self, tmp_path):
+        """Тест: в году отсечения сравниваются месяцы и дни"""
+        manager = _make_manager(tmp_path, log_structured_dir="Logs")
+        # parseDT возвращает naive datetime во времени sourceTime
+        cutoff = datetime(2024, 3, 10, 12, 0)
+        manager._pdt_calendar = SimpleNamespace(parseDT=lambda *args, **kwargs: (cutoff, 1))
+
+        root = tmp_path / "Logs" / "2024"
+        for relative in ("02-February/28", "03-March/09", "03-March/10", "04-April/01"):
+            (root / relative).mkdir(parents=True)
+
+        await manager._cleanup_old_logs()
+
+        assert not (root / "02-February").exists()
+        assert not (root / "03-March" / "09").exists()
+        assert (root / "03-March" / "10").exists()
+        assert (root / "04-April" / "01").exists()
+
+    async def test_cleanup_runs_in_executor_thread(self, tmp_path):
+        """Тест: блокирующая часть очистки выполняется вне потока event loop"""
+        import threading
+
+        manager = _make_manager(tmp_path, log_structured_dir="Logs")
+        threads = []
+        manager._cleanup_old_logs_sync = lambda: threads.append(threading.current_thread())
+
+        await manager._cleanup_old_logs()
+        assert threads and threads[0] is not threading.current_thread()
+
+    def test_retention_delta_is_parsed_once(self, tmp_path):
+        """Тест: период хранения разбирается один раз и кэшируется по строке"""
+        manager = _make_manager(tmp_path)
+        calls = []
+
+        def parse_dt(text, sourceTime):
+            calls.append(text)
+            return sourceTime.replace(tzinfo=None) - timedelta(days=30), 1
+
+        manager._pdt_calendar = SimpleNamespace(parseDT=parse_dt)
+        now = datetime.now(timezone.utc)
+        assert manager._get_retention_delta("30 days", now) == timedelta(days=30)
+        assert manager._get_retention_delta("30 days", now) == timedelta(days=30)
+        assert calls == ["30 days ago"]
+
+    def test_file_sink_writes_through_buffered_writer(self, tmp_path):
+        """Тест: файловый sink пишет записи через буферы потока записи и дописывает их при остановке"""
+        from loguru import logger
+        from Systems.core.logging_manager import _BufferedLogFileWriter
+
+        manager = _make_manager(tmp_path, log_structured_dir="Logs")
+        manager._setup_loguru_file_sink()
+        writer = manager._current_log_writer
+        assert isinstance(writer, _BufferedLogFileWriter)
+
+        for i in range(500):
+            logger.info("Запись {}", i)
+        log_path = manager._current_log_file_path
+        logger.remove(manager._current_log_handler_id)
+        manager._close_current_writer()
+
+        lines = log_path.read_text(encoding="utf-8").splitlines()
+        assert sum("Запись" in line for line in lines) == 500
+
+    def test_removing_file_handler_flushes_buffered_records(self, tmp_path):
+        """Тест: удаление хендлера (как при выходе из процесса) дописывает буферы в файл"""
+        from loguru import logger
+
+        manager = _make_manager(tmp_path, log_structured_dir="Logs")
+        manager._setup_loguru_file_sink()
+        log_path = manager._current_log_file_path
+
+        logger.critical("Последняя запись перед выходом")
+        logger.remove(manager._current_log_handler_id)
+
+        assert "Последняя запись перед выходом" in log_path.read_text(encoding="utf-8")
+        manager._close_current_writer()
+
+    @pytest.mark.parametrize("log_level, expect_locals", [("INFO", False), ("DEBUG", True)])
+    def test_file_sink_captures_locals_only_in_debug(self, tmp_path, log_level, expect_locals):
+        """Тест: значения локальных переменных в трассировке пишутся только при отладочном уровне"""
+        from loguru import logger
+
+        manager = _make_manager(tmp_path, log_structured_dir="Logs", log_level=log_level)
+        manager._setup_loguru_file_sink()
+        try:
+            secret_value = "секрет-12345"
+            len(secret_value) / 0
+        except ZeroDivisionError:
+            logger.exception("Ошибка")
+        log_path = manager._current_log_file_path
+        logger.remove(manager._current_log_handler_id)
+        manager._close_current_writer()
+
+        text = log_path.read_text(encoding="utf-8")
+        assert "ZeroDivisionError" in text
+        assert ("секрет-12345" in text.split("Ошибка", 1)[1]) is expect_locals
+
+    def test_log_dir_is_created_once_and_recreated_if_removed(self, tmp_path, monkeypatch):
+        """Тест: mkdir вызывается только для новых каталогов, а удаленный каталог создается заново"""
+        import shutil
+        from pathlib import Path
+        from loguru import logger
+
+        manager = _make_manager(tmp_path, log_structured_dir="Logs")
+        mkdir_calls = []
+        original_mkdir = Path.mkdir
+        monkeypatch.setattr(Path, "mkdir", lambda self, *a, **kw: (mkdir_calls.append(self), original_mkdir(self, *a, **kw)))
+
+        try:
+            manager._setup_loguru_file_sink()
+            calls_after_first_setup = len(mkdir_calls)
+            manager._setup_loguru_file_sink()
+            assert calls_after_first_setup and len(mkdir_calls) == calls_after_first_setup
+
+            manager._close_current_writer()
+            shutil.rmtree(tmp_path / "Logs")
+            manager._setup_loguru_file_sink()
+            assert manager._current_log_file_path.parent.is_dir()
+            assert manager._current_log_writer is not None
+        finally:
+            logger.remove(manager._current_log_handler_id)
+            manager._close_current_writer()
+
+    async def test_rotation_check_switches_file_without_new_handler(self, tmp_path):
+        """Тест: в новый час writer переключается на новый файл, хендлер loguru не пересоздается"""
+        from loguru import logger
+
+        manager = _make_manager(tmp_path, log_structured_dir="Logs")
+        await manager.initialize_logging()
+        try:
+            handler_id = manager._current_log_handler_id
+            writer = manager._current_log_writer
+            old_path = manager._current_log_file_path
+            await manager._hourly_log_rotation_check()
+            assert manager._current_log_file_path == old_path
+
+            logger.info("до смены часа")
+            new_path = tmp_path / "Logs" / "next" / "08_sdb.log"
+            manager._compute_log_file_path = lambda now: new_path
+            manager._current_hour_epoch -= 1  # Имитируем наступление следующего часа
+            await manager._hourly_log_rotation_check()
+            logger.info("после смены часа")
+
+            assert manager._current_log_handler_id == handler_id
+            assert manager._current_log_writer is writer
+            assert manager._current_log_file_path == new_path
+        finally:
+            await manager.shutdown_logging()
+
+        assert "до смены часа" in old_path.read_text(encoding="utf-8")
+        new_text = new_path.read_text(encoding="utf-8")
+        assert "после смены часа" in new_text and "до смены часа" not in new_text
+
+    async def test_initialize_and_shutdown_manage_background_tasks(self, tmp_path):
+        """Тест: фоновые задачи ротации и очистки создаются при старте и отменяются при остановке"""
+        manager = _make_manager(tmp_path, log_to_file=False)
+        await manager.initialize_logging()
+        tasks = list(manager._scheduled_tasks)
+        assert {task.get_name() for task in tasks} == {"sdb-log-rotation-check", "sdb-log-cleanup"}
+
+        await manager.shutdown_logging()
+        assert manager._scheduled_tasks == []
+        assert all(task.cancelled() for task in tasks)
+
+    def test_writer_rotates_and_compresses_by_size(self, tmp_path):
+        """Тест: при превышении размера файл переименовывается и сжимается (zst или zip)"""
+        from Systems.core.logging_manager import _BufferedLogFileWriter
+
+        writer = _BufferedLogFileWriter(tmp_path / "07_sdb.log", rotation_size=100, buffer_size=30)
+        for _ in range(10):
+            writer.write("x" * 30 + "\n")
+        writer.close()
+
+        from Systems.core.logging_manager import ZSTANDARD_AVAILABLE
+
+        suffix = "zst" if ZSTANDARD_AVAILABLE else "zip"
+        assert list(tmp_path.glob(f"07_sdb.*.log.{suffix}"))
+        assert not list(tmp_path.glob("07_sdb.*.log"))  # исходники удалены после сжатия
+        assert (tmp_path / "07_sdb.log").stat().st_size < 100
+
+
+def test_parse_size():
+    """Тест разбора размера ротации"""
+    from Systems.core.logging_manager import _parse_size
+
+    assert _parse_size("100 MB") == 100_000_000
+    assert _parse_size("1 KiB") == 1024
+    assert _parse_size("512") == 512
+    assert _parse_size("много") is None
+
+
+def test_writer_flushes_periodically(tmp_path):
+    """Тест: записи попадают на диск не позднее flush_interval без закрытия файла"""
+    import time
+    from Systems.core.logging_manager import _BufferedLogFileWriter
+
+    path = tmp_path / "app.log"
+    writer = _BufferedLogFileWriter(path, flush_interval=0.05)
+    try:
+        writer.write("строка\n")
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline and not path.stat().st_size:
+            time.sleep(0.01)
+        assert path.read_text(encoding="utf-8") == "строка\n"
+    finally:
+        writer.close()
+
+
+def test_writer_blocks_when_all_buffers_are_full(tmp_path):
+    """Тест: при маленьких буферах и множестве потоков все записи сохраняются (логирующие потоки ждут запись)"""
+    import threading
+    from Systems.core.logging_manager import _BufferedLogFileWriter
+
+    path = tmp_path / "app.log"
+    writer = _BufferedLogFileWriter(path, buffer_size=64, buffer_count=2)
+
+    def produce(thread_no):
+        for i in range(200):
+            writer.write(f"{thread_no}:{i}\n")
+
+    threads = [threading.Thread(target=produce, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 800
+    assert len(set(lines)) == 800
+
+
+def test_build_log_keep_sets():
+    """Тест наборов хранимых директорий логов"""
+    from Systems.core.logging_manager import _build_log_keep_sets
+
+    keep_years, keep_months, keep_days, partial_months = _build_log_keep_sets(
+        datetime(2023, 12, 30, tzinfo=timezone.utc), datetime(2024, 2, 2, tzinfo=timezone.utc)
+    )
+    assert keep_years == {"2023", "2024"}
+    assert keep_months == {("2023", "12"), ("2024", "01"), ("2024", "02")}
+    assert ("2023", "12", "29") not in keep_days
+    assert ("2024", "02", "03") in keep_days  # завтрашний день - запас на расхождение часов
+    assert partial_months == {("2023", "12"), ("2024", "02")}
+
+
+def test_seconds_until_next_run():
+    """Тест вычисления задержки до следующего часа и до 03:30 UTC"""
+    from Systems.core.logging_manager import _seconds_until_next_run
+
+    ts = datetime(2024, 3, 5, 7, 15, tzinfo=timezone.utc).timestamp()
+    assert _seconds_until_next_run(ts, 3600) == 45 * 60
+    assert _seconds_until_next_run(ts, 86400, 3 * 3600 + 30 * 60) == timedelta(hours=20, minutes=15).total_seconds()
+    # Ровно в момент запуска следующий запуск - через полный период
+    assert _seconds_until_next_run(ts - 15 * 60, 3600) == 3600
+
+
+def test_fast_rmtree_removes_tree_without_following_symlinks(tmp_path):
+    """Тест: _fast_rmtree удаляет дерево целиком, не заходя по символическим ссылкам"""
+    from Systems.core.logging_manager import _fast_rmtree
+
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "keep.log").write_text("keep", encoding="utf-8")
+    tree = tmp_path / "2000" / "01-January"
+    (tree / "01").mkdir(parents=True)
+    (tree / "01" / "00_sdb.log").write_text("log", encoding="utf-8")
+    (tree / "link").symlink_to(outside, target_is_directory=True)
+
+    _fast_rmtree(str(tmp_path / "2000"))
+    assert not (tmp_path / "2000").exists()
+    assert (outside / "keep.log").exists()
+
+    with pytest.raises(FileNotFoundError):
+        _fast_rmtree(str(tmp_path / "missing"))
+
+
+@pytest.mark.parametrize("tz_name", ["UTC0", "IST-5:30", "NST+3:30"])
+async def test_schedule_does_not_depend_on_local_timezone(tmp_path, monkeypatch, tz_name):
+    """Тест: фоновые задачи спят до следующего запуска по UTC при любом часовом поясе процесса"""
+    import asyncio
+    import time
+    from unittest.mock import AsyncMock
+
+    ts = datetime(2024, 3, 5, 7, 15, tzinfo=timezone.utc).timestamp()
+    monkeypatch.setenv("TZ", tz_name)
+    time.tzset()
+    try:
+        # Часовой пояс действительно применен: локальное время отличается от UTC (кроме самого UTC)
+        assert (time.localtime(ts).tm_gmtoff != 0) == (tz_name != "UTC0")
+        monkeypatch.setattr("Systems.core.logging_manager.time.time", lambda: ts)
+        sleep = AsyncMock(side_effect=asyncio.CancelledError)
+        monkeypatch.setattr("Systems.core.logging_manager.asyncio.sleep", sleep)
+        manager = _make_manager(tmp_path, log_to_file=False)
+        job = AsyncMock()
+
+        delays = []
+        for period, offset in ((3600, 0), (86400, 3 * 3600 + 30 * 60)):
+            with pytest.raises(asyncio.CancelledError):
+                await manager._run_periodically(job, period, offset)
+            delays.append(sleep.await_args.args[0])
+    finally:
+        monkeypatch.delenv("TZ")
+        time.tzset()
+
+    # 07:15 UTC: до следующего часа 45 минут, до 03:30 UTC - 20 ч 15 мин
+    assert delays == [45 * 60, timedelta(hours=20, minutes=15).total_seconds()]
+    job.assert_not_awaited()
+
+
+async def test_scheduled_jobs_are_reported_with_next_run(tmp_path):
+    """Тест: фоновые задачи LoggingManager доступны с интервалом и временем следующего запуска"""
+    manager = _make_manager(tmp_path, log_structured_dir="Logs", log_to_file=False)
+    await manager.initialize_logging()
+    try:
+        jobs = {job["id"]: job for job in manager.get_scheduled_jobs()}
+        assert set(jobs) == {"sdb-log-rotation-check", "sdb-log-cleanup"}
+        assert jobs["sdb-log-rotation-check"]["interval_seconds"] == 3600
+        assert jobs["sdb-log-cleanup"]["func"] == "_cleanup_old_logs"
+        next_cleanup = datetime.fromisoformat(jobs["sdb-log-cleanup"]["next_run_time"])
+        assert (next_cleanup.hour, next_cleanup.minute) == (3, 30)
+        assert next_cleanup.utcoffset() == timedelta(0)
+    finally:
+        await manager.shutdown_logging()
+    assert manager.get_scheduled_jobs() == []
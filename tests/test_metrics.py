@@ -32,6 +32,17 @@ class TestMetricsCollector:
         key = collector._format_key("test_counter", {"type": "test"})
         assert collector._counters[key] == 1
     
+    def test_format_key_sorts_labels_and_is_cached(self):
+        """Тест: ключ с метками не зависит от порядка меток и собирается один раз"""
+        from Systems.core.monitoring.metrics import _format_labeled_key
+        
+        collector = MetricsCollector()
+        _format_labeled_key.cache_clear()
+        assert collector._format_key("test_counter", {"type": "a", "error": "E"}) == "test_counter{error=E,type=a}"
+        assert collector._format_key("test_counter", {"type": "a", "error": "E"}) == "test_counter{error=E,type=a}"
+        assert collector._format_key("test_counter", None) == "test_counter"
+        assert _format_labeled_key.cache_info().hits == 1
+    
     def test_set_gauge(self):
         """Тест установки gauge"""
         collector = MetricsCollector()
@@ -48,8 +59,22 @@ class TestMetricsCollector:
         collector.record_histogram("test_histogram", 2.5)
         collector.record_histogram("test_histogram", 3.5)
         
-        assert len(collector._histograms["test_histogram"]) == 3
-        assert collector._histograms["test_histogram"] == [1.5, 2.5, 3.5]
+        stats = collector._histograms["test_histogram"]
+        assert stats.count == 3
+        assert (stats.sum, stats.min, stats.max) == (7.5, 1.5, 3.5)
+    
+    def test_histogram_keeps_aggregates_only(self):
+        """Тест: гистограмма не хранит сами значения, агрегаты считаются по всем записям"""
+        collector = MetricsCollector()
+        for i in range(1500):
+            collector.record_histogram("test_histogram", float(i))
+        
+        stats = collector._histograms["test_histogram"]
+        assert not hasattr(stats, "samples") and not hasattr(stats, "__dict__")
+        assert (stats.count, stats.min, stats.max) == (1500, 0.0, 1499.0)
+        
+        summary = collector.get_metrics_dict()["histograms"]["test_histogram"]
+        assert summary == {"count": 1500, "sum": stats.sum, "avg": stats.sum / 1500, "min": 0.0, "max": 1499.0}
     
     def test_get_prometheus_format(self):
         """Тест формата Prometheus"""
@@ -78,3 +103,30 @@ class TestMetricsCollector:
         assert "test_counter" in metrics_dict["counters"]
         assert "test_gauge" in metrics_dict["gauges"]
 
+
+
+class TestMetricsMiddleware:
+    """Тесты для MetricsMiddleware"""
+    
+    async def test_event_type_detected_and_counted(self):
+        """Тест определения типа события и подсчета успешных/ошибочных событий"""
+        from types import SimpleNamespace
+        from Systems.core.monitoring.metrics import MetricsMiddleware
+        
+        collector = MetricsCollector()
+        middleware = MetricsMiddleware(collector)
+        
+        async def ok_handler(event, data):
+            return "ok"
+        
+        async def failing_handler(event, data):
+            raise ValueError("boom")
+        
+        callback_event = SimpleNamespace(message=None, callback_query=object())
+        assert await middleware(ok_handler, callback_event, {}) == "ok"
+        with pytest.raises(ValueError):
+            await middleware(failing_handler, SimpleNamespace(), {})
+        
+        assert collector._counters["sdb_events_success_total{type=callback}"] == 1
+        assert collector._counters["sdb_events_error_total{error=ValueError,type=unknown}"] == 1
+        assert collector._histograms["sdb_event_duration_seconds{type=callback}"].count == 1
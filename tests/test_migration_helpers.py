@@ -0,0 +1,49 @@
+"""
+Тесты для вспомогательных функций миграций модулей
+"""
+
+from sqlalchemy import create_engine, event, inspect, text
+
+from Systems.core.database import migration_helpers
+
+
+def _make_items_table(connection, rows):
+    connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, flag INTEGER NOT NULL)"))
+    connection.execute(text("INSERT INTO items (id, flag) VALUES (:id, 0)"), [{"id": i} for i in range(rows)])
+    connection.commit()
+
+
+def test_batched_update_updates_all_rows_in_batches():
+    """Тест: UPDATE выполняется пачками, пока подходящие строки не закончатся"""
+    engine = create_engine("sqlite://")
+    statements = []
+    with engine.connect() as connection:
+        _make_items_table(connection, 25)
+        event.listen(connection, "before_execute", lambda *args: statements.append(args[1]))
+        updated = migration_helpers.batched_update(
+            connection,
+            "UPDATE items SET flag = :value WHERE id IN (SELECT id FROM items WHERE flag = 0 LIMIT :batch_size)",
+            batch_size=10,
+            params={"value": 1},
+        )
+        executed_batches = len(statements)
+        remaining = connection.execute(text("SELECT COUNT(*) FROM items WHERE flag = 0")).scalar()
+
+    assert updated == 25
+    assert remaining == 0
+    assert executed_batches == 3  # 10 + 10 + 5
+
+
+def test_create_index_concurrently_falls_back_outside_postgresql():
+    """Тест: вне PostgreSQL индекс создается обычным op.create_index"""
+    from alembic.operations import Operations
+    from alembic.runtime.migration import MigrationContext
+
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        _make_items_table(connection, 1)
+        op = Operations(MigrationContext.configure(connection))
+        migration_helpers.create_index_concurrently(op, "ix_items_flag", "items", ["flag"])
+        indexes = inspect(connection).get_indexes("items")
+
+    assert [index["name"] for index in indexes] == ["ix_items_flag"]
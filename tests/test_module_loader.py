@@ -0,0 +1,456 @@
+"""
+Тесты для ModuleLoader
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import yaml
+
+from Systems.core.app_settings import CoreAppSettings
+from Systems.core.module_loader import ModuleInfo, ModuleLoader
+from Systems.core.schemas.module_manifest import ModuleManifest
+
+
+def _make_loader(tmp_path, **core_overrides):
+    core = CoreAppSettings(project_data_path=tmp_path / "project_data", **core_overrides)
+    return ModuleLoader(settings=SimpleNamespace(core=core), services_provider=MagicMock())
+
+
+def _write_plugin(tmp_path, name, manifest, module_settings=None):
+    module_dir = tmp_path / "Modules" / name
+    module_dir.mkdir(parents=True)
+    (module_dir / "manifest.yaml").write_text(yaml.safe_dump(manifest, allow_unicode=True), encoding="utf-8")
+    if module_settings is not None:
+        (module_dir / "module_settings.yaml").write_text(yaml.safe_dump(module_settings), encoding="utf-8")
+    return module_dir
+
+
+_WEATHER_MANIFEST = {
+    "name": "weather",
+    "display_name": "Погода",
+    "version": "1.0.0",
+    "settings": {
+        "city": {"type": "string", "label": "Город", "default": "Москва"},
+        "days": {"type": "int", "label": "Дней", "default": 3, "min": 1, "max": 7},
+    },
+}
+
+
+class TestModuleLoader:
+    """Тесты для класса ModuleLoader"""
+
+    def test_scan_parses_manifest_and_creates_user_settings(self, tmp_path):
+        """Тест: манифест разбирается, а файл пользовательских настроек создается из дефолтов"""
+        _write_plugin(tmp_path, "weather", _WEATHER_MANIFEST, module_settings={"days": 5})
+        loader = _make_loader(tmp_path)
+
+        loader.scan_all_available_modules()
+
+        info = loader.get_module_info("weather")
+        assert info is not None and info.error is None
+        assert info.manifest.display_name == "Погода"
+        assert info.current_settings == {"city": "Москва", "days": 5}
+
+        user_file = loader.user_module_settings_base_path / "weather.yaml"
+        assert yaml.safe_load(user_file.read_text(encoding="utf-8")) == {"city": "Москва", "days": 5}
+        assert "Москва" in user_file.read_text(encoding="utf-8")  # allow_unicode сохраняется
+
+    def test_json_manifest_preferred_and_parsed_manifest_cached(self, tmp_path):
+        """Тест: JSON-манифест важнее YAML, а неизмененный манифест не разбирается повторно"""
+        import json
+        import os
+
+        module_dir = _write_plugin(tmp_path, "weather", {**_WEATHER_MANIFEST, "display_name": "Из YAML"})
+        json_manifest = module_dir / "manifest.json"
+        json_manifest.write_text(json.dumps({**_WEATHER_MANIFEST, "display_name": "Из JSON"}), encoding="utf-8")
+        loader = _make_loader(tmp_path)
+
+        first = loader._parse_manifest_file(module_dir)
+        assert first.display_name == "Из JSON"
+        assert loader._parse_manifest_file(module_dir) is first
+
+        json_manifest.write_text(json.dumps({**_WEATHER_MANIFEST, "display_name": "Обновлен"}), encoding="utf-8")
+        st = json_manifest.stat()
+        os.utime(json_manifest, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert loader._parse_manifest_file(module_dir).display_name == "Обновлен"
+
+    def test_enabled_plugin_names_loaded_from_list_and_dict(self, tmp_path):
+        """Тест: список активных плагинов читается в обоих форматах файла"""
+        import json
+
+        config_file = tmp_path / "enabled_modules.json"
+        loader = _make_loader(tmp_path, enabled_modules_config_path=config_file)
+
+        config_file.write_text(json.dumps(["weather", 42, "notes"]), encoding="utf-8")
+        loader._load_enabled_plugin_names()
+        assert loader.enabled_plugin_names == ["weather", "notes"]
+
+        config_file.write_text(json.dumps({"active_modules": ["notes"]}), encoding="utf-8")
+        loader._load_enabled_plugin_names()
+        assert loader.enabled_plugin_names == ["notes"]
+
+    def test_enabled_plugin_names_reparsed_only_when_file_changes(self, tmp_path, monkeypatch):
+        """Тест: неизмененный список плагинов не разбирается повторно, но is_enabled выставляется заново"""
+        import json
+        from Systems.core import module_loader as module_loader_mod
+
+        config_file = tmp_path / "enabled_modules.json"
+        config_file.write_text(json.dumps(["weather"]), encoding="utf-8")
+        _write_plugin(tmp_path, "weather", _WEATHER_MANIFEST)
+        loader = _make_loader(tmp_path, enabled_modules_config_path=config_file)
+        loader._load_enabled_plugin_names()
+
+        loader.scan_all_available_modules()
+        monkeypatch.setattr(module_loader_mod, "_load_json_file", MagicMock(side_effect=AssertionError("повторный разбор")))
+        loader._load_enabled_plugin_names()
+        assert loader.enabled_plugin_names == ["weather"]
+        assert loader.get_module_info("weather").is_enabled is True
+
+    def test_regex_validator_compiled_once_per_manifest(self, tmp_path):
+        """Тест: regex_validator компилируется один раз и применяется при валидации"""
+        manifest = {
+            **_WEATHER_MANIFEST,
+            "settings": {"code": {"type": "string", "label": "Код", "default": "ab1", "regex_validator": r"[a-z]+\d"}},
+        }
+        _write_plugin(tmp_path, "weather", manifest)
+        loader = _make_loader(tmp_path)
+        loader.scan_all_available_modules()
+
+        info = loader.get_module_info("weather")
+        setting = info.manifest.settings["code"]
+        assert setting.compiled_regex is setting.compiled_regex
+        assert info.current_settings == {"code": "ab1"}
+
+        (loader.user_module_settings_base_path / "weather.yaml").write_text("code: '123'\n", encoding="utf-8")
+        loader._load_and_validate_module_settings(info)
+        assert info.current_settings == {}
+        assert "не соответствует regex" in info.error
+
+    def test_settings_are_coerced_by_declared_type(self, tmp_path):
+        """Тест: значения настроек приводятся к типу из манифеста и проверяются по min/max"""
+        manifest = {
+            **_WEATHER_MANIFEST,
+            "settings": {
+                "enabled": {"type": "bool", "label": "Вкл", "default": "Yes"},
+                "days": {"type": "int", "label": "Дней", "default": "3", "min": 1, "max": 7},
+                "ratio": {"type": "float", "label": "Доля", "default": "0.5"},
+                "title": {"type": "text", "label": "Заголовок", "default": 10},
+                "unit": {"type": "choice", "label": "Ед.", "default": "c", "options": ["c", "f"]},
+            },
+        }
+        _write_plugin(tmp_path, "weather", manifest)
+        loader = _make_loader(tmp_path)
+        loader.scan_all_available_modules()
+
+        info = loader.get_module_info("weather")
+        assert info.current_settings == {"enabled": True, "days": 3, "ratio": 0.5, "title": "10", "unit": "c"}
+
+        (loader.user_module_settings_base_path / "weather.yaml").write_text("days: 9\nratio: abc\n", encoding="utf-8")
+        loader._load_and_validate_module_settings(info)
+        assert "days" not in info.current_settings and "ratio" not in info.current_settings
+        assert "> max (7)" in info.error and "ожидался float" in info.error
+
+    def test_scan_skips_hidden_dirs_and_plain_files(self, tmp_path):
+        """Тест: при сканировании пропускаются файлы и папки, начинающиеся с '.' или '_'"""
+        _write_plugin(tmp_path, "weather", _WEATHER_MANIFEST)
+        _write_plugin(tmp_path, "_draft", {**_WEATHER_MANIFEST, "name": "draft_module"})
+        (tmp_path / "Modules" / ".cache").mkdir()
+        (tmp_path / "Modules" / "README.md").write_text("docs", encoding="utf-8")
+        loader = _make_loader(tmp_path)
+
+        loader._scan_directory_for_modules(loader.plugins_root_dir, is_system_dir=False)
+        assert list(loader.available_modules) == ["weather"]
+
+    def test_scan_reads_user_settings_from_directory_snapshot(self, tmp_path, monkeypatch):
+        """Тест: пользовательские настройки берутся из одного прохода по каталогу, без открытия файла на модуль"""
+        from pathlib import Path
+
+        _write_plugin(tmp_path, "weather", _WEATHER_MANIFEST)
+        loader = _make_loader(tmp_path)
+        user_file = loader.user_module_settings_base_path / "weather.yaml"
+        user_file.write_text("city: Казань\n", encoding="utf-8")
+
+        def _fail_read_bytes(path):
+            raise AssertionError(f"Файл {path} прочитан повторно")
+
+        monkeypatch.setattr(Path, "read_bytes", _fail_read_bytes)
+        loader.scan_all_available_modules()
+
+        assert loader.get_module_info("weather").current_settings == {"city": "Казань", "days": 3}
+        assert loader._user_settings_blobs is None
+
+    async def test_modules_set_up_after_their_dependencies(self, tmp_path, monkeypatch):
+        """Тест: модуль настраивается после своей зависимости, даже если указан в списке раньше нее"""
+        package = tmp_path / "sdb_test_plugins_pkg"
+        package.mkdir()
+        (package / "__init__.py").write_text("SETUP_ORDER = []\n", encoding="utf-8")
+        for name in ("alpha", "beta", "gamma"):
+            module_dir = package / name
+            module_dir.mkdir()
+            (module_dir / "__init__.py").write_text(
+                "from sdb_test_plugins_pkg import SETUP_ORDER\n"
+                f"def setup_module(dp, bot, services):\n    SETUP_ORDER.append('{name}')\n",
+                encoding="utf-8",
+            )
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        loader = _make_loader(tmp_path)
+        infos = []
+        for name, deps in (("alpha", ["gamma"]), ("beta", []), ("gamma", [])):
+            manifest = ModuleManifest(name=name, display_name=name, version="1.0.0", sdb_module_dependencies=deps)
+            info = ModuleInfo(name=name, path=package / name, manifest=manifest, is_enabled=True)
+            loader.available_modules[name] = info
+            infos.append(info)
+
+        await loader._setup_modules_by_dependency_levels(infos, MagicMock(), MagicMock(), "sdb_test_plugins_pkg")
+
+        import sdb_test_plugins_pkg
+        assert sdb_test_plugins_pkg.SETUP_ORDER == ["beta", "gamma", "alpha"]
+        assert all(info.is_loaded_successfully for info in infos)
+
+        # Повторная настройка берет уже импортированный пакет из sys.modules
+        import asyncio
+        monkeypatch.setattr(asyncio, "to_thread", MagicMock(side_effect=AssertionError("повторный импорт")))
+        await loader._setup_single_module(infos[1], MagicMock(), MagicMock(), "sdb_test_plugins_pkg")
+        assert sdb_test_plugins_pkg.SETUP_ORDER[-1] == "beta"
+
+
+    def test_user_settings_copied_from_complete_module_defaults_file(self, tmp_path):
+        """Тест: если файл настроек модуля покрывает все настройки, он копируется как есть (с комментариями)"""
+        module_dir = _write_plugin(tmp_path, "weather", _WEATHER_MANIFEST)
+        defaults_bytes = "# Настройки погоды\ncity: Сочи\ndays: 2\n".encode("utf-8")
+        (module_dir / "module_settings.yaml").write_bytes(defaults_bytes)
+        loader = _make_loader(tmp_path)
+
+        loader.scan_all_available_modules()
+
+        user_file = loader.user_module_settings_base_path / "weather.yaml"
+        assert user_file.read_bytes() == defaults_bytes
+        assert loader.get_module_info("weather").current_settings == {"city": "Сочи", "days": 2}
+        assert not list(user_file.parent.glob(".*.tmp"))
+
+    def test_choice_setting_validated_against_option_values(self, tmp_path):
+        """Тест: значение choice сверяется со значениями вариантов, включая варианты-объекты"""
+        manifest = {
+            **_WEATHER_MANIFEST,
+            "settings": {"unit": {
+                "type": "choice", "label": "Ед.", "default": "c",
+                "options": ["c", {"value": "f", "display_name": "Фаренгейт"}],
+            }},
+        }
+        _write_plugin(tmp_path, "weather", manifest)
+        loader = _make_loader(tmp_path)
+        loader.scan_all_available_modules()
+        info = loader.get_module_info("weather")
+        assert info.manifest.settings["unit"].option_values == ("c", "f")
+
+        for value, expected in (("f", {"unit": "f"}), ("k", {}), ("[c]", {})):
+            (loader.user_module_settings_base_path / "weather.yaml").write_text(f"unit: {value}\n", encoding="utf-8")
+            info.error = None
+            loader._load_and_validate_module_settings(info)
+            assert info.current_settings == expected
+
+def test_group_modules_by_dependency_level():
+    """Тест разбиения модулей на уровни зависимостей (с циклом и внешней зависимостью)"""
+    from Systems.core.module_loader import _group_modules_by_dependency_level
+
+    def _info(name, deps=()):
+        manifest = ModuleManifest(name=name, display_name=name, version="1.0.0", sdb_module_dependencies=list(deps))
+        return ModuleInfo(name=name, path=None, manifest=manifest)
+
+    a, b, c = _info("mod_a", ["mod_c", "external"]), _info("mod_b"), _info("mod_c")
+    x, y = _info("mod_x", ["mod_y"]), _info("mod_y", ["mod_x"])
+
+    assert _group_modules_by_dependency_level([a, b, c]) == [[b, c], [a]]
+    assert _group_modules_by_dependency_level([a, c, x, y]) == [[c], [a], [x, y]]
+
+
+def test_manifest_validation_keeps_aliases_and_rejects_unknown_fields(tmp_path):
+    """Тест: манифест валидируется с алиасами полей и запретом лишних ключей"""
+    module_dir = _write_plugin(tmp_path, "weather", {
+        **_WEATHER_MANIFEST,
+        "permissions": [{"name": "weather.view", "description": "Просмотр"}],
+        "metadata": {"public_access": True},
+    })
+    loader = _make_loader(tmp_path)
+    manifest = loader._parse_manifest_file(module_dir)
+    assert [perm.name for perm in manifest.declared_permissions] == ["weather.view"]
+    assert manifest.metadata.assign_default_access_to_user_role is True
+
+    other_dir = _write_plugin(tmp_path, "broken", {**_WEATHER_MANIFEST, "name": "broken", "unexpected": 1})
+    assert loader._parse_manifest_file(other_dir) is None
+
+
+def test_module_info_repr_lists_status_flags():
+    """Тест: repr ModuleInfo перечисляет установленные флаги состояния"""
+    info = ModuleInfo(name="weather", path=None)
+    assert repr(info) == "<ModuleInfo name='weather' (discovered)>"
+
+    info.is_system_module = True
+    info.is_loaded_successfully = True
+    info.error = "x" * 40
+    assert repr(info) == f"<ModuleInfo name='weather' (system, active_target, loaded, error='{'x' * 30}...')>"
+
+
+def test_declared_permissions_collected_once_per_module(tmp_path):
+    """Тест: разрешения активных и системных модулей собираются без дублей"""
+    loader = _make_loader(tmp_path)
+    for name, is_system in (("plug_one", False), ("sys_one", True), ("plug_off", False)):
+        manifest = ModuleManifest(
+            name=name, display_name=name, version="1.0.0",
+            permissions=[{"name": f"{name}.use", "description": "Доступ"}],
+        )
+        loader.available_modules[name] = ModuleInfo(name=name, path=None, manifest=manifest, is_system_module=is_system)
+    loader.enabled_plugin_names = ["plug_one", "sys_one", "plug_one"]
+
+    perms = loader.get_all_declared_permissions_from_active_modules()
+    assert [perm.name for perm in perms] == ["plug_one.use", "sys_one.use"]
+
+
+def test_scan_builds_many_modules_in_directory_order(tmp_path):
+    """Тест: параллельное сканирование сохраняет порядок папок и загружает настройки каждого модуля"""
+    import os
+
+    names = [f"plugin_{i:02d}" for i in range(12)]
+    for name in names:
+        _write_plugin(tmp_path, name, {**_WEATHER_MANIFEST, "name": name})
+    loader = _make_loader(tmp_path)
+
+    loader._scan_directory_for_modules(loader.plugins_root_dir, is_system_dir=False)
+
+    expected_order = [entry.name for entry in os.scandir(loader.plugins_root_dir)]
+    assert list(loader.available_modules) == expected_order
+    assert all(info.current_settings == {"city": "Москва", "days": 3} for info in loader.available_modules.values())
+    assert sorted(p.stem for p in loader.user_module_settings_base_path.glob("*.yaml")) == names
+
+
+def test_coerce_bool_setting():
+    """Тест приведения строковых и прочих значений bool-настройки"""
+    from Systems.core.module_loader import _coerce_bool_setting
+
+    assert all(_coerce_bool_setting(v) for v in ("true", "Yes", "ON", "1", "t", 1, [0]))
+    assert not any(_coerce_bool_setting(v) for v in ("false", "no", "0", "", "off", "y", " yes ", 0, None))
+
+
+def test_settings_priority_user_over_module_file_over_manifest(tmp_path):
+    """Тест: значение настройки берется из пользовательского файла, затем из module_settings.yaml, затем из манифеста"""
+    module_dir = _write_plugin(tmp_path, "weather", _WEATHER_MANIFEST, module_settings={"days": 5, "extra": 1})
+    loader = _make_loader(tmp_path)
+    user_file = loader.user_module_settings_base_path / "weather.yaml"
+
+    info = ModuleInfo(name="weather", path=module_dir, manifest=loader._parse_manifest_file(module_dir))
+    loader._load_and_validate_module_settings(info)
+    assert info.current_settings == {"city": "Москва", "days": 5}
+    # В созданный файл попадают и ключи из module_settings.yaml, которых нет в манифесте
+    assert yaml.safe_load(user_file.read_text(encoding="utf-8")) == {"city": "Москва", "days": 5, "extra": 1}
+
+    user_file.write_text("city: Омск\n", encoding="utf-8")
+    loader._load_and_validate_module_settings(info)
+    assert info.current_settings == {"city": "Омск", "days": 5}
+
+    user_file.write_text("- not a mapping\n", encoding="utf-8")
+    loader._load_and_validate_module_settings(info)
+    assert info.current_settings == {"city": "Москва", "days": 5}
+
+
+def test_missing_manifest_warns_for_plugins_only(tmp_path):
+    """Тест: отсутствие манифеста - предупреждение для плагина и debug для системного модуля"""
+    from loguru import logger
+
+    loader = _make_loader(tmp_path)
+    plugin_dir = tmp_path / "Modules" / "no_manifest"
+    sys_dir = loader.core_sys_modules_root_dir / "no_manifest"
+    plugin_dir.mkdir(parents=True)
+    sys_dir.mkdir(parents=True)
+    assert loader._sys_import_base == "Systems.core.sys_modules"
+
+    records = []
+    handler_id = logger.add(lambda message: records.append(message.record), level="DEBUG")
+    try:
+        assert loader._parse_manifest_file(plugin_dir) is None
+        assert loader._parse_manifest_file(sys_dir) is None
+    finally:
+        logger.remove(handler_id)
+    levels = [r["level"].name for r in records if "Манифест не найден" in r["message"]]
+    assert levels == ["WARNING", "DEBUG"]
+
+
+def test_final_settings_debug_log_formatted_only_when_enabled(tmp_path):
+    """Тест: итоговые настройки форматируются в лог только при включенном DEBUG"""
+    from loguru import logger
+
+    _write_plugin(tmp_path, "weather", _WEATHER_MANIFEST)
+    loader = _make_loader(tmp_path)
+
+    messages = []
+    handler_id = logger.add(lambda message: messages.append(message.record["message"]), level="INFO")
+    try:
+        loader.scan_all_available_modules()
+        assert not any("Итоговые настройки" in m for m in messages)
+    finally:
+        logger.remove(handler_id)
+
+    messages.clear()
+    handler_id = logger.add(lambda message: messages.append(message.record["message"]), level="DEBUG")
+    try:
+        loader.scan_all_available_modules()
+    finally:
+        logger.remove(handler_id)
+    assert "Итоговые настройки модуля 'weather': {'city': 'Москва', 'days': 3}" in messages
+
+
+def test_min_core_version_checked_with_cached_version_parsing(tmp_path):
+    """Тест: требование к версии ядра проверяется, строки версий разбираются один раз"""
+    from Systems.core.module_loader import _parse_version_cached
+
+    loader = _make_loader(tmp_path, sdb_version="1.2.0")
+    too_new = ModuleInfo(name="too_new", path=tmp_path, is_system_module=False)
+    too_new.manifest = ModuleManifest.model_validate(
+        {**_WEATHER_MANIFEST, "name": "too_new", "metadata": {"min_sdb_core_version": "2.0.0"}}
+    )
+    fits = ModuleInfo(name="fits", path=tmp_path, is_system_module=False)
+    fits.manifest = ModuleManifest.model_validate(
+        {**_WEATHER_MANIFEST, "name": "fits", "metadata": {"min_sdb_core_version": "1.0.0"}}
+    )
+
+    _parse_version_cached.cache_clear()
+    assert loader._check_module_dependencies(too_new) is False
+    assert "2.0.0" in too_new.error
+    assert loader._check_module_dependencies(fits) is True
+    assert loader._check_module_dependencies(fits) is True
+    cache_info = _parse_version_cached.cache_info()
+    assert cache_info.misses == 3 and cache_info.hits == 3
+
+
+def test_get_module_settings_falls_back_to_cached_manifest_defaults(tmp_path):
+    """Тест: без current_settings возвращается копия дефолтов манифеста, посчитанных один раз"""
+    loader = _make_loader(tmp_path)
+    manifest = ModuleManifest.model_validate(_WEATHER_MANIFEST)
+    info = ModuleInfo(name="weather", path=tmp_path, manifest=manifest)
+    loader.available_modules["weather"] = info
+
+    defaults = loader.get_module_settings("weather")
+    assert defaults == {"city": "Москва", "days": 3}
+    assert defaults is not manifest.default_settings
+
+    # Изменение полученного словаря не портит дефолты для следующих вызовов
+    defaults["city"] = "Казань"
+    assert loader.get_module_settings("weather") == {"city": "Москва", "days": 3}
+
+    info.current_settings = {"city": "Казань", "days": 1}
+    assert loader.get_module_settings("weather") == {"city": "Казань", "days": 1}
+
+
+def test_write_file_atomic_replaces_file_without_leftovers(tmp_path):
+    """Тест: атомарная запись заменяет файл целиком и не оставляет временных файлов"""
+    from Systems.core.module_loader import _write_file_atomic
+
+    target = tmp_path / "weather.yaml"
+    target.write_bytes(b"old: 1\n")
+    data = yaml.dump({"city": "Москва" * 1000}, allow_unicode=True, encoding="utf-8")
+
+    _write_file_atomic(target, data)
+
+    assert target.read_bytes() == data
+    assert [p.name for p in tmp_path.iterdir()] == ["weather.yaml"]
@@ -0,0 +1,212 @@
+"""
+Тесты для ModuleMigrationManager
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from Systems.core.database import module_migrations as migrations
+
+_REVISION_TEMPLATE = '''
+revision = "{revision}"
+down_revision = {down_revision!r}
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    pass
+
+
+def downgrade():
+    pass
+'''
+
+
+def _write_revision(migrations_path, revision, down_revision=None):
+    versions_dir = migrations_path / "versions"
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    (versions_dir / f"{revision}_rev.py").write_text(
+        _REVISION_TEMPLATE.format(revision=revision, down_revision=down_revision), encoding="utf-8"
+    )
+
+
+def _make_services(applied_revisions=()):
+    """Мок сервисов, у которого alembic_version содержит applied_revisions"""
+    services = MagicMock()
+    session = services.db.get_session.return_value.__aenter__.return_value
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = list(applied_revisions)
+    session.execute = AsyncMock(return_value=result)
+    return services
+
+
+@pytest.fixture
+def migrations_path(tmp_path):
+    path = tmp_path / "migrations"
+    _write_revision(path, "0001")
+    return path
+
+
+class TestModuleMigrationManager:
+    """Тесты для класса ModuleMigrationManager"""
+
+    def test_script_directory_cached_until_reregistration(self, migrations_path, monkeypatch):
+        """Тест: каталог ревизий разбирается один раз и сбрасывается при повторной регистрации"""
+        manager = migrations.ModuleMigrationManager(MagicMock())
+        manager.register_module_migrations("weather", migrations_path)
+
+        from_config_calls = []
+        original_from_config = migrations.ScriptDirectory.from_config
+
+        def counting_from_config(cfg):
+            from_config_calls.append(cfg)
+            return original_from_config(cfg)
+
+        monkeypatch.setattr(migrations.ScriptDirectory, "from_config", counting_from_config)
+
+        script, head = manager._get_script_directory("weather")
+        assert head == "0001"
+        assert manager._get_script_directory("weather") == (script, "0001")
+        assert len(from_config_calls) == 1
+
+        _write_revision(migrations_path, "0002", down_revision="0001")
+        manager.register_module_migrations("weather", migrations_path)
+        assert manager._get_script_directory("weather")[1] == "0002"
+        assert len(from_config_calls) == 2
+
+    def test_register_modules_picks_up_migrations_dirs(self, tmp_path, migrations_path):
+        """Тест: регистрируются только модули, у которых есть каталог migrations/"""
+        plain_module = tmp_path / "plain"
+        plain_module.mkdir()
+        manager = migrations.ModuleMigrationManager(MagicMock())
+
+        registered = manager.register_modules([
+            SimpleNamespace(name="weather", path=migrations_path.parent),
+            SimpleNamespace(name="plain", path=plain_module),
+        ])
+        assert registered == 1
+        assert manager._migration_paths == {"weather": migrations_path}
+
+
+@pytest.mark.parametrize("db_type, expected_peak", [("postgresql", 2), ("sqlite", 1)])
+async def test_run_all_module_migrations_bounded_concurrency(tmp_path, db_type, expected_peak):
+    """Тест: модули мигрируются параллельно, не больше concurrency одновременно (на SQLite - по одному)"""
+    import asyncio
+
+    services = _make_services()
+    services.config.db.type = db_type
+    manager = migrations.ModuleMigrationManager(services)
+    for name in ("a", "b", "c", "d", "e"):
+        path = tmp_path / name
+        path.mkdir()
+        manager.register_module_migrations(name, path)
+
+    running = 0
+    peak = 0
+
+    async def fake_run(module_name, target_revision="head"):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if module_name == "c":
+            raise RuntimeError("boom")
+        return module_name != "d"
+
+    manager.run_module_migrations = fake_run
+    results = await manager.run_all_module_migrations(concurrency=2)
+
+    assert results == {"a": True, "b": True, "c": False, "d": False, "e": True}
+    assert list(results) == ["a", "b", "c", "d", "e"]
+    assert peak == expected_peak
+
+
+async def test_upgrade_runs_off_the_event_loop_thread(migrations_path, monkeypatch):
+    """Тест: синхронный command.upgrade выполняется не в потоке event loop"""
+    import threading
+
+    services = MagicMock()
+    services.db.get_database_url.return_value = "sqlite://"
+    manager = migrations.ModuleMigrationManager(services)
+    manager.register_module_migrations("weather", migrations_path)
+
+    upgrade_calls = []
+
+    def fake_upgrade(cfg, revision):
+        upgrade_calls.append((threading.get_ident(), cfg.get_main_option("script_location"), revision))
+
+    monkeypatch.setattr(migrations.command, "upgrade", fake_upgrade)
+
+    assert await manager.run_module_migrations("weather") is True
+    thread_id, script_location, revision = upgrade_calls[0]
+    assert thread_id != threading.get_ident()
+    assert script_location == str(migrations_path)
+    assert revision == "head"
+
+
+async def test_async_mode_runs_migrations_in_background_with_status(tmp_path):
+    """Тест: в режиме async миграции идут в фоне, статус проходит pending -> running -> итог"""
+    import asyncio
+
+    manager = migrations.ModuleMigrationManager(_make_services(), mode="async")
+    for name in ("ok", "bad"):
+        path = tmp_path / name
+        path.mkdir()
+        manager.register_module_migrations(name, path)
+
+    release = asyncio.Event()
+
+    async def fake_run(module_name, target_revision="head"):
+        await release.wait()
+        return module_name == "ok"
+
+    manager.run_module_migrations = fake_run
+    assert await manager.run_all_module_migrations() == {}
+    assert manager.get_migration_status_all() == {"ok": "pending", "bad": "pending"}
+
+    await asyncio.sleep(0)
+    assert manager.get_migration_status_all() == {"ok": "running", "bad": "running"}
+
+    release.set()
+    await asyncio.gather(*list(manager._tasks.values()))
+    assert manager.get_migration_status_all() == {"ok": "succeeded", "bad": "failed"}
+    assert manager._tasks == {}
+
+
+async def test_skip_mode_and_unknown_mode():
+    """Тест: режим skip не запускает миграции, неизвестный режим отклоняется"""
+    manager = migrations.ModuleMigrationManager(MagicMock(), mode="skip")
+    manager._migration_paths["weather"] = Path("unused")
+    assert await manager.run_all_module_migrations() == {}
+    assert manager.get_migration_status_all() == {}
+
+    with pytest.raises(ValueError):
+        migrations.ModuleMigrationManager(MagicMock(), mode="later")
+
+
+async def test_modules_already_at_head_are_not_upgraded(tmp_path):
+    """Тест: модули, чей head уже в alembic_version, пропускаются без запуска upgrade"""
+    manager = migrations.ModuleMigrationManager(_make_services(applied_revisions=["0001"]))
+    for name, head in (("current", "0001"), ("stale", "0002")):
+        path = tmp_path / name
+        _write_revision(path, head)
+        manager.register_module_migrations(name, path)
+
+    upgraded = []
+
+    async def fake_run(module_name, target_revision="head"):
+        upgraded.append(module_name)
+        return True
+
+    manager.run_module_migrations = fake_run
+    results = await manager.run_all_module_migrations()
+
+    assert upgraded == ["stale"]
+    assert results == {"current": True, "stale": True}
+    assert manager.get_migration_status_all() == {"current": "succeeded", "stale": "succeeded"}
+    manager.services.db.get_session.assert_called_once()
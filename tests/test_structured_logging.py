@@ -0,0 +1,144 @@
+"""
+Тесты для структурированного логирования
+"""
+
+import io
+import json
+import sys
+
+import pytest
+from loguru import logger
+
+from Systems.core.logging.structured import setup_structured_logging
+
+
+class _BinaryStdout:
+    """Подмена sys.stdout с байтовым буфером, как у настоящего потока"""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def write(self, text):
+        self.buffer.write(text.encode("utf-8"))
+
+    def flush(self):
+        pass
+
+
+@pytest.fixture
+def restore_logger():
+    yield
+    logger.remove()
+    logger.add(sys.stderr)
+
+
+class TestStructuredLogging:
+    """Тесты для setup_structured_logging"""
+
+    def test_json_output_writes_one_json_object_per_line(self, monkeypatch, restore_logger):
+        """Тест: консольный JSON-вывод - одна JSON-строка на запись, с полями extra"""
+        stdout = _BinaryStdout()
+        monkeypatch.setattr(sys, "stdout", stdout)
+        setup_structured_logging(json_output=True, level="INFO")
+
+        logger.bind(user_id=42).info("Привет {}", "{мир}")
+        logger.debug("не должно попасть в вывод")
+
+        lines = stdout.buffer.getvalue().decode("utf-8").splitlines()
+        assert len(lines) == 1
+        data = json.loads(lines[0])
+        assert data["message"] == "Привет {мир}"
+        assert data["level"] == "INFO"
+        assert data["user_id"] == 42
+        assert data["function"] == "test_json_output_writes_one_json_object_per_line"
+
+    def test_file_output_is_plain_json(self, tmp_path, monkeypatch, restore_logger):
+        """Тест: файловый лог содержит по одной JSON-строке без повторной сериализации loguru"""
+        monkeypatch.setattr(sys, "stdout", _BinaryStdout())
+        log_file = tmp_path / "app.log"
+        setup_structured_logging(json_output=False, log_file=str(log_file))
+
+        logger.bind(request_id="r-1").debug("Запрос <b>{}</b>", "{id}")
+        logger.remove()
+
+        lines = log_file.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        data = json.loads(lines[0])
+        assert data["message"] == "Запрос <b>{id}</b>"
+        assert data["request_id"] == "r-1"
+        assert "_json_line" not in data
+        assert "record" not in data  # конверт serialize=True
+
+    def test_timestamp_keeps_timezone(self, tmp_path, monkeypatch, restore_logger):
+        """Тест: timestamp берется из record["time"] как есть, со смещением часового пояса"""
+        from datetime import datetime
+
+        monkeypatch.setattr(sys, "stdout", _BinaryStdout())
+        log_file = tmp_path / "app.log"
+        setup_structured_logging(log_file=str(log_file))
+
+        logger.info("tz")
+        logger.remove()
+
+        timestamp = json.loads(log_file.read_text(encoding="utf-8"))["timestamp"]
+        assert datetime.fromisoformat(timestamp).tzinfo is not None
+
+    def test_records_below_level_are_not_serialized(self, tmp_path, monkeypatch, restore_logger):
+        """Тест: записи ниже уровня handler'а не доходят до сборки JSON"""
+        from Systems.core.logging import structured
+
+        built = []
+        original_build = structured._build_log_dict
+
+        def counting_build(record):
+            built.append(record["level"].name)
+            return original_build(record)
+
+        monkeypatch.setattr(structured, "_build_log_dict", counting_build)
+        monkeypatch.setattr(sys, "stdout", _BinaryStdout())
+        setup_structured_logging(json_output=True, level="WARNING")
+
+        logger.debug("debug")
+        logger.info("info")
+        logger.warning("warning")
+
+        assert built == ["WARNING"]
+
+    def test_file_format_does_not_leak_into_other_handlers(self, tmp_path, monkeypatch, restore_logger):
+        """Тест: JSON файлового handler'а не попадает в extra, которое видят другие handler'ы"""
+        monkeypatch.setattr(sys, "stdout", _BinaryStdout())
+        log_file = tmp_path / "app.log"
+        setup_structured_logging(log_file=str(log_file))
+        seen_extra = []
+        logger.add(lambda message: seen_extra.append(dict(message.record["extra"])), format="{extra}")
+
+        logger.bind(user_id=7).info("Скобки {} и <i>теги</i>", "{}")
+        logger.remove()
+
+        assert seen_extra == [{"user_id": 7}]
+        data = json.loads(log_file.read_text(encoding="utf-8"))
+        assert data["message"] == "Скобки {} и <i>теги</i>"
+
+    @pytest.mark.parametrize("json_output", [True, False])
+    def test_exception_included_in_json(self, tmp_path, monkeypatch, restore_logger, json_output):
+        """Тест: logger.exception пишет тип, значение и трассировку исключения в JSON (консоль и файл)"""
+        stdout = _BinaryStdout()
+        monkeypatch.setattr(sys, "stdout", stdout)
+        log_file = tmp_path / "app.log"
+        setup_structured_logging(json_output=json_output, log_file=str(log_file))
+
+        try:
+            raise ValueError("плохое значение")
+        except ValueError:
+            logger.exception("Ошибка обработки")
+        logger.remove()
+
+        outputs = [log_file.read_text(encoding="utf-8")]
+        if json_output:
+            outputs.append(stdout.buffer.getvalue().decode("utf-8"))
+        for output in outputs:
+            data = json.loads(output)
+            assert data["exception"]["type"] == "ValueError"
+            assert data["exception"]["value"] == "плохое значение"
+            assert "Traceback" in data["exception"]["traceback"]
+            assert 'raise ValueError("плохое значение")' in data["exception"]["traceback"]